@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+多设备接收负载测试 - 在本机启动多个 AudioSimulator，对比单个asyncio事件循环、
+每个设备一个接收线程与不同数量工作进程（ProcessIngest）的吞吐量和CPU占用
+"""
+
+import os
+import sys
+import math
+import time
+import socket
+import argparse
+import threading
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from ring_buffer import SPSCSampleRing
+from engine import StreamReceiver
+from async_ingest import AsyncIngest
+from process_ingest import ProcessIngest
+from test_audio_simulator import AudioSimulator
+
+def run_simulators(count, mode, ports, stop):
+    """子进程：启动 count 个模拟器（系统分配端口），发送端不占用被测进程的CPU"""
+    sys.stdout = open(os.devnull, 'w')
+    simulators = [AudioSimulator('127.0.0.1', 0, mode) for _ in range(count)]
+    for simulator in simulators:
+        threading.Thread(target=simulator.start_server, daemon=True).start()
+    while not all(s.running for s in simulators):
+        time.sleep(0.01)
+    ports.put([s.port for s in simulators])
+    stop.wait()
+
+def run_flooders(count, mode, ports, stop):
+    """子进程：count 个发送端，连接后不限速地重复发送预先编码的数据，吞吐量只受接收端限制"""
+    message = b''.join(AudioSimulator('127.0.0.1', 0, mode).encode_message(
+        AudioSimulator().generate_audio_data(), sequence) for sequence in range(16))
+    servers = []
+    for _ in range(count):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(4)
+        servers.append(server)
+
+    def flood(server):
+        while not stop.is_set():
+            client, _ = server.accept()
+            try:
+                while not stop.is_set():
+                    client.sendall(message)
+            except OSError:
+                pass
+            finally:
+                client.close()
+
+    for server in servers:
+        threading.Thread(target=flood, args=(server,), daemon=True).start()
+    ports.put([server.getsockname()[1] for server in servers])
+    stop.wait()
+
+def measure(devices, warmup, duration):
+    """预热后统计 duration 秒内的接收样本数与本进程CPU时间"""
+    time.sleep(warmup)
+    start_samples = [d.samples_received for d in devices]
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    time.sleep(duration)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - start_cpu
+    received = [d.samples_received - s for d, s in zip(devices, start_samples)]
+    return {
+        'rate': sum(received) / elapsed,
+        'min_rate': min(received) / elapsed,
+        'cpu': cpu / elapsed,
+        'threads': threading.active_count(),
+        'connected': sum(d.connected for d in devices),
+    }
+
+def run_async(ports, warmup, duration):
+    """单个事件循环接收全部设备"""
+    ingest = AsyncIngest()
+    devices = [ingest.add_device(f"设备{i}", '127.0.0.1', port) for i, port in enumerate(ports)]
+    ingest.start()
+    try:
+        return measure(devices, warmup, duration)
+    finally:
+        ingest.stop()
+
+def run_processes(ports, warmup, duration, workers):
+    """设备平均分配到 workers 个工作进程，样本经共享内存送回本进程"""
+    ingest = ProcessIngest(devices_per_worker=math.ceil(len(ports) / workers))
+    devices = [ingest.add_device(f"设备{i}", '127.0.0.1', port) for i, port in enumerate(ports)]
+    ingest.start()
+    try:
+        return measure(devices, warmup, duration)
+    finally:
+        ingest.stop()
+
+def run_threads(ports, warmup, duration):
+    """每个设备一个 StreamReceiver 接收线程"""
+    receivers = [StreamReceiver(SPSCSampleRing(), '127.0.0.1', port) for port in ports]
+    for receiver in receivers:
+        if receiver.connect_to_device():
+            receiver.start_receiving()
+    try:
+        return measure(receivers, warmup, duration)
+    finally:
+        for receiver in receivers:
+            receiver.disconnect_from_device()
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="多设备接收负载测试")
+    parser.add_argument('--devices', type=int, default=32, help="模拟设备数量")
+    parser.add_argument('--mode', choices=AudioSimulator.MODES, default='binary',
+                        help="模拟器发送格式")
+    parser.add_argument('--duration', type=float, default=5.0, help="每种实现的统计时长（秒）")
+    parser.add_argument('--warmup', type=float, default=1.0, help="连接后的预热时长（秒）")
+    parser.add_argument('--flood', action='store_true',
+                        help="发送端不限速（测量接收端的最大吞吐量）")
+    parser.add_argument('--workers', default=None,
+                        help="测试的工作进程数，逗号分隔，默认为1、2、4…直到CPU核数")
+    args = parser.parse_args()
+
+    if args.workers:
+        worker_counts = [int(n) for n in args.workers.split(',')]
+    else:
+        worker_counts = [2 ** i for i in range(int(math.log2(os.cpu_count() or 1)) + 1)]
+
+    print("多设备接收负载测试")
+    print("=" * 72)
+    print(f"设备数: {args.devices}  格式: {args.mode}  CPU核数: {os.cpu_count()}  "
+          f"发送端: {'不限速' if args.flood else '模拟器'}")
+
+    ports = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    senders = multiprocessing.Process(target=run_flooders if args.flood else run_simulators,
+                                      args=(args.devices, args.mode, ports, stop))
+    senders.daemon = True
+    senders.start()
+    device_ports = ports.get(timeout=30)
+
+    cases = [("asyncio事件循环", run_async), ("每设备一个线程", run_threads)]
+    for workers in worker_counts:
+        cases.append((f"{workers}个工作进程",
+                      lambda ports, warmup, duration, workers=workers:
+                      run_processes(ports, warmup, duration, workers)))
+    print(f"\n{'实现':<14}{'已连接':>8}{'线程数':>8}{'样本/秒':>14}{'单设备最低':>12}"
+          f"{'CPU占用':>10}{'每百万样本CPU':>16}")
+    print("-" * 72)
+    try:
+        for name, run in cases:
+            result = run(device_ports, args.warmup, args.duration)
+            per_million = result['cpu'] / max(result['rate'], 1) * 1e6 * 1000
+            print(f"{name:<14}{result['connected']:>8}{result['threads']:>8}"
+                  f"{result['rate']:>14,.0f}{result['min_rate']:>12,.0f}"
+                  f"{result['cpu'] * 100:>9.1f}%{per_million:>13.1f} ms")
+            time.sleep(0.5)
+    finally:
+        stop.set()
+        senders.join(timeout=5)
+
+    print("\nCPU占用只统计主进程（模拟器在子进程中运行，工作进程的解析不计入）；"
+          "使用模拟器时发送速率受模拟器生成数据的速度限制，--flood 时受接收端限制，"
+          "发送端也占用CPU核。")
+
+if __name__ == "__main__":
+    main()
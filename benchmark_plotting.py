@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+绘图基准测试 - 对比每帧 clear() + plot() 重建图元与持久图元 setData()，
+切换图表类型时重建图元与只切换可见性的开销，以及多设备总览的刷新开销
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pyqtgraph as pg
+from PyQt6.QtWidgets import QApplication
+from chart_views import ChartViewManager
+from device_registry import DeviceRegistry
+from device_overview import DeviceOverviewWidget
+
+CHART_TYPES = ["波形图", "频谱图"]
+
+def make_frames(count, points):
+    """生成模拟的频谱帧"""
+    freqs = np.linspace(0, 8000, points)
+    rng = np.random.default_rng(0)
+    return freqs, [np.abs(np.sinc((freqs - 440) / 200)) + rng.uniform(0, 0.05, points)
+                   for _ in range(count)]
+
+def render(app, widget):
+    """处理挂起的事件并同步重绘，模拟定时器触发的一帧"""
+    app.processEvents()
+    widget.repaint()
+
+def summarize(times):
+    times = np.array(times) * 1000
+    return times.mean(), np.percentile(times, 95)
+
+def bench_replot(app, widget, freqs, frames):
+    """旧实现：每帧 clear() 后重新 plot()"""
+    times = []
+    for frame in frames:
+        start = time.perf_counter()
+        widget.clear()
+        widget.plot(freqs, frame, pen=pg.mkPen('r', width=2))
+        render(app, widget)
+        times.append(time.perf_counter() - start)
+    return times
+
+def bench_set_data(app, widget, freqs, frames):
+    """新实现：曲线只创建一次，每帧 setData()"""
+    widget.clear()
+    curve = widget.plot(pen=pg.mkPen('r', width=2))
+    times = []
+    for frame in frames:
+        start = time.perf_counter()
+        curve.setData(freqs, frame)
+        render(app, widget)
+        times.append(time.perf_counter() - start)
+    return times
+
+def bench_switch_recreate(app, widget, count):
+    """旧实现：切换图表类型时 clear() 并重建曲线、标签与范围"""
+    times = []
+    for i in range(count):
+        start = time.perf_counter()
+        widget.clear()
+        if CHART_TYPES[i % 2] == "波形图":
+            widget.plot(pen=pg.mkPen('b', width=2))
+            widget.setLogMode(x=False, y=False)
+            widget.setLabel('left', '振幅')
+            widget.setLabel('bottom', '时间')
+            widget.setYRange(-32768, 32768)
+            widget.enableAutoRange(axis='x')
+        else:
+            widget.plot(pen=pg.mkPen('r', width=2))
+            widget.setLogMode(x=False, y=False)
+            widget.setLabel('left', '幅度')
+            widget.setLabel('bottom', '频率 (Hz)')
+            widget.setXRange(0, 8000)
+            widget.setYRange(0, 1)
+        render(app, widget)
+        times.append(time.perf_counter() - start)
+    return times
+
+def bench_switch_views(app, widget, count):
+    """新实现：ChartViewManager 只切换可见性并恢复各视图的坐标轴"""
+    widget.clear()
+    views = ChartViewManager(widget)
+    views.add_view("波形图", [widget.plot(pen=pg.mkPen('b', width=2))], '振幅', '时间',
+                   '波形', y_range=(-32768, 32768))
+    views.add_view("频谱图", [widget.plot(pen=pg.mkPen('r', width=2))], '幅度', '频率 (Hz)',
+                   '频谱', x_range=(0, 8000), y_range=(0, 1))
+    times = []
+    for i in range(count):
+        start = time.perf_counter()
+        views.show(CHART_TYPES[i % 2])
+        render(app, widget)
+        times.append(time.perf_counter() - start)
+    return times
+
+def bench_overview(app, devices, frames):
+    """设备总览：每次刷新所有设备都有0.2秒新数据（总览刷新率5 FPS）"""
+    registry = DeviceRegistry()
+    for i in range(devices):
+        registry.add_device(f"设备{i}", '127.0.0.1', 1).connection.connected = True
+    overview = DeviceOverviewWidget(registry)
+    overview.timer.stop()
+    overview.resize(960, 1000)
+    overview.sync_tiles()
+    overview.show()
+    rng = np.random.default_rng(0)
+    block = (8000 * np.sin(2 * np.pi * 440 * np.arange(3200) / 16000)).astype(np.int16)
+    times = []
+    for _ in range(frames):
+        for entry in registry:
+            entry.connection.sample_ring.write(block + rng.integers(-100, 100, len(block), dtype=np.int16))
+        start = time.perf_counter()
+        overview.refresh()
+        render(app, overview)
+        times.append(time.perf_counter() - start)
+    overview.close()
+    return times
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="绘图基准测试")
+    parser.add_argument('--frames', type=int, default=300, help="绘制帧数 (默认300)")
+    parser.add_argument('--points', type=int, default=1024, help="每帧曲线点数 (默认1024)")
+    parser.add_argument('--switches', type=int, default=100, help="切换图表类型次数 (默认100)")
+    parser.add_argument('--devices', type=int, default=32, help="设备总览的设备数量 (默认32)")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    widget = pg.PlotWidget()
+    widget.resize(800, 600)
+    widget.show()
+    freqs, frames = make_frames(args.frames, args.points)
+
+    print("绘图基准测试")
+    print("=" * 50)
+    print(f"{'实现':<24}{'平均(ms)':>12}{'P95(ms)':>12}")
+    cases = [
+        ("每帧 clear()+plot()", lambda: bench_replot(app, widget, freqs, frames)),
+        ("每帧 setData()", lambda: bench_set_data(app, widget, freqs, frames)),
+        ("切换: 重建图元", lambda: bench_switch_recreate(app, widget, args.switches)),
+        ("切换: 只改变可见性", lambda: bench_switch_views(app, widget, args.switches)),
+        (f"总览: {args.devices}个设备刷新", lambda: bench_overview(app, args.devices, args.frames // 10)),
+    ]
+    for name, run in cases:
+        run()  # 预热
+        mean, p95 = summarize(run())
+        print(f"{name:<24}{mean:>12.3f}{p95:>12.3f}")
+
+    print("\n每帧时间包含事件处理与一次同步重绘；10 FPS下每帧预算为100ms，30 FPS下为33ms。")
+    print("设备总览每次刷新包含取走所有设备的新样本、更新缩略波形与电平，以及重绘全部磁贴。")
+
+if __name__ == "__main__":
+    main()
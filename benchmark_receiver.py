@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+接收路径基准测试 - 对比旧的字符串缓冲实现与 recv_into 预分配缓冲实现，
+以及逐元素解析与向量化文本解码器
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import socket
+import argparse
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from frame_protocol import FrameParser, TextLineDecoder, encode_frame
+
+FRAME_SAMPLES = 1024
+
+def generate_frames(count):
+    """生成模拟的1024点音频帧"""
+    t = np.arange(count * FRAME_SAMPLES) / 16000
+    signal = 1000 * np.sin(2 * np.pi * 440 * t) + np.random.uniform(-100, 100, len(t))
+    return signal.astype(np.int16).reshape(count, FRAME_SAMPLES)
+
+def build_stream(frames, mode):
+    """按固件格式构造字节流"""
+    if mode == 'binary':
+        return b''.join(encode_frame(f, i) for i, f in enumerate(frames))
+    if mode == 'csv':
+        return b''.join(",".join(map(str, f.tolist())).encode() + b"\n" for f in frames)
+    # 与ArduinoJson的紧凑输出一致
+    return b''.join(json.dumps({"audio_data": f.tolist()}, separators=(',', ':')).encode() + b"\n"
+                    for f in frames)
+
+def legacy_receive(sock, on_frame, decode=True):
+    """旧实现：recv(1024) + 字符串拼接 + split"""
+    buffer = ""
+    while True:
+        data = sock.recv(1024)
+        if not data:
+            break
+        buffer += data.decode('utf-8')
+        while '\n' in buffer:
+            line, buffer = buffer.split('\n', 1)
+            line = line.strip()
+            if line and not decode:
+                on_frame(line)
+            elif line:
+                try:
+                    json_data = json.loads(line)
+                    if 'audio_data' in json_data:
+                        on_frame(json_data['audio_data'])
+                except json.JSONDecodeError:
+                    try:
+                        audio_data = [int(x) for x in line.split(',') if x.strip()]
+                        if audio_data:
+                            on_frame(audio_data)
+                    except ValueError:
+                        pass
+
+def ring_receive(sock, on_frame, decode=True):
+    """新实现：recv_into 预分配缓冲 + 游标扫描"""
+    parser = FrameParser() if decode else FrameParser(line_decoder=lambda line: line)
+    while True:
+        frames = parser.receive(sock)
+        if frames is None:
+            break
+        for frame in frames:
+            on_frame(frame)
+
+def legacy_decode(line):
+    """旧实现的逐元素解析：json.loads 或 int() 列表推导"""
+    try:
+        json_data = json.loads(line)
+        return json_data.get('audio_data')
+    except json.JSONDecodeError:
+        return [int(x) for x in line.split(',') if x.strip()]
+
+def benchmark_decoders(streams, repeat):
+    """对比逐元素解析与向量化解码器的样本吞吐量"""
+    print("\n文本解码器 (样本/秒)")
+    print("-" * 60)
+    print(f"{'格式':<8}{'逐元素->列表':>14}{'逐元素->int16':>16}{'向量化->int16':>16}{'加速比':>8}")
+    for mode in ('json', 'csv'):
+        lines = streams[mode].split(b'\n')[:-1]
+        text_lines = [line.decode('utf-8') for line in lines]
+        samples = len(lines) * FRAME_SAMPLES
+
+        list_best = array_best = float('inf')
+        fast_rate = 0.0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for line in text_lines:
+                legacy_decode(line)
+            list_best = min(list_best, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for line in text_lines:
+                np.array(legacy_decode(line), dtype=np.int16)
+            array_best = min(array_best, time.perf_counter() - start)
+
+            decoder = TextLineDecoder()
+            for line in lines:
+                decoder(line)
+            assert decoder.fallback_lines == 0
+            fast_rate = max(fast_rate, decoder.samples_per_second)
+
+        array_rate = samples / array_best
+        print(f"{mode.upper():<8}{samples / list_best:>14,.0f}{array_rate:>16,.0f}"
+              f"{fast_rate:>16,.0f}{fast_rate / array_rate:>7.1f}x")
+    print("加速比为向量化解码相对逐元素解析得到同样int16数组的倍数。")
+
+def run_case(receive_func, payload, decode):
+    """在接收线程中运行一次，返回接收线程CPU秒、帧数与GC次数"""
+    sender_sock, receiver_sock = socket.socketpair()
+    result = {}
+
+    def sender():
+        sender_sock.sendall(payload)
+        sender_sock.close()
+
+    def receiver():
+        count = [0]
+
+        def on_frame(frame):
+            count[0] += 1
+
+        gc_before = sum(s['collections'] for s in gc.get_stats())
+        cpu_start = time.thread_time()
+        receive_func(receiver_sock, on_frame, decode)
+        result['cpu'] = time.thread_time() - cpu_start
+        result['gc'] = sum(s['collections'] for s in gc.get_stats()) - gc_before
+        result['frames'] = count[0]
+
+    threads = [threading.Thread(target=receiver), threading.Thread(target=sender)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    receiver_sock.close()
+    return result
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="接收路径基准测试")
+    parser.add_argument('--frames', type=int, default=1000,
+                        help="帧数 (默认1000帧，即100Hz下10秒数据)")
+    parser.add_argument('--repeat', type=int, default=3, help="重复次数，取最好成绩")
+    args = parser.parse_args()
+
+    print("接收路径基准测试")
+    print("=" * 60)
+    frames = generate_frames(args.frames)
+    streams = {mode: build_stream(frames, mode) for mode in ('json', 'csv', 'binary')}
+
+    # 仅分帧：只切分出完整的行，不解析数值，单独衡量接收引擎本身
+    cases = [
+        ("旧实现 仅分帧", legacy_receive, 'json', False),
+        ("新实现 仅分帧", ring_receive, 'json', False),
+        ("旧实现 JSON", legacy_receive, 'json', True),
+        ("新实现 JSON", ring_receive, 'json', True),
+        ("旧实现 CSV", legacy_receive, 'csv', True),
+        ("新实现 CSV", ring_receive, 'csv', True),
+        ("新实现 二进制", ring_receive, 'binary', True),
+    ]
+
+    print(f"{'实现':<14}{'字节数':>10}{'CPU(ms)':>10}{'每帧(us)':>10}{'GC次数':>8}{'帧/秒':>10}")
+    for name, func, mode, decode in cases:
+        payload = streams[mode]
+        best = min((run_case(func, payload, decode) for _ in range(args.repeat)),
+                   key=lambda r: r['cpu'])
+        assert best['frames'] == args.frames, f"{name} 帧数不一致: {best['frames']}"
+        per_frame = best['cpu'] / best['frames'] * 1e6
+        rate = best['frames'] / best['cpu'] if best['cpu'] > 0 else float('inf')
+        print(f"{name:<14}{len(payload):>10}{best['cpu'] * 1000:>10.1f}{per_frame:>10.1f}"
+              f"{best['gc']:>8}{rate:>10.0f}")
+
+    print("\n新实现的JSON/CSV结果为int16数组，旧实现只产出Python列表。")
+
+    benchmark_decoders(streams, args.repeat)
+
+    print("\n100Hz x 1024点数据流下，每秒需要处理100帧；"
+          "每帧CPU时间 x 100 即为接收线程的CPU占用。")
+
+if __name__ == "__main__":
+    main()
@@ -26,12 +26,18 @@ int audioBufferIndex = 0;
 // JSON文档
 DynamicJsonDocument doc(2048);
 
+// 二进制帧格式 (与上位机 src/frame_protocol.py 一致，小端)
+// 魔数"ESPA" | 标志位(2) | 样本数(2) | 帧序号(4) | 采样率(4) | int16 PCM
+#define FRAME_SAMPLE_RATE 16000
+uint32_t frameSequence = 0;
+
 // 函数声明
 void initI2SMic();
 void connectToWiFi();
 void readAudioData();
 void sendAudioData();
 void sendRawAudioData();
+void sendBinaryAudioData();
 
 void setup() {
   Serial.begin(115200);
@@ -199,4 +205,23 @@ void sendRawAudioData() {
     client.println();
     client.flush();
   }
-} 
\ No newline at end of file
+} 
+
+// 备用发送方法 - 发送二进制帧 (每帧 16 字节帧头 + 2048 字节PCM)
+void sendBinaryAudioData() {
+  if (client && client.connected()) {
+    uint8_t header[16];
+    uint16_t flags = 0;
+    uint16_t sampleCount = BUFFER_SIZE;
+    uint32_t sampleRate = FRAME_SAMPLE_RATE;
+    memcpy(header, "ESPA", 4);
+    memcpy(header + 4, &flags, 2);        // ESP32为小端，直接拷贝
+    memcpy(header + 6, &sampleCount, 2);
+    memcpy(header + 8, &frameSequence, 4);
+    memcpy(header + 12, &sampleRate, 4);
+    
+    client.write(header, sizeof(header));
+    client.write((const uint8_t*)audioBuffer, sizeof(audioBuffer));
+    frameSequence++;
+  }
+}
@@ -5,26 +5,21 @@ ESP32S3 Sense 音频可视化器 - 快速启动脚本
 
 import sys
 import os
+import time
+import argparse
+import importlib
+import importlib.util
 import subprocess
 
+_START_TIME = time.perf_counter()
+
+# 启动时依次导入的模块（用于 --profile-startup 分阶段计时）
+STARTUP_IMPORTS = ['numpy', 'PyQt6.QtWidgets', 'pyqtgraph', 'app']
+
 def check_dependencies():
-    """检查依赖是否安装"""
-    missing_deps = []
-    
-    try:
-        import PyQt6
-    except ImportError:
-        missing_deps.append("PyQt6")
-    
-    try:
-        import pyqtgraph
-    except ImportError:
-        missing_deps.append("pyqtgraph")
-    
-    try:
-        import numpy
-    except ImportError:
-        missing_deps.append("numpy")
+    """检查依赖是否安装（只查找模块位置，不导入）"""
+    missing_deps = [name for name in ("PyQt6", "pyqtgraph", "numpy")
+                    if importlib.util.find_spec(name) is None]
     
     if missing_deps:
         print(f"缺少依赖: {', '.join(missing_deps)}")
@@ -36,13 +31,50 @@ def install_dependencies():
     print("正在安装依赖...")
     try:
         subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        importlib.invalidate_caches()
         return True
     except subprocess.CalledProcessError:
         print("依赖安装失败，请手动运行: pip install -r requirements.txt")
         return False
 
+def profile_startup():
+    """分阶段计时启动过程（导入、创建QApplication、创建窗口、首次显示），然后照常运行"""
+    timings = [("脚本启动", time.perf_counter() - _START_TIME)]
+    
+    def measure(name, func):
+        start = time.perf_counter()
+        result = func()
+        timings.append((name, time.perf_counter() - start))
+        return result
+    
+    for module in STARTUP_IMPORTS:
+        measure(f"import {module}", lambda: importlib.import_module(module))
+    
+    from PyQt6.QtWidgets import QApplication
+    from app import AudioVisualizerApp
+    app = measure("创建QApplication", lambda: QApplication(sys.argv))
+    app.setStyle('Fusion')
+    window = measure("创建主窗口", AudioVisualizerApp)
+    
+    def show_window():
+        window.show()
+        app.processEvents()
+    measure("首次显示", show_window)
+    
+    print("启动耗时:")
+    for name, elapsed in timings:
+        print(f"  {elapsed * 1000:8.1f} ms  {name}")
+    print(f"  {(time.perf_counter() - _START_TIME) * 1000:8.1f} ms  窗口可见（合计）")
+    sys.exit(app.exec())
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='ESP32S3 Sense 音频可视化器')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='输出启动各阶段（导入、创建窗口、首次显示）耗时')
+    args, qt_args = parser.parse_known_args()
+    sys.argv = sys.argv[:1] + qt_args
+    
     print("ESP32S3 Sense 音频可视化器")
     print("=" * 40)
     
@@ -60,6 +92,8 @@ def main():
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
         
         # 导入并运行主程序
+        if args.profile_startup:
+            profile_startup()
         from app import main
         main()
     except Exception as e:
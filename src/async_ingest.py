@@ -0,0 +1,191 @@
+"""
+异步接收 - 一个asyncio事件循环同时接收多个设备，每个设备独立的解析器与样本环
+"""
+
+import asyncio
+import threading
+from frame_protocol import FrameParser, DEFAULT_READ_SIZE
+from ring_buffer import SPSCSampleRing
+
+# 连接超时与断线重连间隔（秒）
+CONNECT_TIMEOUT = 5.0
+RECONNECT_DELAY = 2.0
+
+
+class DeviceConnection:
+    """单个设备的接收状态
+
+    与 StreamReceiver 一样提供 sample_ring、parser、samples_received 与 connected，
+    分析引擎（AnalysisEngine / ComputeWorker）直接从 sample_ring 取样本。
+    on_frame(frame) 在事件循环线程中对每个解码出的帧调用（例如转发中心）。
+    """
+
+    def __init__(self, name, host, port, sample_ring=None, read_size=DEFAULT_READ_SIZE,
+                 on_frame=None):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.sample_ring = sample_ring if sample_ring is not None else SPSCSampleRing()
+        # 同时写入的其他样本环（例如打开的完整分析视图）；只在事件循环线程中写入，
+        # 增删时整体替换元组，不需要加锁
+        self.taps = ()
+        self.on_frame = on_frame
+        # 每个连接单次最多读取 read_size 字节，直接读入预分配的接收缓冲区
+        self.parser = FrameParser(read_size=read_size)
+        self.samples_received = 0
+        self.connected = False
+        self.connect_count = 0
+        self.message = "未连接"
+        self.transport = None
+        self.task = None
+
+    def add_tap(self, sample_ring):
+        """之后到达的样本同时写入 sample_ring（可在任意线程调用）"""
+        self.taps = self.taps + (sample_ring,)
+
+    def remove_tap(self, sample_ring):
+        self.taps = tuple(ring for ring in self.taps if ring is not sample_ring)
+
+
+class DeviceProtocol(asyncio.BufferedProtocol):
+    """设备连接的asyncio协议
+
+    事件循环把数据直接读入解析器的接收缓冲区（与 recv_into 相同，没有中间
+    bytes 对象），解析出的帧写入设备的样本环。
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self.closed = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport):
+        # 每个连接重新自动检测传输模式（二进制帧或JSON/文本）
+        self.device.parser.reset()
+
+    def get_buffer(self, sizehint):
+        return self.device.parser.receive_buffer()
+
+    def buffer_updated(self, nbytes):
+        device = self.device
+        for frame in device.parser.received(nbytes):
+            device.sample_ring.write(frame)
+            for ring in device.taps:
+                ring.write(frame)
+            device.samples_received += len(frame)
+            if device.on_frame is not None:
+                device.on_frame(frame)
+
+    def connection_lost(self, exc):
+        if not self.closed.done():
+            self.closed.set_result(exc)
+
+
+class AsyncIngest:
+    """多设备异步接收器
+
+    所有设备由后台线程中的一个asyncio事件循环处理：每个设备一个协程负责连接、
+    等待断开与自动重连，数据到达时在事件循环线程中解析并写入该设备的样本环
+    （每个样本环只有这一个生产者）。add_device / remove_device 可在任意线程调用。
+    连接状态变化时在事件循环线程中调用 on_status(device, connected, message)，
+    Qt前端把它连接到信号即可以排队方式送到GUI线程。
+    """
+
+    def __init__(self, on_status=None, reconnect_delay=RECONNECT_DELAY,
+                 connect_timeout=CONNECT_TIMEOUT):
+        self.on_status = on_status
+        self.reconnect_delay = reconnect_delay
+        self.connect_timeout = connect_timeout
+        self.devices = {}
+        self.loop = None
+        self.thread = None
+
+    def add_device(self, name, host, port, sample_ring=None, read_size=DEFAULT_READ_SIZE,
+                   on_frame=None):
+        """添加设备并开始连接，返回 DeviceConnection"""
+        if name in self.devices:
+            raise ValueError(f"设备已存在: {name}")
+        device = DeviceConnection(name, host, port, sample_ring, read_size, on_frame)
+        self.devices[name] = device
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._start_device, device)
+        return device
+
+    def remove_device(self, name):
+        """断开并移除设备（等待连接关闭）"""
+        device = self.devices.pop(name)
+        if self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self._stop_device(device), self.loop).result()
+        return device
+
+    def start(self):
+        """在后台线程中启动事件循环"""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """断开所有设备并停止事件循环"""
+        if self.loop is None:
+            return
+        devices = list(self.devices.values())
+        asyncio.run_coroutine_threadsafe(self._stop_devices(devices), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.loop = None
+        self.thread = None
+
+    def _run(self):
+        """事件循环线程函数"""
+        asyncio.set_event_loop(self.loop)
+        for device in list(self.devices.values()):
+            self._start_device(device)
+        self.loop.run_forever()
+
+    def _set_status(self, device, connected, message):
+        device.connected = connected
+        device.message = message
+        if self.on_status is not None:
+            self.on_status(device, connected, message)
+
+    def _start_device(self, device):
+        if device.task is None:
+            device.task = self.loop.create_task(self._maintain(device))
+
+    async def _stop_device(self, device):
+        if device.task is not None:
+            device.task.cancel()
+            await asyncio.gather(device.task, return_exceptions=True)
+            device.task = None
+
+    async def _stop_devices(self, devices):
+        await asyncio.gather(*(self._stop_device(device) for device in devices))
+
+    async def _maintain(self, device):
+        """连接设备，断开后按 reconnect_delay 重连，直到被取消"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    transport, protocol = await asyncio.wait_for(
+                        loop.create_connection(lambda: DeviceProtocol(device),
+                                               device.host, device.port),
+                        self.connect_timeout)
+                except (OSError, asyncio.TimeoutError) as e:
+                    self._set_status(device, False, f"连接失败: {str(e) or '超时'}")
+                else:
+                    device.transport = transport
+                    device.connect_count += 1
+                    self._set_status(device, True, f"已连接到 {device.host}:{device.port}")
+                    exc = await protocol.closed
+                    device.transport = None
+                    self._set_status(device, False,
+                                     f"连接错误: {exc}" if exc else "设备关闭了连接")
+                await asyncio.sleep(self.reconnect_delay)
+        finally:
+            if device.transport is not None:
+                device.transport.close()
+                device.transport = None
+            if device.connected:
+                self._set_status(device, False, "已断开连接")
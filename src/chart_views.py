@@ -0,0 +1,66 @@
+"""
+图表视图切换 - 图元只创建一次，切换时只改变可见性、坐标轴标签与范围
+"""
+
+
+class ChartViewManager:
+    """在同一个PlotWidget上管理多个视图
+
+    每个视图登记自己的图元（曲线、ImageItem等，需提供 setVisible）、
+    坐标轴标签、标题与初始范围。切换视图时隐藏/显示图元，并保存离开时的
+    可见范围、回到该视图时恢复，不再 clear() 后重新创建图元。
+    """
+
+    def __init__(self, plot_widget):
+        self.plot_widget = plot_widget
+        self.views = {}
+        self.current = None
+
+    def add_view(self, name, items, left, bottom, title, x_range=None, y_range=None):
+        """登记视图；x_range/y_range 为None时该轴自动缩放"""
+        for item in items:
+            item.setVisible(False)
+        self.views[name] = {
+            'items': items,
+            'left': left,
+            'bottom': bottom,
+            'title': title,
+            'x_range': x_range,
+            'y_range': y_range,
+            'saved': None,  # 离开视图时的 (范围, 自动缩放状态)
+        }
+
+    def show(self, name):
+        """切换到指定视图"""
+        if name == self.current:
+            return
+        view_box = self.plot_widget.plotItem.vb
+        if self.current is not None:
+            previous = self.views[self.current]
+            previous['saved'] = (view_box.viewRange(), view_box.autoRangeEnabled())
+            for item in previous['items']:
+                item.setVisible(False)
+
+        view = self.views[name]
+        self.current = name
+        self.plot_widget.setLabel('left', view['left'])
+        self.plot_widget.setLabel('bottom', view['bottom'])
+        self.plot_widget.setTitle(view['title'])
+        for item in view['items']:
+            item.setVisible(True)
+
+        if view['saved'] is not None:
+            (x_range, y_range), (x_auto, y_auto) = view['saved']
+            self._apply_axis('x', x_range, x_auto)
+            self._apply_axis('y', y_range, y_auto)
+        else:
+            self._apply_axis('x', view['x_range'], view['x_range'] is None)
+            self._apply_axis('y', view['y_range'], view['y_range'] is None)
+
+    def _apply_axis(self, axis, value_range, auto):
+        if auto:
+            self.plot_widget.enableAutoRange(axis=axis)
+        elif axis == 'x':
+            self.plot_widget.setXRange(*value_range)
+        else:
+            self.plot_widget.setYRange(*value_range)
@@ -0,0 +1,23 @@
+"""
+分析线程 - AnalysisEngine 的Qt前端，新帧通过信号通知GUI线程
+"""
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from engine import AnalysisEngine
+
+
+class FrameNotifier(QObject):
+    frame_ready = pyqtSignal()  # 有新的待取帧，GUI线程调用 take_frame() 取走
+
+
+class ComputeWorker(AnalysisEngine):
+    """在Qt应用中使用的分析引擎
+
+    分析逻辑全部在 AnalysisEngine 中；分析线程产生新帧时发出 frame_ready 信号，
+    连接到GUI对象的槽时以排队方式在GUI线程中执行。
+    """
+
+    def __init__(self, sample_ring, history_samples, **kwargs):
+        self.notifier = FrameNotifier()
+        self.frame_ready = self.notifier.frame_ready
+        super().__init__(sample_ring, history_samples, on_frame=self.frame_ready.emit, **kwargs)
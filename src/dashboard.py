@@ -0,0 +1,90 @@
+"""
+仪表盘 - 波形、频谱、瀑布图与电平表同时显示，共用分析线程的同一帧结果
+"""
+
+import pyqtgraph as pg
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar
+from envelope import to_dbfs, LEVEL_FLOOR_DB
+from spectrogram_view import SpectrogramView
+
+
+class DashboardWidget(QWidget):
+    """多视图仪表盘
+
+    各视图需要的分析结果由 products 声明，分析线程每帧对每种结果只计算
+    一次、所有视图共用；瀑布图与单视图模式的瀑布图共用同一个dB频谱缓冲区，
+    频谱曲线取自同一个流式STFT，增加视图不会对同样的数据再做一次FFT。
+    """
+
+    products = ('waveform', 'spectrum', 'peak_frequency', 'level')
+
+    def __init__(self, spectrogram):
+        super().__init__()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+        self.plots = pg.GraphicsLayoutWidget()
+        self.plots.setBackground('w')
+        layout.addWidget(self.plots, 1)
+
+        # 波形 - 占满第一行
+        self.waveform_plot = self.plots.addPlot(row=0, col=0, colspan=2, title='音频波形')
+        self.waveform_plot.showGrid(x=True, y=True)
+        self.waveform_plot.setLabel('left', '振幅')
+        self.waveform_plot.setLabel('bottom', '时间')
+        self.waveform_plot.setYRange(-32768, 32768)
+        self.waveform_curve = self.waveform_plot.plot(pen=pg.mkPen('b', width=1))
+
+        # 频谱 - 线性幅度归一化到0-1，显示0-8kHz
+        self.spectrum_plot = self.plots.addPlot(row=1, col=0, title='音频频谱')
+        self.spectrum_plot.showGrid(x=True, y=True)
+        self.spectrum_plot.setLabel('left', '幅度')
+        self.spectrum_plot.setLabel('bottom', '频率 (Hz)')
+        self.spectrum_plot.setXRange(0, 8000)
+        self.spectrum_plot.setYRange(0, 1)
+        self.spectrum_curve = self.spectrum_plot.plot(pen=pg.mkPen('r', width=2))
+
+        # 瀑布图 - 横轴为时间，纵轴为频率，颜色表示dB
+        self.spectrogram_plot = self.plots.addPlot(row=1, col=1, title='音频瀑布图')
+        self.spectrogram_plot.setLabel('left', '频率 (Hz)')
+        self.spectrogram_plot.setLabel('bottom', '时间 (秒)')
+        self.spectrogram_plot.setYRange(0, 8000)
+        self.spectrogram_view = SpectrogramView(self.spectrogram_plot, spectrogram)
+
+        # 电平表与主频
+        meter_layout = QHBoxLayout()
+        self.rms_meter = self._create_meter(meter_layout, "RMS:")
+        self.peak_meter = self._create_meter(meter_layout, "峰值:")
+        self.peak_frequency_label = QLabel("主频: -- Hz")
+        meter_layout.addWidget(self.peak_frequency_label)
+        layout.addLayout(meter_layout)
+
+    @staticmethod
+    def _create_meter(layout, title):
+        layout.addWidget(QLabel(title))
+        meter = QProgressBar()
+        meter.setRange(int(LEVEL_FLOOR_DB), 0)
+        meter.setValue(int(LEVEL_FLOOR_DB))
+        meter.setFormat("%v dBFS")
+        layout.addWidget(meter, 1)
+        return meter
+
+    @property
+    def waveform_view_box(self):
+        return self.waveform_plot.vb
+
+    def update_frame(self, frame):
+        """用一帧分析结果刷新全部视图（只调用setData/setImage）"""
+        if 'waveform' in frame:
+            self.waveform_curve.setData(*frame['waveform'])
+        if 'spectrum' in frame:
+            self.spectrum_curve.setData(*frame['spectrum'])
+        self.spectrogram_view.update()
+
+        if 'level' in frame:
+            level_rms, level_peak = frame['level']
+            self.rms_meter.setValue(int(max(to_dbfs(level_rms), LEVEL_FLOOR_DB)))
+            self.peak_meter.setValue(int(max(to_dbfs(level_peak), LEVEL_FLOOR_DB)))
+        if 'peak_frequency' in frame:
+            self.peak_frequency_label.setText(f"主频: {frame['peak_frequency']:.0f} Hz")
@@ -0,0 +1,310 @@
+"""
+设备总览 - 每个设备一个轻量磁贴（缩略波形、电平、吞吐量、状态），低频刷新，点击打开完整分析视图
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+import pyqtgraph as pg
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                             QGridLayout, QLabel, QLineEdit, QPushButton, QSpinBox, QScrollArea)
+from PyQt6.QtCore import Qt, QTimer, QRectF, pyqtSignal
+from PyQt6.QtGui import QPainter, QPainterPath, QPen, QColor
+from ring_buffer import SPSCSampleRing
+from device_registry import DeviceRegistry
+from envelope import to_dbfs, LEVEL_FLOOR_DB
+
+# 总览刷新率：磁贴只显示趋势，远低于单设备视图的帧率
+OVERVIEW_FPS = 5
+
+TILE_COLUMNS = 4
+TILE_WIDTH = 220
+TILE_HEIGHT = 110
+
+# 缩略波形纵轴按显示数据的峰值缩放，至少为满幅的1%（静音时不放大噪声）
+SPARKLINE_MIN_SCALE = 328
+
+# 峰值超过该电平时电平条显示为红色
+PEAK_WARNING_DB = -3.0
+
+# 刷新耗时指数平均的平滑系数
+REFRESH_TIME_SMOOTHING = 0.2
+
+
+def parse_device(spec):
+    """解析 "名称=IP:端口" 或 "IP:端口"（名称默认为地址）"""
+    name, _, address = spec.rpartition('=')
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"设备格式应为 名称=IP:端口 或 IP:端口: {spec}")
+    return name or address, host, int(port)
+
+
+class DeviceTile(QWidget):
+    """单个设备的磁贴
+
+    不使用绘图控件：缩略波形由 pyqtgraph 的 arrayToQPath 一次转换为路径，
+    在 paintEvent 中用 QPainter 直接绘制，每个磁贴每次刷新只需绘制一条路径、
+    一个电平条和两行文字。
+    """
+
+    activated = pyqtSignal(str)
+
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.setMinimumSize(TILE_WIDTH, TILE_HEIGHT)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.setToolTip("点击打开完整分析视图")
+        self.path = QPainterPath()
+        self.connected = False
+        self.message = "未连接"
+        self.rate_text = ""
+        self.rms_db = LEVEL_FLOOR_DB
+        self.peak_db = LEVEL_FLOOR_DB
+
+    def refresh(self, entry):
+        """从注册表条目更新显示内容并请求重绘"""
+        x_data, y_data = entry.sparkline_data
+        if len(y_data) > 1:
+            x_data = x_data - x_data[0]
+            # 横轴归一化到0-1，纵轴按峰值归一化到-1~1，绘制时再缩放到磁贴大小
+            scale = max(int(np.abs(y_data.astype(np.int32)).max()), SPARKLINE_MIN_SCALE)
+            self.path = pg.arrayToQPath(x_data / max(x_data[-1], 1.0), y_data / scale)
+        level_rms, level_peak = entry.level
+        self.rms_db = max(float(to_dbfs(level_rms)), LEVEL_FLOOR_DB)
+        self.peak_db = max(float(to_dbfs(level_peak)), LEVEL_FLOOR_DB)
+        self.connected = entry.connected
+        self.message = entry.message
+        self.rate_text = f"{entry.samples_per_second / 1000:.1f}k 样本/秒"
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = QRectF(self.rect()).adjusted(1, 1, -1, -1)
+        painter.fillRect(rect, QColor('white'))
+        painter.setPen(QPen(QColor('green' if self.connected else 'red'), 2))
+        painter.drawRect(rect)
+
+        # 标题行：名称与吞吐量
+        text_rect = rect.adjusted(6, 4, -6, 0)
+        painter.setPen(QColor('black'))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, self.name)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop,
+                         self.rate_text)
+
+        # 缩略波形（未连接时显示状态）
+        wave_rect = QRectF(rect.left() + 6, rect.top() + 24, rect.width() - 12, rect.height() - 46)
+        if self.connected:
+            painter.save()
+            painter.translate(wave_rect.left(), wave_rect.center().y())
+            painter.scale(wave_rect.width(), -wave_rect.height() / 2)
+            pen = QPen(QColor('blue'))
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawPath(self.path)
+            painter.restore()
+        else:
+            painter.setPen(QColor('gray'))
+            painter.drawText(wave_rect, Qt.AlignmentFlag.AlignCenter, self.message)
+
+        # 电平条：长度为RMS，颜色按峰值
+        bar_rect = QRectF(rect.left() + 6, rect.bottom() - 16, rect.width() - 12, 10)
+        painter.fillRect(bar_rect, QColor(230, 230, 230))
+        fraction = (self.rms_db - LEVEL_FLOOR_DB) / -LEVEL_FLOOR_DB
+        color = QColor('red') if self.peak_db > PEAK_WARNING_DB else QColor(0, 170, 0)
+        painter.fillRect(QRectF(bar_rect.left(), bar_rect.top(), bar_rect.width() * fraction,
+                                bar_rect.height()), color)
+        painter.end()
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.activated.emit(self.name)
+
+
+class DeviceOverviewWidget(QScrollArea):
+    """设备磁贴网格
+
+    低频定时器调用 registry.poll() 取走所有设备的新样本，只有数据或状态
+    有变化的磁贴才会重绘；Qt把同一轮事件中的重绘请求合并为一次绘制。
+    """
+
+    device_activated = pyqtSignal(str)
+
+    def __init__(self, registry, columns=TILE_COLUMNS, fps=OVERVIEW_FPS):
+        super().__init__()
+        self.registry = registry
+        self.columns = columns
+        self.tiles = {}
+        self.refresh_time = 0.0  # 每次刷新（取样本、更新磁贴）耗时的指数平均（秒）
+
+        container = QWidget()
+        self.grid = QGridLayout()
+        self.grid.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        container.setLayout(self.grid)
+        self.setWidget(container)
+        self.setWidgetResizable(True)
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(int(1000 / fps))
+
+    def sync_tiles(self):
+        """按注册表增删磁贴并重新排列"""
+        for name in list(self.tiles):
+            if name not in self.registry:
+                tile = self.tiles.pop(name)
+                self.grid.removeWidget(tile)
+                tile.deleteLater()
+        for entry in self.registry:
+            if entry.name not in self.tiles:
+                tile = DeviceTile(entry.name)
+                tile.activated.connect(self.device_activated)
+                self.tiles[entry.name] = tile
+        for index, tile in enumerate(self.tiles.values()):
+            self.grid.addWidget(tile, index // self.columns, index % self.columns)
+
+    def refresh(self):
+        """取走新样本并更新有变化的磁贴"""
+        start = time.perf_counter()
+        for entry in self.registry.poll():
+            tile = self.tiles.get(entry.name)
+            if tile is not None:
+                tile.refresh(entry)
+        elapsed = time.perf_counter() - start
+        self.refresh_time += REFRESH_TIME_SMOOTHING * (elapsed - self.refresh_time)
+
+
+class DeviceOverviewWindow(QMainWindow):
+    """设备总览主窗口"""
+
+    def __init__(self, devices=()):
+        super().__init__()
+        self.setWindowTitle("ESP32S3 Sense 设备总览")
+        self.setGeometry(100, 100, 1000, 700)
+
+        # 所有设备共用一个事件循环接收；每个设备独立的样本缓冲与统计
+        self.registry = DeviceRegistry()
+        self.detail_windows = {}
+
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout()
+        central_widget.setLayout(main_layout)
+
+        # 添加/移除设备
+        device_layout = QHBoxLayout()
+        device_layout.addWidget(QLabel("名称:"))
+        self.name_input = QLineEdit()
+        self.name_input.setPlaceholderText("默认为 IP:端口")
+        device_layout.addWidget(self.name_input)
+        device_layout.addWidget(QLabel("设备IP:"))
+        self.ip_input = QLineEdit("192.168.0.194")
+        device_layout.addWidget(self.ip_input)
+        device_layout.addWidget(QLabel("端口:"))
+        self.port_input = QSpinBox()
+        self.port_input.setRange(1, 65535)
+        self.port_input.setValue(8080)
+        device_layout.addWidget(self.port_input)
+        self.add_btn = QPushButton("添加")
+        self.add_btn.clicked.connect(self.add_device)
+        device_layout.addWidget(self.add_btn)
+        self.remove_btn = QPushButton("移除")
+        self.remove_btn.clicked.connect(self.remove_device)
+        device_layout.addWidget(self.remove_btn)
+        main_layout.addLayout(device_layout)
+
+        self.summary_label = QLabel("设备: 0")
+        main_layout.addWidget(self.summary_label)
+
+        self.overview = DeviceOverviewWidget(self.registry)
+        self.overview.device_activated.connect(self.open_device)
+        main_layout.addWidget(self.overview, 1)
+
+        for name, host, port in devices:
+            self.registry.add_device(name, host, port)
+        self.overview.sync_tiles()
+        self.registry.start()
+
+        # 汇总信息每秒刷新一次
+        self.info_timer = QTimer()
+        self.info_timer.timeout.connect(self.update_summary)
+        self.info_timer.start(1000)
+
+    def add_device(self):
+        """添加设备"""
+        host = self.ip_input.text().strip()
+        port = self.port_input.value()
+        name = self.name_input.text().strip() or f"{host}:{port}"
+        if name in self.registry:
+            self.summary_label.setText(f"设备已存在: {name}")
+            return
+        self.registry.add_device(name, host, port)
+        self.overview.sync_tiles()
+
+    def remove_device(self):
+        """移除名称输入框中的设备"""
+        name = self.name_input.text().strip()
+        if name not in self.registry:
+            self.summary_label.setText(f"没有该设备: {name}")
+            return
+        window = self.detail_windows.get(name)
+        if window is not None:
+            window.close()
+        self.registry.remove_device(name)
+        self.overview.sync_tiles()
+
+    def open_device(self, name):
+        """打开设备的完整分析视图（已打开时切换到该窗口）"""
+        window = self.detail_windows.get(name)
+        if window is not None:
+            window.raise_()
+            window.activateWindow()
+            return
+        from app import AudioVisualizerApp
+        sample_ring = SPSCSampleRing()
+        window = AudioVisualizerApp(sample_ring=sample_ring, device_name=name)
+        window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        window.destroyed.connect(lambda *args: self.close_device(name, sample_ring))
+        self.registry.attach(name, sample_ring)
+        self.detail_windows[name] = window
+        window.show()
+
+    def close_device(self, name, sample_ring):
+        """完整分析视图关闭后不再向它转发样本"""
+        self.registry.detach(name, sample_ring)
+        self.detail_windows.pop(name, None)
+
+    def update_summary(self):
+        entries = list(self.registry)
+        connected = sum(entry.connected for entry in entries)
+        rate = sum(entry.samples_per_second for entry in entries)
+        self.summary_label.setText(f"设备: {len(entries)}  已连接: {connected}  "
+                                   f"总吞吐: {rate / 1000:.1f}k 样本/秒  "
+                                   f"刷新: {self.overview.refresh_time * 1000:.2f} ms")
+
+    def closeEvent(self, event):
+        for window in list(self.detail_windows.values()):
+            window.close()
+        self.overview.timer.stop()
+        self.info_timer.stop()
+        self.registry.stop()
+        super().closeEvent(event)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='ESP32S3 Sense 设备总览')
+    parser.add_argument('devices', nargs='*', help='设备，格式为 名称=IP:端口 或 IP:端口')
+    args, qt_args = parser.parse_known_args()
+    devices = [parse_device(spec) for spec in args.devices]
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    app.setStyle('Fusion')
+    window = DeviceOverviewWindow(devices)
+    window.show()
+    sys.exit(app.exec())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+设备注册表 - 多个设备的连接、样本缓冲、状态与吞吐量统计
+"""
+
+import time
+import numpy as np
+from ring_buffer import AudioRingBuffer
+from waveform import MinMaxDecimator
+from async_ingest import AsyncIngest, RECONNECT_DELAY
+from engine import SAMPLE_RATE
+
+# 每个设备保留的历史时长（秒），即总览磁贴上缩略波形的时长
+DEVICE_HISTORY_SECONDS = 5
+
+# 缩略波形的像素宽度（每像素一对最小/最大值）
+SPARKLINE_PIXELS = 120
+
+# 电平按最近0.1秒的样本计算
+LEVEL_WINDOW = SAMPLE_RATE // 10
+
+# 吞吐量指数平均的平滑系数
+THROUGHPUT_SMOOTHING = 0.3
+
+
+class DeviceEntry:
+    """注册表中的一个设备
+
+    connection 是 AsyncIngest 的 DeviceConnection，事件循环线程写入它的样本环；
+    poll() 在使用方线程中取走新样本，写入本设备的历史缓冲区，并更新缩略波形、
+    电平与吞吐量。
+    """
+
+    def __init__(self, connection, history_samples):
+        self.connection = connection
+        self.audio_buffer = AudioRingBuffer(history_samples)
+        self.sparkline = MinMaxDecimator(self.audio_buffer, SPARKLINE_PIXELS)
+        self.sparkline_data = (np.zeros(0), np.zeros(0, dtype=np.int16))
+        self.level = (0.0, 0.0)  # 最近0.1秒的 (RMS, 峰值)
+        self.samples_per_second = 0.0
+        self._last_poll = None
+        self._last_samples = 0
+        self._last_status = None
+
+    @property
+    def name(self):
+        return self.connection.name
+
+    @property
+    def connected(self):
+        return self.connection.connected
+
+    @property
+    def message(self):
+        return self.connection.message
+
+    @property
+    def overrun_count(self):
+        return self.connection.sample_ring.overrun_count
+
+    def poll(self, now):
+        """取走新样本并更新统计，返回是否有变化（新数据或状态变化）"""
+        connection = self.connection
+        received = connection.samples_received
+        if self._last_poll is not None and now > self._last_poll:
+            rate = (received - self._last_samples) / (now - self._last_poll)
+            self.samples_per_second += THROUGHPUT_SMOOTHING * (rate - self.samples_per_second)
+        self._last_poll = now
+        self._last_samples = received
+
+        status = (connection.connected, connection.message)
+        changed = status != self._last_status
+        self._last_status = status
+
+        samples = connection.sample_ring.read_available()
+        if len(samples):
+            self.audio_buffer.append(samples)
+            recent = self.audio_buffer.latest(LEVEL_WINDOW).astype(np.float64)
+            self.level = (float(np.sqrt(np.mean(recent * recent))), float(np.abs(recent).max()))
+            self.sparkline_data = self.sparkline.update()
+            changed = True
+        return changed
+
+
+class DeviceRegistry:
+    """多设备注册表
+
+    所有设备由一个 AsyncIngest 事件循环接收，每个设备一个 DeviceEntry。
+    poll() 由使用方（设备总览的低频定时器或无界面程序）定期调用。
+    连接状态变化时在事件循环线程中调用 on_status(name, connected, message)。
+    """
+
+    def __init__(self, history_seconds=DEVICE_HISTORY_SECONDS, on_status=None,
+                 reconnect_delay=RECONNECT_DELAY):
+        self.history_samples = int(history_seconds * SAMPLE_RATE)
+        self.on_status = on_status
+        self.ingest = AsyncIngest(on_status=self._on_status, reconnect_delay=reconnect_delay)
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(list(self.entries.values()))
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def __getitem__(self, name):
+        return self.entries[name]
+
+    def add_device(self, name, host, port):
+        """添加设备（已启动时立即开始连接），返回 DeviceEntry"""
+        connection = self.ingest.add_device(name, host, port)
+        entry = DeviceEntry(connection, self.history_samples)
+        self.entries[name] = entry
+        return entry
+
+    def remove_device(self, name):
+        """断开并移除设备"""
+        self.ingest.remove_device(name)
+        return self.entries.pop(name)
+
+    def start(self):
+        self.ingest.start()
+
+    def stop(self):
+        self.ingest.stop()
+
+    def attach(self, name, sample_ring):
+        """设备之后到达的样本同时写入 sample_ring（例如完整分析视图的分析线程）"""
+        self.entries[name].connection.add_tap(sample_ring)
+
+    def detach(self, name, sample_ring):
+        if name in self.entries:
+            self.entries[name].connection.remove_tap(sample_ring)
+
+    def poll(self):
+        """取走所有设备的新样本，返回有变化的设备列表"""
+        now = time.perf_counter()
+        return [entry for entry in self if entry.poll(now)]
+
+    def _on_status(self, connection, connected, message):
+        if self.on_status is not None:
+            self.on_status(connection.name, connected, message)
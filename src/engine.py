@@ -0,0 +1,425 @@
+"""
+无界面分析引擎 - 接收、缓冲与分析的公共核心，不依赖Qt，通过普通回调通知使用方
+"""
+
+import time
+import socket
+import threading
+import numpy as np
+from frame_protocol import FrameParser
+from ring_buffer import AudioRingBuffer
+from sliding_stats import SlidingStats
+from waveform import MinMaxDecimator
+from stft import StreamingSTFT
+from envelope import EnvelopeTracker
+from pyramid import AudioPyramid
+from serial_ingest import SerialStream, parse_serial_address
+from udp_ingest import (JitterBuffer, DEFAULT_JITTER_FRAMES, MAX_DATAGRAM_SIZE,
+                        parse_udp_address, open_udp_socket, decode_datagram)
+
+SAMPLE_RATE = 16000
+
+# 默认每秒生成的分析帧数，GUI刷新调度的默认目标帧率也取此值
+DEFAULT_FPS = 20
+
+# 取样本的最长间隔（秒）：目标帧率很低时也要及时取走样本环中的数据
+INGEST_PERIOD = 0.02
+
+# 分析耗时指数平均的平滑系数
+COMPUTE_TIME_SMOOTHING = 0.2
+
+
+class StreamReceiver:
+    """设备数据接收器
+
+    接收线程解析二进制帧或换行分隔的JSON/CSV数据（每个连接自动检测），
+    直接写入样本环（无锁），由分析引擎定期取走。连接状态变化时调用
+    on_status(connected, message)，可能在调用方线程或接收线程中调用。
+    指定 publisher（SharedSamplePublisher）时样本同时发布到共享内存，
+    供同一主机上的其他分析进程读取。host 为串口地址（COM3、/dev/ttyACM0，
+    可加 @波特率）时改为通过串口接收，port 不使用，解析方式相同。host 为
+    udp://[本机地址] 时在 port 上接收UDP数据报（每个数据报一个二进制帧），
+    经抖动缓冲（jitter_frames 帧深度，jitter_fill 补偿方式）按序写入样本环。
+    """
+
+    def __init__(self, sample_ring, host='192.168.0.194', port=8080, read_size=65536,
+                 on_status=None, publisher=None, jitter_frames=DEFAULT_JITTER_FRAMES,
+                 jitter_fill='zero'):
+        self.sample_ring = sample_ring
+        self.publisher = publisher
+        self.host = host
+        self.port = port
+        self.on_status = on_status
+        self.socket = None
+        self.connected = False
+        self.running = False
+        self.receive_thread = None
+        # 解析二进制帧或换行分隔的JSON数据，接收缓冲区预分配并复用
+        self.parser = FrameParser(read_size=read_size)
+        self.samples_received = 0
+        # UDP模式的抖动缓冲参数，连接时创建 jitter_buffer（其他模式为None）
+        self.jitter_frames = jitter_frames
+        self.jitter_fill = jitter_fill
+        self.jitter_buffer = None
+
+    def _set_status(self, connected, message):
+        self.connected = connected
+        if self.on_status is not None:
+            self.on_status(connected, message)
+
+    def connect_to_device(self):
+        """连接到ESP32S3设备"""
+        # 上一次连接异常断开时留下的套接字/串口
+        self._close_socket(self.socket)
+        try:
+            self.jitter_buffer = None
+            udp_host = parse_udp_address(self.host)
+            if udp_host is not None:
+                self.socket = open_udp_socket(udp_host, self.port)
+                self.jitter_buffer = JitterBuffer(self.jitter_frames, self.jitter_fill)
+                self._set_status(True, f"正在接收UDP {udp_host}:{self.port}")
+                return True
+            serial_address = parse_serial_address(self.host)
+            if serial_address is not None:
+                self.socket = SerialStream(*serial_address)
+                self._set_status(True, f"已连接到串口 {serial_address[0]}")
+                return True
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.settimeout(5)
+            self.socket.connect((self.host, self.port))
+            self._set_status(True, f"已连接到 {self.host}:{self.port}")
+            return True
+        except Exception as e:
+            self._set_status(False, f"连接失败: {str(e)}")
+            return False
+
+    def disconnect_from_device(self):
+        """断开与设备的连接"""
+        self.running = False
+        self._close_socket(self.socket)
+        self._set_status(False, "已断开连接")
+
+    def _close_socket(self, sock):
+        """关闭连接；仍是当前连接时同时清除引用"""
+        if sock is None:
+            return
+        try:
+            sock.close()
+        except Exception:
+            pass
+        if self.socket is sock:
+            self.socket = None
+
+    def start_receiving(self):
+        """开始接收数据"""
+        if not self.connected:
+            return
+
+        self.running = True
+        target = self._receive_data if self.jitter_buffer is None else self._receive_datagrams
+        self.receive_thread = threading.Thread(target=target)
+        self.receive_thread.daemon = True
+        self.receive_thread.start()
+
+    def _receive_data(self):
+        """接收数据的线程函数"""
+        # 每个连接重新自动检测传输模式（二进制帧或JSON/文本）
+        self.parser.reset()
+        sock = self.socket
+        error = None
+        while self.running and self.connected:
+            try:
+                frames = self.parser.receive(sock)
+                if frames is None:
+                    # 串口被 disconnect_from_device() 关闭时同样返回None，不再报告
+                    if self.running:
+                        print("设备关闭了连接")
+                        error = "设备关闭了连接"
+                    break
+                self._write_frames(frames, self.parser.sample_rate)
+            except socket.error as e:
+                # 串口的 SerialException 也是 OSError；disconnect_from_device() 关闭套接字时不再报告
+                if self.running:
+                    print(f"套接字错误: {e}")
+                    error = f"连接错误: {str(e)}"
+                break
+            except Exception as e:
+                print(f"接收数据错误: {e}")
+                error = f"连接错误: {str(e)}"
+                break
+        # 无论因何退出都先释放这个连接再报告断开：重连方收到状态时串口已关闭，
+        # Windows 上才能重新打开同一个COM口，也不会遗留文件描述符
+        self._close_socket(sock)
+        if error is not None:
+            self._set_status(False, error)
+
+    def _receive_datagrams(self):
+        """UDP接收线程函数：数据报经抖动缓冲按序写入样本环"""
+        sock = self.socket
+        jitter = self.jitter_buffer
+        buffer = bytearray(MAX_DATAGRAM_SIZE)
+        view = memoryview(buffer)
+        sample_rate = self.parser.sample_rate
+        while self.running:
+            try:
+                nbytes = sock.recv_into(buffer)
+            except socket.timeout:
+                # 一段时间没有数据报，不再等待缺失的帧
+                self._write_frames(jitter.flush(), sample_rate)
+                continue
+            except OSError as e:
+                if self.running:
+                    print(f"套接字错误: {e}")
+                    self._set_status(False, f"连接错误: {str(e)}")
+                break
+            datagram = decode_datagram(view[:nbytes])
+            if datagram is None:
+                continue
+            sequence, sample_rate, samples = datagram
+            self.parser.sample_rate = sample_rate
+            self._write_frames(jitter.push(sequence, samples), sample_rate)
+        self._close_socket(sock)
+
+    def _write_frames(self, frames, sample_rate):
+        for frame in frames:
+            self.sample_ring.write(frame)
+            if self.publisher is not None:
+                self.publisher.write(frame, sample_rate)
+            self.samples_received += len(frame)
+
+
+class AnalysisEngine:
+    """后台分析引擎
+
+    分析状态（环形缓冲区、滑动统计、波形抽取、STFT、包络、多分辨率索引）
+    只在持有锁时修改。分析线程定期从样本环取走新样本并增量更新，再按使用方
+    登记的视图所需的结果生成数组（全部为拷贝），放入待取帧。同时显示的多个
+    视图共用一帧结果，每种结果每帧只计算一次。使用方来不及取时新帧覆盖旧帧，
+    瀑布图新增的频谱列则累积到下一次被取走，只在没有待取帧时调用 on_frame
+    （在分析线程中调用），与接收器的帧合并方式相同。FFT、归约等NumPy大计算
+    期间会释放GIL，GUI线程可以照常处理输入与绘制。
+    """
+
+    def __init__(self, sample_ring, history_samples, fft_size=2048,
+                 envelope_block_size=None, pyramid=False, fps=DEFAULT_FPS, on_frame=None):
+        self.sample_ring = sample_ring
+        self.on_frame = on_frame  # 有新的待取帧时调用，使用方调用 take_frame() 取走
+        self.lock = threading.Lock()  # 保护分析状态、视图请求与待取帧
+
+        self.audio_buffer = AudioRingBuffer(history_samples)
+        self.stats = SlidingStats(self.audio_buffer)
+        self.waveform = MinMaxDecimator(self.audio_buffer)
+        self.stft = StreamingSTFT(sample_rate=SAMPLE_RATE, fft_size=fft_size, max_freq=8000)
+        self.envelope = EnvelopeTracker(envelope_block_size) if envelope_block_size else None
+        self.pyramid = AudioPyramid(self.audio_buffer) if pyramid else None
+
+        # 使用方登记的当前视图：需要的结果、绘图区像素宽度、横轴范围、是否跟随最新
+        self.view = {'products': (), 'pixels': 0, 'x_range': None, 'follow': True}
+        self._producers = {
+            'stats': self._produce_stats,
+            'waveform': self._produce_waveform,
+            'spectrum': self._produce_spectrum,
+            'peak_frequency': self._produce_peak_frequency,
+            'level': self._produce_level,
+            'envelope': self._produce_envelope,
+            'history': self._produce_history,
+        }
+        self._changed = False  # 有新数据
+        self._view_changed = True  # 视图或设置有变化
+        self._pending = None
+        self._columns = []
+        self.compute_time = 0.0  # 每个周期分析耗时的指数平均（秒）
+        self.error_count = 0  # 分析出错的周期数（出错的样本被丢弃，线程继续运行）
+        self.last_error = None
+        self.set_fps(fps)
+
+        self.running = False
+        self._wake = threading.Event()
+        self.thread = None
+
+    def set_fps(self, fps):
+        """每秒最多生成的帧数，与刷新调度的目标帧率一致"""
+        self.interval = 1.0 / max(1, fps)
+
+    def set_view(self, **view):
+        """登记当前视图，立即生成一帧"""
+        with self.lock:
+            self.view.update(view)
+            self._view_changed = True
+        self._wake.set()
+
+    def resize(self, history_samples):
+        """修改历史长度"""
+        with self.lock:
+            self.stats.resize(history_samples)
+            self._view_changed = True
+        self._wake.set()
+
+    def set_envelope_block_size(self, block_size):
+        """修改包络块大小，并从已有数据重新计算包络"""
+        with self.lock:
+            self.envelope.set_block_size(block_size)
+            self.envelope.rebuild(self.audio_buffer.latest())
+            self._view_changed = True
+        self._wake.set()
+
+    def take_frame(self):
+        """取走待取帧，没有时返回None"""
+        with self.lock:
+            frame = self._pending
+            self._pending = None
+            if frame is not None:
+                frame['columns'] = self._take_columns()
+            return frame
+
+    def start(self):
+        """启动分析线程"""
+        self.running = True
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """停止分析线程"""
+        self.running = False
+        self._wake.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        """分析线程函数"""
+        last_frame = 0.0
+        while self.running:
+            self._wake.wait(min(self.interval, INGEST_PERIOD))
+            self._wake.clear()
+            start = time.perf_counter()
+            try:
+                samples = self.sample_ring.read_available()
+                with self.lock:
+                    if len(samples):
+                        self._ingest(samples)
+                        self._changed = True
+                    # 视图变化时立即响应，数据变化时按目标帧率生成
+                    due = start - last_frame >= self.interval
+                    if not (self._view_changed or (self._changed and due)):
+                        continue
+                    self._changed = False
+                    self._view_changed = False
+                    frame = self._build_frame()
+                    notify = self._pending is None
+                    self._pending = frame
+            except Exception as e:
+                # 一帧数据出错不能让分析线程退出，否则使用方只会看到停止更新的结果
+                self.error_count += 1
+                self.last_error = str(e)
+                print(f"分析错误: {e}")
+                continue
+            last_frame = start
+            elapsed = time.perf_counter() - start
+            self.compute_time += COMPUTE_TIME_SMOOTHING * (elapsed - self.compute_time)
+            if notify and self.on_frame is not None:
+                self.on_frame()
+
+    def _ingest(self, samples):
+        """增量更新分析状态"""
+        self.stats.append(samples)
+        columns = self.stft.push(samples)
+        if len(columns):
+            self._columns.append(columns)
+        if self.envelope is not None:
+            self.envelope.push(samples)
+        if self.pyramid is not None:
+            self.pyramid.push(samples)
+
+    def _take_columns(self):
+        """取走累积的频谱列 (列数, 频点数)"""
+        if not self._columns:
+            return np.zeros((0, self.stft.num_bins), dtype=np.float32)
+        columns = self._columns[0] if len(self._columns) == 1 else np.concatenate(self._columns)
+        self._columns = []
+        return columns
+
+    def _build_frame(self):
+        """按当前视图需要的结果生成帧；每种结果在一帧内只计算一次，被所有视图共享"""
+        results = FrameResults(self._producers)
+        frame = {'stats': results['stats']}
+        if self.envelope is not None:
+            frame['level'] = results['level']
+        if len(self.audio_buffer):
+            for name in self.view['products']:
+                value = results[name]
+                if value is not None:
+                    frame[name] = value
+        return frame
+
+    def _produce_stats(self, results):
+        return self.stats.snapshot()
+
+    def _produce_waveform(self, results):
+        """逐像素最小/最大值抽取，只归约新到达的数据"""
+        self.waveform.set_pixels(self.view['pixels'])
+        x_data, y_data = self.waveform.update()
+        return x_data.copy(), y_data.copy()
+
+    def _produce_spectrum(self, results):
+        """流式STFT的最新频谱（线性幅度归一化到0-1），与瀑布图共用同一次FFT"""
+        audio_data = self.audio_buffer.latest()
+        if len(audio_data) < 64:  # 需要足够的数据点
+            return None
+        try:
+            spectrum = self.stft.normalized_spectrum(audio_data)
+            return self.stft.frequencies, spectrum.copy()
+        except Exception as e:
+            print(f"频谱计算错误: {e}")
+            return [], []
+
+    def _produce_peak_frequency(self, results):
+        """频谱峰值对应的频率"""
+        spectrum = results['spectrum']
+        if spectrum is None or not len(spectrum[1]):
+            return None
+        frequencies, magnitudes = spectrum
+        return float(frequencies[np.argmax(magnitudes)])
+
+    def _produce_level(self, results):
+        return self.envelope.level()
+
+    def _produce_envelope(self, results):
+        """RMS强度包络；数据不足一块时直接使用绝对值"""
+        audio_data = self.audio_buffer.latest()
+        block_count = len(audio_data) // self.envelope.block_size
+        if block_count:
+            intensity, _ = self.envelope.latest(block_count)
+            return np.arange(len(intensity)), intensity.copy()
+        return np.arange(len(audio_data)), np.abs(audio_data)
+
+    def _produce_history(self, results):
+        """按可见范围从金字塔中取合适的层级（绘制点数与屏幕宽度成正比）"""
+        x_min, x_max = self.view['x_range']
+        if self.view['follow']:
+            # 保持当前可见时长，右端对齐最新数据
+            latest = self.pyramid.total_samples / SAMPLE_RATE
+            x_min, x_max = latest - (x_max - x_min), latest
+        x_data, y_data, rms, decimation = self.pyramid.query(
+            x_min * SAMPLE_RATE, x_max * SAMPLE_RATE, self.view['pixels'])
+        x_data = x_data / SAMPLE_RATE
+        rms_data = (x_data[::2], rms) if rms is not None else ([], [])
+        return (x_min, x_max), (x_data, y_data.copy()), rms_data
+
+
+class FrameResults:
+    """单帧分析结果缓存
+
+    按名称取结果时才调用对应的计算函数，同一帧内重复取用直接返回缓存，
+    结果之间可以互相依赖（例如主频取自频谱），不会重复计算。
+    """
+
+    def __init__(self, producers):
+        self._producers = producers
+        self._values = {}
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            self._values[name] = self._producers[name](self)
+        return self._values[name]
@@ -0,0 +1,94 @@
+"""
+音频包络 - 向量化、增量计算的分块RMS/峰值
+"""
+
+import numpy as np
+from ring_buffer import AudioRingBuffer, MAX_HISTORY_SAMPLES
+
+DEFAULT_BLOCK_SIZE = 64
+
+# 电平表显示下限 (dBFS)
+LEVEL_FLOOR_DB = -60.0
+
+
+def to_dbfs(value):
+    """将幅度转换为相对int16满幅的dB值"""
+    return 20 * np.log10(np.maximum(value, 1e-6) / 32768.0)
+
+
+class EnvelopeTracker:
+    """分块RMS/峰值包络
+
+    新样本到达时调用 push()，凑满的块用 reshape 一次性计算RMS和峰值，
+    不足一块的余数留到下次；已算过的块不会重复计算。包络历史存放在
+    环形缓冲区中，波形/瀑布图、电平表与统计面板共用同一份结果。
+    """
+
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE, history_samples=MAX_HISTORY_SAMPLES):
+        self.history_samples = history_samples
+        self.set_block_size(block_size)
+
+    def set_block_size(self, block_size):
+        """修改块大小（清空包络历史）"""
+        if block_size <= 0:
+            raise ValueError("块大小必须大于0")
+        self.block_size = int(block_size)
+        capacity = max(1, self.history_samples // self.block_size)
+        self.rms = AudioRingBuffer(capacity, dtype=np.float32)
+        self.peak = AudioRingBuffer(capacity, dtype=np.float32)
+        self._tail = np.zeros(0, dtype=np.float32)  # 不足一块的剩余样本
+
+    def reset(self):
+        """清空包络历史"""
+        self.rms.clear()
+        self.peak.clear()
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def rebuild(self, samples):
+        """按当前块大小从历史样本重新计算全部包络"""
+        self.reset()
+        self.push(samples)
+
+    def __len__(self):
+        return len(self.rms)
+
+    @property
+    def version(self):
+        """包络数据版本号，有新块时变化"""
+        return self.rms.version
+
+    def push(self, samples):
+        """送入新样本，返回新计算出的块数"""
+        samples = np.asarray(samples, dtype=np.float32)
+        data = np.concatenate((self._tail, samples)) if len(self._tail) else samples
+        count = len(data) // self.block_size
+        used = count * self.block_size
+        self._tail = data[used:].copy()
+        if count == 0:
+            return 0
+
+        blocks = data[:used].reshape(count, self.block_size)
+        # float64累加平方和，避免int16满幅信号在float32中损失精度
+        mean_square = np.einsum('ij,ij->i', blocks, blocks, dtype=np.float64) / self.block_size
+        self.rms.append(np.sqrt(mean_square))
+        self.peak.append(np.max(np.abs(blocks), axis=1))
+        return count
+
+    def latest(self, count=None):
+        """返回最新count块的 (RMS, 峰值) 只读视图"""
+        return self.rms.latest(count), self.peak.latest(count)
+
+    def level(self):
+        """最新一块的 (RMS, 峰值)，无数据时为 (0, 0)"""
+        if not len(self.rms):
+            return 0.0, 0.0
+        return float(self.rms.latest(1)[0]), float(self.peak.latest(1)[0])
+
+    def window_stats(self, samples):
+        """最近约samples个样本范围内的整体 (RMS, 峰值)，由块结果合并得到"""
+        count = max(1, samples // self.block_size)
+        rms, peak = self.latest(count)
+        if not len(rms):
+            return 0.0, 0.0
+        # 等长块的均方值取平均即为整体均方值
+        return float(np.sqrt(np.mean(np.square(rms, dtype=np.float64)))), float(np.max(peak))
@@ -1,106 +1,31 @@
 import sys
-import json
-import socket
-import threading
-import time
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QLabel, QPushButton, QTextEdit, QGroupBox,
-                             QGridLayout, QSpinBox, QComboBox)
-from PyQt6.QtCore import QTimer, pyqtSignal, QObject, Qt
-from PyQt6.QtGui import QFont, QPalette, QColor
+                             QGridLayout, QSpinBox, QComboBox, QProgressBar)
+from PyQt6.QtCore import QTimer, pyqtSignal, QObject
 import pyqtgraph as pg
-import numpy as np
+from ring_buffer import SPSCSampleRing, MAX_HISTORY_SAMPLES
+from engine import StreamReceiver
+from chart_views import ChartViewManager
+from render_scheduler import RenderScheduler, DEFAULT_FPS, MAX_FPS
+from compute_worker import ComputeWorker
+from envelope import to_dbfs, LEVEL_FLOOR_DB
 
-class DataReceiver(QObject):
-    """数据接收器类，用于从ESP32S3接收数据"""
-    data_received = pyqtSignal(list)
+class ReceiverSignals(QObject):
     connection_status = pyqtSignal(bool, str)
+
+class DataReceiver(StreamReceiver):
+    """数据接收器类，用于从ESP32S3接收数据
+
+    接收与解析全部在 StreamReceiver 中（无Qt），接收线程直接写入样本环；
+    这里只把连接状态转成 connection_status 信号，以排队方式送到GUI线程。
+    """
     
-    def __init__(self, host='192.168.0.194', port=8080):
-        super().__init__()
-        self.host = host
-        self.port = port
-        self.socket = None
-        self.connected = False
-        self.running = False
-        self.buffer = ""  # 用于存储不完整的JSON数据
-        
-    def connect_to_device(self):
-        """连接到ESP32S3设备"""
-        try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(5)
-            self.socket.connect((self.host, self.port))
-            self.connected = True
-            self.connection_status.emit(True, f"已连接到 {self.host}:{self.port}")
-            return True
-        except Exception as e:
-            self.connected = False
-            self.connection_status.emit(False, f"连接失败: {str(e)}")
-            return False
-    
-    def disconnect_from_device(self):
-        """断开与设备的连接"""
-        self.running = False
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
-            self.socket = None
-        self.connected = False
-        self.connection_status.emit(False, "已断开连接")
-    
-    def start_receiving(self):
-        """开始接收数据"""
-        if not self.connected:
-            return
-            
-        self.running = True
-        self.receive_thread = threading.Thread(target=self._receive_data)
-        self.receive_thread.daemon = True
-        self.receive_thread.start()
-    
-    def _receive_data(self):
-        """接收数据的线程函数"""
-        while self.running and self.connected and self.socket:
-            try:
-                data = self.socket.recv(1024)
-                if data:
-                    # 将接收到的数据添加到缓冲区
-                    self.buffer += data.decode('utf-8')
-                    
-                    # 查找完整的JSON消息（以换行符分隔）
-                    while '\n' in self.buffer:
-                        line, self.buffer = self.buffer.split('\n', 1)
-                        line = line.strip()
-                        
-                        if line:
-                            try:
-                                # 尝试解析JSON数据
-                                json_data = json.loads(line)
-                                if 'audio_data' in json_data:
-                                    audio_data = json_data['audio_data']
-                                    self.data_received.emit(audio_data)
-                            except json.JSONDecodeError:
-                                # 如果不是JSON，尝试解析为音频数据
-                                try:
-                                    audio_data = [int(x) for x in line.split(',') if x.strip()]
-                                    if audio_data:
-                                        self.data_received.emit(audio_data)
-                                except ValueError:
-                                    # 如果无法解析为整数，跳过这行数据
-                                    print(f"无法解析数据: {line[:50]}...")
-            except socket.error as e:
-                print(f"套接字错误: {e}")
-                self.connected = False
-                self.connection_status.emit(False, f"连接错误: {str(e)}")
-                break
-            except Exception as e:
-                print(f"接收数据错误: {e}")
-                self.connected = False
-                self.connection_status.emit(False, f"连接错误: {str(e)}")
-                break
+    def __init__(self, sample_ring, host='192.168.0.194', port=8080, read_size=65536):
+        self.signals = ReceiverSignals()
+        self.connection_status = self.signals.connection_status
+        super().__init__(sample_ring, host, port, read_size,
+                         on_status=self.connection_status.emit)
 
 class FixedAudioVisualizer(QMainWindow):
     """修复版音频可视化器 - 避免对数坐标问题"""
@@ -111,21 +36,43 @@ class FixedAudioVisualizer(QMainWindow):
         self.setGeometry(100, 100, 1200, 800)
         
         # 初始化数据接收器
-        self.data_receiver = DataReceiver()
-        self.data_receiver.data_received.connect(self.update_audio_data)
+        # 接收线程写入样本环，分析线程定期一次取走全部新数据
+        self.sample_ring = SPSCSampleRing()
+        self.data_receiver = DataReceiver(sample_ring=self.sample_ring)
         self.data_receiver.connection_status.connect(self.update_connection_status)
         
         # 初始化UI
         self.init_ui()
         
         # 初始化数据
-        self.audio_data = []
-        self.max_data_points = 1000
-        
-        # 设置定时器用于更新图表
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_plots)
-        self.update_timer.start(50)  # 20 FPS
+        self.max_data_points = self.data_points_input.value()
+        # 分析线程：滑动统计、波形抽取、流式STFT（16kHz，显示0-8kHz）与分块RMS/峰值包络
+        # （瀑布图和电平表共用），按当前视图生成可直接绘图的数组，GUI线程只负责setData
+        self.compute_worker = ComputeWorker(self.sample_ring, self.max_data_points,
+                                            envelope_block_size=self.block_size_input.value(),
+                                            fps=self.fps_input.value())
+        self.compute_worker.frame_ready.connect(self.apply_frame)
+        self.frame = None
+        self.stats_snapshot = None
+        
+        # 创建各图表类型的图元（只创建一次）
+        self.create_chart_views()
+        
+        # 刷新调度：数据或视图有变化才重绘，渲染跟不上时合并帧，窗口最小化时暂停
+        self.render_scheduler = RenderScheduler(self, self.update_plots,
+                                                fps=self.fps_input.value())
+        self.render_scheduler.start()
+        
+        # 视图变化时通知分析线程重新生成绘图数据
+        self.graph_widget.plotItem.vb.sigResized.connect(self.update_view_request)
+        self.update_view_request()
+        self.compute_worker.start()
+        
+        # 数据信息以较低频率刷新，且只在内容变化时更新
+        self._info_text = None
+        self.info_timer = QTimer()
+        self.info_timer.timeout.connect(self.update_info)
+        self.info_timer.start(250)  # 4 Hz
         
     def init_ui(self):
         """初始化用户界面"""
@@ -189,11 +136,20 @@ class FixedAudioVisualizer(QMainWindow):
         # 数据点数量设置
         display_layout.addWidget(QLabel("显示数据点:"))
         self.data_points_input = QSpinBox()
-        self.data_points_input.setRange(100, 5000)
+        self.data_points_input.setRange(100, MAX_HISTORY_SAMPLES)
+        self.data_points_input.setSingleStep(1000)
         self.data_points_input.setValue(1000)
         self.data_points_input.valueChanged.connect(self.update_max_data_points)
         display_layout.addWidget(self.data_points_input)
         
+        # 包络块大小
+        display_layout.addWidget(QLabel("包络块大小:"))
+        self.block_size_input = QSpinBox()
+        self.block_size_input.setRange(16, 4096)
+        self.block_size_input.setValue(64)
+        self.block_size_input.valueChanged.connect(self.update_block_size)
+        display_layout.addWidget(self.block_size_input)
+        
         # 图表类型选择
         display_layout.addWidget(QLabel("图表类型:"))
         self.chart_type_combo = QComboBox()
@@ -201,6 +157,19 @@ class FixedAudioVisualizer(QMainWindow):
         self.chart_type_combo.currentTextChanged.connect(self.change_chart_type)
         display_layout.addWidget(self.chart_type_combo)
         
+        # 目标帧率（数据无变化时不重绘，实际帧率可能低于目标）
+        display_layout.addWidget(QLabel("目标帧率:"))
+        self.fps_input = QSpinBox()
+        self.fps_input.setRange(1, MAX_FPS)
+        self.fps_input.setValue(DEFAULT_FPS)
+        self.fps_input.setSuffix(" FPS")
+        self.fps_input.valueChanged.connect(self.update_target_fps)
+        display_layout.addWidget(self.fps_input)
+        
+        # 实际帧率与渲染耗时
+        self.render_info = QLabel("帧率: -- FPS  渲染: -- ms\n分析: -- ms")
+        display_layout.addWidget(self.render_info)
+        
         control_layout.addWidget(display_group)
         
         # 数据信息组
@@ -208,6 +177,13 @@ class FixedAudioVisualizer(QMainWindow):
         info_layout = QVBoxLayout()
         info_group.setLayout(info_layout)
         
+        # 电平表（最新一块的RMS）
+        self.level_meter = QProgressBar()
+        self.level_meter.setRange(int(LEVEL_FLOOR_DB), 0)
+        self.level_meter.setValue(int(LEVEL_FLOOR_DB))
+        self.level_meter.setFormat("%v dBFS")
+        info_layout.addWidget(self.level_meter)
+        
         self.data_info = QTextEdit()
         self.data_info.setMaximumHeight(100)
         self.data_info.setReadOnly(True)
@@ -232,9 +208,6 @@ class FixedAudioVisualizer(QMainWindow):
         self.graph_widget.setLabel('bottom', '时间')
         self.graph_widget.setTitle('ESP32S3 Sense 音频数据')
         
-        # 创建数据曲线
-        self.audio_curve = self.graph_widget.plot(pen=pg.mkPen('b', width=2))
-        
         chart_layout.addWidget(self.graph_widget)
         return chart_widget
         
@@ -265,134 +238,110 @@ class FixedAudioVisualizer(QMainWindow):
             self.connection_status.setStyleSheet("color: red; font-weight: bold;")
             self.connect_btn.setText("连接")
             
-    def update_audio_data(self, data):
-        """更新音频数据"""
-        self.audio_data.extend(data)
-        
-        # 限制数据点数量
-        if len(self.audio_data) > self.max_data_points:
-            self.audio_data = self.audio_data[-self.max_data_points:]
+    def update_view_request(self, *args):
+        """把当前视图（所需结果、像素宽度）登记给分析线程"""
+        chart_type = self.chart_type_combo.currentText()
+        self.compute_worker.set_view(products=self.chart_products[chart_type],
+                                     pixels=self.graph_widget.plotItem.vb.width())
+        
+    def apply_frame(self):
+        """取走分析线程生成的帧，图表由刷新调度绘制"""
+        frame = self.compute_worker.take_frame()
+        if frame is None:
+            return
+        self.stats_snapshot = frame['stats']
+        self.frame = frame
+        self.render_scheduler.mark_dirty()
             
     def update_plots(self):
-        """更新图表显示"""
-        if self.audio_data and hasattr(self, 'audio_curve'):
-            current_chart_type = self.chart_type_combo.currentText()
-            
-            if current_chart_type == "波形图":
-                # 波形图 - 显示时域数据
-                x_data = np.arange(len(self.audio_data))
-                # 限制显示的数据点数量，避免过于密集
-                if len(self.audio_data) > 1000:
-                    step = len(self.audio_data) // 1000
-                    x_data = x_data[::step]
-                    y_data = self.audio_data[::step]
-                else:
-                    y_data = self.audio_data
-                self.audio_curve.setData(x_data, y_data)
+        """更新图表显示（数组均由分析线程算好，这里只调用setData）"""
+        frame = self.frame
+        if frame is None:
+            return
+        current_chart_type = self.chart_type_combo.currentText()
+        
+        if current_chart_type == "波形图":
+            if 'waveform' in frame:
+                self.waveform_curve.setData(*frame['waveform'])
+                
+        elif current_chart_type == "频谱图":
+            if 'spectrum' in frame:
+                self.spectrum_curve.setData(*frame['spectrum'])
                 
-            elif current_chart_type == "频谱图":
-                # 频谱图 - 计算FFT (使用线性坐标)
-                if len(self.audio_data) >= 64:
-                    try:
-                        # 使用最近的数据计算FFT
-                        recent_data = self.audio_data[-2048:] if len(self.audio_data) >= 2048 else self.audio_data
-                        
-                        # 应用窗函数减少频谱泄漏
-                        window = np.hanning(len(recent_data))
-                        windowed_data = recent_data * window
-                        
-                        # 计算FFT
-                        fft_data = np.fft.fft(windowed_data)
-                        freq_data = np.fft.fftfreq(len(recent_data), 1/16000)
-                        
-                        # 只显示正频率部分，限制到8kHz
-                        positive_freq_mask = (freq_data >= 0) & (freq_data <= 8000)
-                        freq_data = freq_data[positive_freq_mask]
-                        fft_data = np.abs(fft_data[positive_freq_mask])
-                        
-                        # 使用线性幅度而不是dB
-                        fft_linear = fft_data / np.max(fft_data) if np.max(fft_data) > 0 else fft_data
-                        
-                        self.audio_curve.setData(freq_data, fft_linear)
-                        
-                    except Exception as e:
-                        print(f"频谱计算错误: {e}")
-                        self.audio_curve.setData([], [])
-                    
-            elif current_chart_type == "瀑布图":
-                # 瀑布图 - 显示时频图
-                x_data = np.arange(len(self.audio_data))
-                # 计算信号强度（RMS）
-                if len(self.audio_data) >= 64:
-                    # 使用滑动窗口计算RMS
-                    window_size = 64
-                    intensity = []
-                    for i in range(0, len(self.audio_data) - window_size, window_size):
-                        window_data = self.audio_data[i:i+window_size]
-                        rms = np.sqrt(np.mean(np.array(window_data) ** 2))
-                        intensity.append(rms)
-                    
-                    if intensity:
-                        x_intensity = np.arange(len(intensity))
-                        self.audio_curve.setData(x_intensity, intensity)
-                else:
-                    # 如果数据不足，直接使用绝对值
-                    intensity = np.abs(self.audio_data)
-                    self.audio_curve.setData(x_data, intensity)
+        elif current_chart_type == "瀑布图":
+            # 瀑布图 - 显示RMS强度包络
+            if 'envelope' in frame:
+                self.envelope_curve.setData(*frame['envelope'])
+        
+        # 更新电平表
+        level_rms, _ = frame['level']
+        self.level_meter.setValue(int(max(to_dbfs(level_rms), LEVEL_FLOOR_DB)))
             
-            # 更新数据信息
-            info_text = f"图表类型: {current_chart_type}\n"
-            info_text += f"数据点数量: {len(self.audio_data)}\n"
-            info_text += f"最大值: {max(self.audio_data) if self.audio_data else 0}\n"
-            info_text += f"最小值: {min(self.audio_data) if self.audio_data else 0}\n"
-            info_text += f"平均值: {sum(self.audio_data)/len(self.audio_data) if self.audio_data else 0:.2f}"
+    def update_info(self):
+        """更新数据信息（统计量O(1)读取，内容不变时不刷新）"""
+        scheduler = self.render_scheduler
+        self.render_info.setText(f"帧率: {scheduler.achieved_fps} FPS  "
+                                 f"渲染: {scheduler.render_time * 1000:.1f} ms\n"
+                                 f"分析: {self.compute_worker.compute_time * 1000:.1f} ms")
+        stats = self.stats_snapshot
+        if not stats or not stats['count']:
+            return
+        info_text = f"图表类型: {self.chart_type_combo.currentText()}\n"
+        info_text += f"数据点数量: {stats['count']}\n"
+        info_text += f"最大值: {stats['maximum']}\n"
+        info_text += f"最小值: {stats['minimum']}\n"
+        info_text += f"平均值: {stats['mean']:.2f}\n"
+        info_text += f"RMS: {stats['rms']:.1f}\n"
+        info_text += f"峰值保持: {stats['peak_hold']}\n"
+        info_text += f"削波: {stats['clip_count']} 样本 (累计 {stats['total_clips']})"
+        if info_text != self._info_text:
+            self._info_text = info_text
             self.data_info.setText(info_text)
             
     def update_max_data_points(self):
         """更新最大数据点数量"""
         self.max_data_points = self.data_points_input.value()
+        self.compute_worker.resize(self.max_data_points)
+        
+    def update_target_fps(self):
+        """更新目标帧率"""
+        self.render_scheduler.set_fps(self.fps_input.value())
+        self.compute_worker.set_fps(self.fps_input.value())
+        
+    def update_block_size(self):
+        """更新包络块大小，并从已有数据重新计算包络"""
+        self.compute_worker.set_envelope_block_size(self.block_size_input.value())
+        
+    def create_chart_views(self):
+        """创建各图表类型的曲线/图像（只创建一次，切换时只改变可见性）"""
+        self.waveform_curve = self.graph_widget.plot(pen=pg.mkPen('b', width=2))
+        self.spectrum_curve = self.graph_widget.plot(pen=pg.mkPen('r', width=2))
+        self.envelope_curve = self.graph_widget.plot(pen=pg.mkPen('g', width=2))
+        
+        self.chart_views = ChartViewManager(self.graph_widget)
+        # 波形图 - 显示时域数据，16位音频范围
+        self.chart_views.add_view("波形图", [self.waveform_curve], '振幅', '时间',
+                                  'ESP32S3 Sense 音频波形', y_range=(-32768, 32768))
+        # 频谱图 - 线性幅度归一化到0-1，显示0-8kHz
+        self.chart_views.add_view("频谱图", [self.spectrum_curve], '幅度', '频率 (Hz)',
+                                  'ESP32S3 Sense 音频频谱', x_range=(0, 8000), y_range=(0, 1))
+        # 瀑布图 - 显示RMS强度包络
+        self.chart_views.add_view("瀑布图", [self.envelope_curve], '强度', '时间',
+                                  'ESP32S3 Sense 音频瀑布图', y_range=(0, 32768))
+        self.chart_views.show(self.chart_type_combo.currentText())
+        
+        # 各图表类型需要分析线程计算的结果
+        self.chart_products = {
+            "波形图": ('waveform',),
+            "频谱图": ('spectrum',),
+            "瀑布图": ('envelope',),
+        }
         
     def change_chart_type(self, chart_type):
         """切换图表类型"""
         print(f"切换到图表类型: {chart_type}")
-        
-        # 清除现有图表
-        self.graph_widget.clear()
-        
-        if chart_type == "波形图":
-            # 波形图 - 显示时域数据
-            self.audio_curve = self.graph_widget.plot(pen=pg.mkPen('b', width=2))
-            # 线性坐标
-            self.graph_widget.setLogMode(x=False, y=False)
-            self.graph_widget.setLabel('left', '振幅')
-            self.graph_widget.setLabel('bottom', '时间')
-            self.graph_widget.setTitle('ESP32S3 Sense 音频波形')
-            # 设置合适的Y轴范围
-            self.graph_widget.setYRange(-32768, 32768)  # 16位音频范围
-            
-        elif chart_type == "频谱图":
-            # 频谱图 - 显示频域数据 (使用线性坐标)
-            self.audio_curve = self.graph_widget.plot(pen=pg.mkPen('r', width=2))
-            # 线性坐标，避免对数坐标问题
-            self.graph_widget.setLogMode(x=False, y=False)
-            self.graph_widget.setLabel('left', '幅度')
-            self.graph_widget.setLabel('bottom', '频率 (Hz)')
-            self.graph_widget.setTitle('ESP32S3 Sense 音频频谱')
-            # 设置X轴范围
-            self.graph_widget.setXRange(0, 8000)  # 0-8kHz
-            # 设置Y轴范围
-            self.graph_widget.setYRange(0, 1)  # 归一化幅度
-            
-        elif chart_type == "瀑布图":
-            # 瀑布图 - 显示时频图
-            self.audio_curve = self.graph_widget.plot(pen=pg.mkPen('g', width=2))
-            # 线性坐标
-            self.graph_widget.setLogMode(x=False, y=False)
-            self.graph_widget.setLabel('left', '强度')
-            self.graph_widget.setLabel('bottom', '时间')
-            self.graph_widget.setTitle('ESP32S3 Sense 音频瀑布图')
-            # 设置合适的Y轴范围
-            self.graph_widget.setYRange(0, 32768)  # 强度范围
+        self.chart_views.show(chart_type)
+        self.update_view_request()
 
 def main():
     """主函数"""
@@ -0,0 +1,410 @@
+"""
+音频帧协议 - 二进制PCM帧编解码与JSON/文本自动回退
+"""
+
+import re
+import json
+import time
+import struct
+import numpy as np
+
+# 二进制帧格式（小端）:
+#   偏移  大小  字段
+#   0     4     魔数 b'ESPA'
+#   4     2     标志位 (保留，当前为0)
+#   6     2     样本数
+#   8     4     帧序号
+#   12    4     采样率 (Hz)
+#   16    N*2   int16 小端PCM数据
+FRAME_MAGIC = b'ESPA'
+FRAME_HEADER = struct.Struct('<4sHHII')
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+MAX_FRAME_SAMPLES = 8192
+DEFAULT_SAMPLE_RATE = 16000
+
+# 文本行缓冲上限，防止没有换行符的垃圾数据无限增长
+MAX_LINE_LENGTH = 1 << 20
+
+# 接收缓冲区大小与单次读取大小
+DEFAULT_RING_SIZE = 256 * 1024
+DEFAULT_READ_SIZE = 64 * 1024
+
+PCM_DTYPE = np.dtype('<i2')
+INT64_MAX = np.iinfo(np.int64).max
+
+# 快速路径只接受数字、逗号、负号与空格；其他写法（正号、小数等）交给逐元素解析
+INT_LIST_CHARS = b'0123456789,- '
+# 用于计算每个数值的规范位数（10, 100, ..., 10**18）
+POWERS_OF_TEN = 10 ** np.arange(1, 19, dtype=np.int64)
+
+# 固件 sendAudioData 输出的 {"audio_data":[...]}（允许json.dumps风格的空格）
+AUDIO_JSON_PATTERN = re.compile(rb'\s*\{\s*"audio_data"\s*:\s*\[(.*)\]\s*\}\s*$', re.S)
+
+
+def encode_frame(samples, sequence=0, sample_rate=DEFAULT_SAMPLE_RATE, flags=0):
+    """将样本编码为一个二进制帧"""
+    payload = np.asarray(samples).astype(PCM_DTYPE, copy=False)
+    if len(payload) > MAX_FRAME_SAMPLES:
+        raise ValueError(f"单帧样本数不能超过 {MAX_FRAME_SAMPLES}")
+    header = FRAME_HEADER.pack(FRAME_MAGIC, flags, len(payload),
+                               sequence & 0xFFFFFFFF, sample_rate)
+    return header + payload.tobytes()
+
+
+def to_int16(values):
+    """将整数序列转换为int16数组（超出范围的值被截断）"""
+    try:
+        array = np.asarray(values, dtype=np.int64)
+    except OverflowError:
+        # 超出int64范围的整数同样截断，不能让接收线程因此退出
+        array = np.array([min(max(int(v), -32768), 32767) for v in values], dtype=np.int64)
+    return np.clip(array, -32768, 32767).astype(np.int16)
+
+
+def decode_text_line(line):
+    """解析一行JSON或逗号分隔文本，返回int16数组；无法识别时返回None"""
+    try:
+        json_data = json.loads(line)
+        if isinstance(json_data, dict) and 'audio_data' in json_data:
+            return to_int16(json_data['audio_data'])
+        return None
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        pass
+
+    # 如果不是JSON，尝试解析为逗号分隔的音频数据
+    try:
+        values = [int(x) for x in line.split(b',') if x.strip()]
+    except ValueError:
+        print(f"无法解析数据: {line[:50]}...")
+        return None
+    return to_int16(values) if values else None
+
+
+def parse_int_payload(payload):
+    """将逗号分隔的整数一次性转换为int16数组；格式不符时返回None
+
+    np.fromstring 比 int()/json 宽松：单独的负号、空白字段会被解析为0，
+    超出int64的值一律变成int64最大值，前导零照常接受，旧版numpy遇到无法解析的
+    内容还会只返回部分结果。因此解析后核对字段数、负号数，并按解析结果算出
+    规范写法应有的位数与原文比较，不符时返回None，交给逐元素解析。
+    """
+    if not payload.strip():
+        return np.zeros(0, dtype=np.int16)
+    if payload.translate(None, INT_LIST_CHARS):
+        return None
+    if b' ' in payload:
+        if b'- ' in payload:
+            return None
+        compact = payload.replace(b' ', b'')
+    else:
+        compact = payload
+    # 空白字段（逐元素解析会跳过它们）
+    if compact[:1] == b',' or compact[-1:] == b',' or b',,' in compact:
+        return None
+    # 按int64解析再截断，超出int16（以及int32）范围的值不会先回绕
+    try:
+        values = np.fromstring(payload, dtype=np.int64, sep=',')
+    except ValueError:
+        return None
+    separators = compact.count(b',')
+    if len(values) != separators + 1 or values.max() == INT64_MAX:
+        return None
+    signs = compact.count(b'-')
+    if signs != np.count_nonzero(values < 0):
+        return None
+    digits = len(values) + np.searchsorted(POWERS_OF_TEN, np.abs(values), side='right').sum()
+    if digits != len(compact) - separators - signs:
+        return None
+    # 原地截断到int16范围（比np.clip开销小）
+    np.minimum(values, 32767, out=values)
+    np.maximum(values, -32768, out=values)
+    return values.astype(np.int16)
+
+
+class TextLineDecoder:
+    """文本行快速解码器
+
+    识别固件的两种已知格式（JSON的audio_data数组与逗号分隔的原始数据），
+    直接截取数值部分并向量化转换为int16数组；其余消息回退到 decode_text_line。
+    不含逗号的非JSON行（单个数字、空行）也回退，与 decode_text_line 一致：
+    能被当作JSON标量解析的行不是音频数据。
+    """
+
+    def __init__(self):
+        self.reset_stats()
+
+    def reset_stats(self):
+        """重置统计"""
+        self.samples_decoded = 0
+        self.decode_time = 0.0
+        self.fast_lines = 0
+        self.fallback_lines = 0
+
+    @property
+    def samples_per_second(self):
+        """解码吞吐量（样本/秒，仅计解码耗时）"""
+        if self.decode_time <= 0:
+            return 0.0
+        return self.samples_decoded / self.decode_time
+
+    def __call__(self, line):
+        start = time.perf_counter()
+        frame = self.decode(line)
+        self.decode_time += time.perf_counter() - start
+        if frame is not None:
+            self.samples_decoded += len(frame)
+        return frame
+
+    def decode(self, line):
+        """解码一行，返回int16数组或None"""
+        if line[:1] == b'{':
+            match = AUDIO_JSON_PATTERN.match(line)
+            frame = parse_int_payload(match.group(1)) if match else None
+        elif b',' in line:
+            frame = parse_int_payload(line)
+        else:
+            frame = None
+
+        if frame is not None:
+            self.fast_lines += 1
+            return frame
+        self.fallback_lines += 1
+        return decode_text_line(line)
+
+
+class ByteRing:
+    """预分配的接收字节缓冲区
+
+    数据通过 recv_into 直接写入预分配的 bytearray，读写游标在其中前移；
+    当尾部剩余空间不足一次读取时，仅把未消费的残余字节（不完整的帧）
+    搬回缓冲区开头，不会为每次接收重新分配内存。
+    """
+
+    def __init__(self, capacity=DEFAULT_RING_SIZE):
+        self.data = bytearray(capacity)
+        self.view = memoryview(self.data)
+        self.read_pos = 0
+        self.write_pos = 0
+
+    def __len__(self):
+        return self.write_pos - self.read_pos
+
+    @property
+    def capacity(self):
+        return len(self.data)
+
+    def clear(self):
+        """清空缓冲区"""
+        self.read_pos = 0
+        self.write_pos = 0
+
+    def reserve(self, size):
+        """保证尾部至少有size字节可写空间"""
+        if self.capacity - self.write_pos >= size:
+            return
+        pending = len(self)
+        if pending + size > self.capacity:
+            # 残余数据加一次读取超过容量，扩大缓冲区
+            new_capacity = self.capacity
+            while pending + size > new_capacity:
+                new_capacity *= 2
+            self.view.release()
+            data = bytearray(new_capacity)
+            data[:pending] = self.data[self.read_pos:self.write_pos]
+            self.data = data
+            self.view = memoryview(self.data)
+        elif pending:
+            self.view[:pending] = self.view[self.read_pos:self.write_pos]
+        self.read_pos = 0
+        self.write_pos = pending
+
+    def writable(self, size=DEFAULT_READ_SIZE):
+        """返回尾部size字节的可写视图，写入后调用 commit"""
+        self.reserve(size)
+        return self.view[self.write_pos:self.write_pos + size]
+
+    def commit(self, nbytes):
+        """确认已写入 writable 返回视图的字节数"""
+        self.write_pos += nbytes
+
+    def recv_into(self, sock, size=DEFAULT_READ_SIZE):
+        """从套接字直接读取到缓冲区，返回读取的字节数（0表示连接关闭）"""
+        nbytes = sock.recv_into(self.writable(size))
+        self.commit(nbytes)
+        return nbytes
+
+    def write(self, data):
+        """复制外部数据到缓冲区"""
+        size = len(data)
+        self.reserve(size)
+        self.view[self.write_pos:self.write_pos + size] = data
+        self.write_pos += size
+
+    def consume(self, size):
+        """消费size字节"""
+        self.read_pos += size
+        if self.read_pos == self.write_pos:
+            self.read_pos = 0
+            self.write_pos = 0
+
+
+class FrameParser:
+    """流式帧解析器
+
+    每个连接使用一个实例。根据连接上收到的第一个非空字节自动判断
+    是二进制帧模式还是换行分隔的JSON/文本模式。
+    """
+
+    MODE_BINARY = 'binary'
+    MODE_TEXT = 'text'
+
+    def __init__(self, ring_size=DEFAULT_RING_SIZE, read_size=DEFAULT_READ_SIZE,
+                 line_decoder=None):
+        self.ring = ByteRing(max(ring_size, read_size))
+        self.read_size = read_size
+        # 文本模式下单行的解码函数，默认使用向量化解码器
+        self.line_decoder = line_decoder or TextLineDecoder()
+        self.reset()
+
+    def reset(self):
+        """重置解析状态（新连接时调用）"""
+        self.ring.clear()
+        self.scan_offset = 0  # 文本模式下读游标之后已扫描过、不含换行符的字节数
+        self.mode = None
+        self.sample_rate = DEFAULT_SAMPLE_RATE
+        self.last_sequence = None
+        self.frames_decoded = 0
+        self.frames_lost = 0
+        self.resync_count = 0
+        self.bytes_received = 0
+
+    def receive(self, sock):
+        """从套接字读取一次并解析，连接关闭时返回None"""
+        nbytes = self.ring.recv_into(sock, self.read_size)
+        if nbytes == 0:
+            return None
+        self.bytes_received += nbytes
+        return self._parse()
+
+    def receive_buffer(self):
+        """返回可直接写入的接收缓冲区（最多 read_size 字节），供 asyncio.BufferedProtocol 使用"""
+        return self.ring.writable(self.read_size)
+
+    def received(self, nbytes):
+        """数据已写入 receive_buffer() 返回的缓冲区，解析并返回帧列表"""
+        self.ring.commit(nbytes)
+        self.bytes_received += nbytes
+        return self._parse()
+
+    def feed(self, data):
+        """送入接收到的字节，返回解析出的int16帧列表"""
+        self.ring.write(data)
+        self.bytes_received += len(data)
+        return self._parse()
+
+    def _parse(self):
+        """解析缓冲区中所有完整的帧"""
+        if self.mode is None and not self._detect_mode():
+            return []
+
+        if self.mode == self.MODE_BINARY:
+            return self._parse_binary()
+        return self._parse_text()
+
+    def _detect_mode(self):
+        """根据首个非空字节判断传输模式"""
+        ring = self.ring
+        # 跳过连接开始处的空白字符
+        while len(ring) and ring.data[ring.read_pos] in b' \t\r\n':
+            ring.consume(1)
+
+        if not len(ring):
+            return False
+
+        prefix_end = min(ring.read_pos + len(FRAME_MAGIC), ring.write_pos)
+        prefix = bytes(ring.view[ring.read_pos:prefix_end])
+        if FRAME_MAGIC.startswith(prefix):
+            if len(prefix) < len(FRAME_MAGIC):
+                # 魔数前缀不完整，等待更多数据
+                return False
+            self.mode = self.MODE_BINARY
+        else:
+            self.mode = self.MODE_TEXT
+        return True
+
+    def _parse_binary(self):
+        """解析缓冲区中所有完整的二进制帧"""
+        frames = []
+        ring = self.ring
+        data = ring.data
+        offset = ring.read_pos
+        end = ring.write_pos
+
+        while end - offset >= FRAME_HEADER_SIZE:
+            magic, flags, count, sequence, sample_rate = FRAME_HEADER.unpack_from(data, offset)
+
+            if magic != FRAME_MAGIC or count > MAX_FRAME_SAMPLES:
+                # 帧头损坏，查找下一个魔数重新同步
+                self.resync_count += 1
+                next_magic = data.find(FRAME_MAGIC, offset + 1, end)
+                if next_magic < 0:
+                    # 保留末尾可能是魔数前缀的字节
+                    offset = max(offset + 1, end - len(FRAME_MAGIC) + 1)
+                    break
+                offset = next_magic
+                continue
+
+            frame_end = offset + FRAME_HEADER_SIZE + count * 2
+            if frame_end > end:
+                break
+
+            # 缓冲区会被复用，帧数据需要复制出来
+            frame = np.frombuffer(data, dtype=PCM_DTYPE, count=count,
+                                  offset=offset + FRAME_HEADER_SIZE).astype(np.int16)
+            self._track_sequence(sequence)
+            self.sample_rate = sample_rate or self.sample_rate
+            self.frames_decoded += 1
+            frames.append(frame)
+            offset = frame_end
+
+        ring.consume(offset - ring.read_pos)
+        return frames
+
+    def _track_sequence(self, sequence):
+        """根据帧序号统计丢帧"""
+        if self.last_sequence is not None:
+            gap = (sequence - self.last_sequence - 1) & 0xFFFFFFFF
+            # 序号回退视为设备重启，不计入丢帧
+            if gap < 0x80000000:
+                self.frames_lost += gap
+        self.last_sequence = sequence
+
+    def _parse_text(self):
+        """解析缓冲区中所有完整的文本行"""
+        frames = []
+        ring = self.ring
+        data = ring.data
+        start = ring.read_pos
+        end = ring.write_pos
+        # 从上次扫描结束处继续查找换行符，避免重复扫描不完整的行
+        scan = start + self.scan_offset
+
+        while True:
+            newline = data.find(b'\n', scan, end)
+            if newline < 0:
+                break
+            if newline > start:
+                frame = self.line_decoder(bytes(ring.view[start:newline]).strip())
+                if frame is not None and len(frame):
+                    self.frames_decoded += 1
+                    frames.append(frame)
+            start = newline + 1
+            scan = start
+
+        ring.consume(start - ring.read_pos)
+        if len(ring) > MAX_LINE_LENGTH:
+            print("文本行过长，丢弃缓冲区数据")
+            ring.clear()
+        # 剩余数据都已扫描过（不含换行符）；reserve 搬移数据时相对位置不变
+        self.scan_offset = len(ring)
+        return frames
@@ -0,0 +1,197 @@
+"""
+无界面运行 - 不加载Qt，接收设备数据并持续分析，定期输出特征与运行指标
+"""
+
+import sys
+import json
+import time
+import argparse
+from ring_buffer import SPSCSampleRing
+from engine import StreamReceiver, AnalysisEngine, SAMPLE_RATE, DEFAULT_FPS
+from envelope import DEFAULT_BLOCK_SIZE, to_dbfs
+from shared_ring import SharedSamplePublisher
+from udp_ingest import DEFAULT_JITTER_FRAMES, FILL_MODES
+
+# 无界面模式需要的分析结果（统计量与电平每帧都会生成）
+HEADLESS_PRODUCTS = ('peak_frequency',)
+
+
+class HeadlessRunner:
+    """无界面运行器
+
+    与GUI使用同一个 StreamReceiver 与 AnalysisEngine，回调都是普通Python函数：
+    分析线程每生成一帧就在回调中取走，每 interval 秒用最新一帧生成一条记录，
+    包含特征（统计量、RMS/峰值电平、主频）与运行指标（接收速率、分析帧率与
+    耗时、样本环溢出、丢帧、分析出错次数）。断开后按 reconnect_delay 自动重连。
+    指定 publish 时接收到的样本同时发布到该名称的共享内存（见 shared_ring）。
+    jitter_frames 与 jitter_fill 是UDP模式的抖动缓冲深度与丢帧补偿方式。
+    """
+
+    def __init__(self, host='192.168.0.194', port=8080, history_samples=SAMPLE_RATE,
+                 interval=1.0, fps=DEFAULT_FPS, on_record=None, publish=None,
+                 jitter_frames=DEFAULT_JITTER_FRAMES, jitter_fill='zero'):
+        self.sample_ring = SPSCSampleRing()
+        self.publisher = SharedSamplePublisher(publish) if publish else None
+        self.receiver = StreamReceiver(self.sample_ring, host, port, on_status=self.on_status,
+                                       publisher=self.publisher, jitter_frames=jitter_frames,
+                                       jitter_fill=jitter_fill)
+        self.engine = AnalysisEngine(self.sample_ring, history_samples,
+                                     envelope_block_size=DEFAULT_BLOCK_SIZE, fps=fps,
+                                     on_frame=self.on_frame)
+        self.engine.set_view(products=HEADLESS_PRODUCTS)
+        self.interval = interval
+        self.on_record = on_record  # 每生成一条记录时调用
+        self.latest_frame = None
+        self.frames_analyzed = 0
+        self._last = (time.perf_counter(), 0, 0)
+
+    def on_status(self, connected, message):
+        print(f"[{time.strftime('%H:%M:%S')}] {message}")
+
+    def on_frame(self):
+        """分析线程回调：立即取走新帧，只保留最新一帧"""
+        frame = self.engine.take_frame()
+        if frame is not None:
+            self.latest_frame = frame
+            self.frames_analyzed += 1
+
+    def make_record(self):
+        """用最新一帧与上一条记录以来的计数生成一条记录"""
+        now = time.perf_counter()
+        last_time, last_samples, last_frames = self._last
+        samples, frames = self.receiver.samples_received, self.frames_analyzed
+        elapsed = max(now - last_time, 1e-9)
+        self._last = (now, samples, frames)
+
+        record = {
+            'time': round(time.time(), 3),
+            'connected': self.receiver.connected,
+            'samples_per_second': round((samples - last_samples) / elapsed, 1),
+            'frames_per_second': round((frames - last_frames) / elapsed, 2),
+            'compute_ms': round(self.engine.compute_time * 1000, 3),
+            'overruns': self.sample_ring.overrun_count,
+            'overrun_samples': self.sample_ring.overrun_samples,
+            'frames_lost': self.receiver.parser.frames_lost,
+            'analysis_errors': self.engine.error_count,
+        }
+        if self.receiver.jitter_buffer is not None:
+            # UDP模式：丢失/乱序/迟到的帧由抖动缓冲统计
+            record.update(self.receiver.jitter_buffer.counters())
+        frame = self.latest_frame
+        if frame is not None and frame['stats']['count']:
+            stats = frame['stats']
+            level_rms, level_peak = frame['level']
+            record.update({
+                'rms': round(stats['rms'], 2),
+                'maximum': int(stats['maximum']),
+                'minimum': int(stats['minimum']),
+                'peak_hold': int(stats['peak_hold']),
+                'clip_count': stats['clip_count'],
+                'rms_dbfs': round(float(to_dbfs(level_rms)), 2),
+                'peak_dbfs': round(float(to_dbfs(level_peak)), 2),
+                'peak_frequency': frame.get('peak_frequency'),
+            })
+        return record
+
+    @staticmethod
+    def format_record(record):
+        """单行文本形式"""
+        line = (f"[{time.strftime('%H:%M:%S', time.localtime(record['time']))}] "
+                f"接收 {record['samples_per_second']:.0f} 样本/秒 | "
+                f"分析 {record['frames_per_second']:.1f} 帧/秒 {record['compute_ms']:.2f} ms | "
+                f"溢出 {record['overruns']} 丢帧 {record['frames_lost']}")
+        if 'frames_late' in record:
+            line += f" 乱序 {record['frames_reordered']} 迟到 {record['frames_late']}"
+        if 'rms' in record:
+            line += f" | RMS {record['rms_dbfs']:.1f} dBFS 峰值 {record['peak_dbfs']:.1f} dBFS"
+            if record['peak_frequency'] is not None:
+                line += f" | 主频 {record['peak_frequency']:.0f} Hz"
+            line += f" | 削波 {record['clip_count']}"
+        if record.get('analysis_errors'):
+            line += f" | 分析错误 {record['analysis_errors']}"
+        return line
+
+    def run(self, duration=None, reconnect_delay=2.0):
+        """运行到 duration 秒（None 表示一直运行，Ctrl+C 退出）"""
+        start = time.perf_counter()
+        deadline = None if duration is None else start + duration
+        self._last = (start, self.receiver.samples_received, self.frames_analyzed)
+        self.engine.start()
+        try:
+            while deadline is None or time.perf_counter() < deadline:
+                if not self.receiver.connected:
+                    if self.receiver.connect_to_device():
+                        self.receiver.start_receiving()
+                    else:
+                        self._sleep(reconnect_delay, deadline)
+                        continue
+                self._sleep(self.interval, deadline)
+                record = self.make_record()
+                if self.on_record is not None:
+                    self.on_record(record)
+        except KeyboardInterrupt:
+            print("\n已停止")
+        finally:
+            if self.receiver.connected:
+                self.receiver.disconnect_from_device()
+            self.engine.stop()
+            if self.publisher is not None:
+                # 接收线程退出后再释放共享内存
+                if self.receiver.receive_thread is not None:
+                    self.receiver.receive_thread.join(1.0)
+                self.publisher.close()
+
+    @staticmethod
+    def _sleep(seconds, deadline):
+        if deadline is not None:
+            seconds = min(seconds, max(deadline - time.perf_counter(), 0))
+        time.sleep(seconds)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='无界面接收并分析ESP32S3音频数据')
+    parser.add_argument('--host', default='192.168.0.194', help='设备地址，串口如 /dev/ttyACM0、COM3，或 udp:// 在 --port 上接收UDP')
+    parser.add_argument('--port', type=int, default=8080, help='设备端口')
+    parser.add_argument('--duration', type=float, default=None, help='运行时长（秒），默认一直运行')
+    parser.add_argument('--interval', type=float, default=1.0, help='输出间隔（秒）')
+    parser.add_argument('--history', type=int, default=SAMPLE_RATE, help='分析窗口样本数')
+    parser.add_argument('--fps', type=int, default=DEFAULT_FPS, help='每秒分析帧数')
+    parser.add_argument('--log', default=None, help='追加写入JSON Lines记录的文件')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出到标准输出')
+    parser.add_argument('--publish', default=None, metavar='NAME',
+                        help='同时把样本发布到该名称的共享内存，供其他分析进程读取')
+    parser.add_argument('--jitter', type=int, default=DEFAULT_JITTER_FRAMES,
+                        help='UDP模式的抖动缓冲深度（帧）')
+    parser.add_argument('--fill', choices=FILL_MODES, default='zero',
+                        help='UDP模式丢失帧的补偿方式: zero 静音, repeat 重复上一帧')
+    args = parser.parse_args()
+
+    log_file = open(args.log, 'a', encoding='utf-8') if args.log else None
+
+    def on_record(record):
+        text = json.dumps(record, ensure_ascii=False)
+        print(text if args.json else HeadlessRunner.format_record(record), flush=True)
+        if log_file is not None:
+            log_file.write(text + '\n')
+            log_file.flush()
+
+    try:
+        try:
+            runner = HeadlessRunner(args.host, args.port, args.history, args.interval, args.fps,
+                                    on_record=on_record, publish=args.publish,
+                                    jitter_frames=args.jitter, jitter_fill=args.fill)
+        except FileExistsError as e:
+            print(f"无法发布到共享内存: {e}")
+            return 1
+        if runner.publisher is not None and runner.publisher.replaced_stale:
+            print(f"共享内存 {args.publish} 是上次异常退出时留下的，已重新创建")
+        runner.run(args.duration)
+    finally:
+        if log_file is not None:
+            log_file.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
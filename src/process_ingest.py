@@ -0,0 +1,170 @@
+"""
+多进程接收 - 设备按组分配到工作进程中接收与解析，样本经共享内存样本环交给主进程
+"""
+
+import os
+import math
+import threading
+import multiprocessing
+from async_ingest import AsyncIngest, RECONNECT_DELAY
+from shared_ring import SharedSamplePublisher, SharedRingConsumer, DEFAULT_SHARED_CAPACITY
+
+# 每个工作进程负责的设备数
+DEVICES_PER_WORKER = 8
+
+# 工作进程同步采样率、检查停止请求的间隔（秒）
+WORKER_POLL_INTERVAL = 0.1
+
+# 等待工作进程退出的时间（秒），超时后强制结束
+WORKER_JOIN_TIMEOUT = 5.0
+
+
+class ProcessDevice:
+    """主进程中的设备
+
+    与 DeviceConnection 一样提供 sample_ring、samples_received、connected 与
+    message；sample_ring 是共享内存样本环的拷贝读取端（SharedRingConsumer），
+    被工作进程覆盖的样本在读取时丢弃并计入溢出，可以直接作为分析引擎或设备
+    注册表的输入。
+    """
+
+    def __init__(self, name, host, port, shm_name, capacity):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.shm_name = shm_name
+        # 主进程创建并负责删除共享内存，工作进程连接后写入
+        self.publisher = SharedSamplePublisher(shm_name, capacity)
+        self.sample_ring = SharedRingConsumer(shm_name)
+        self.connected = False
+        self.connect_count = 0
+        self.message = "未连接"
+        self._final_samples = None  # 删除共享内存时的累计样本数
+
+    @property
+    def samples_received(self):
+        if self._final_samples is not None:
+            return self._final_samples
+        return self.sample_ring.write_index
+
+    def close(self):
+        self._final_samples = self.sample_ring.write_index
+        self.sample_ring.close()
+        self.publisher.close()
+
+
+def _run_worker(devices, status_queue, stop_event, reconnect_delay):
+    """工作进程：一个 AsyncIngest 接收本组设备，解析出的样本写入共享内存"""
+    ingest = AsyncIngest(on_status=lambda device, connected, message:
+                         status_queue.put((device.name, connected, message)),
+                         reconnect_delay=reconnect_delay)
+    publishers = []
+    for name, host, port, shm_name in devices:
+        publisher = SharedSamplePublisher(shm_name, create=False)
+        connection = ingest.add_device(name, host, port, sample_ring=publisher)
+        publishers.append((connection, publisher))
+    ingest.start()
+    try:
+        while not stop_event.wait(WORKER_POLL_INTERVAL):
+            for connection, publisher in publishers:
+                publisher.set_sample_rate(connection.parser.sample_rate)
+    except KeyboardInterrupt:
+        pass  # 主进程负责停止
+    finally:
+        ingest.stop()
+        for _, publisher in publishers:
+            publisher.close()
+
+
+class ProcessIngest:
+    """多进程接收器
+
+    每 devices_per_worker 个设备一个工作进程，进程内用 AsyncIngest 接收并解析
+    （JSON/文本解析不再与主进程的FFT、绘图争用GIL），样本写入主进程创建的
+    共享内存样本环，主进程零拷贝读取。连接状态经队列送回主进程，由转发线程
+    调用 on_status(device, connected, message)。
+    设备需要在 start() 之前添加；stop() 后共享内存被删除。
+    """
+
+    def __init__(self, devices_per_worker=DEVICES_PER_WORKER, capacity=DEFAULT_SHARED_CAPACITY,
+                 on_status=None, reconnect_delay=RECONNECT_DELAY):
+        self.devices_per_worker = devices_per_worker
+        self.capacity = capacity
+        self.on_status = on_status
+        self.reconnect_delay = reconnect_delay
+        self.devices = {}
+        self.workers = []
+        self.status_queue = None
+        self.stop_event = None
+        self.status_thread = None
+
+    def add_device(self, name, host, port):
+        """添加设备，返回 ProcessDevice"""
+        if self.workers:
+            raise RuntimeError("工作进程运行时不能添加设备")
+        if name in self.devices:
+            raise ValueError(f"设备已存在: {name}")
+        shm_name = f"ingest_{os.getpid()}_{id(self):x}_{len(self.devices)}"
+        device = ProcessDevice(name, host, port, shm_name, self.capacity)
+        self.devices[name] = device
+        return device
+
+    @property
+    def worker_count(self):
+        return math.ceil(len(self.devices) / self.devices_per_worker)
+
+    def start(self):
+        """启动工作进程"""
+        # 使用spawn启动，不复制主进程中的Qt与其他线程状态
+        context = multiprocessing.get_context('spawn')
+        self.status_queue = context.Queue()
+        self.stop_event = context.Event()
+        devices = [(d.name, d.host, d.port, d.shm_name) for d in self.devices.values()]
+        for start in range(0, len(devices), self.devices_per_worker):
+            worker = context.Process(target=_run_worker,
+                                     args=(devices[start:start + self.devices_per_worker],
+                                           self.status_queue, self.stop_event,
+                                           self.reconnect_delay))
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+        self.status_thread = threading.Thread(target=self._forward_status)
+        self.status_thread.daemon = True
+        self.status_thread.start()
+
+    def stop(self):
+        """停止工作进程并删除共享内存"""
+        if self.stop_event is not None:
+            self.stop_event.set()
+            for worker in self.workers:
+                worker.join(WORKER_JOIN_TIMEOUT)
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+            self.status_queue.put(None)
+            self.status_thread.join()
+            self.workers = []
+            self.stop_event = None
+        for device in self.devices.values():
+            if device.connected:
+                self._set_status(device, False, "已断开连接")
+            device.close()
+
+    def _set_status(self, device, connected, message):
+        device.connected = connected
+        device.message = message
+        if connected:
+            device.connect_count += 1
+        if self.on_status is not None:
+            self.on_status(device, connected, message)
+
+    def _forward_status(self):
+        """状态转发线程：把工作进程的连接状态变化送到主进程的设备对象"""
+        while True:
+            item = self.status_queue.get()
+            if item is None:
+                break
+            name, connected, message = item
+            device = self.devices.get(name)
+            if device is not None:
+                self._set_status(device, connected, message)
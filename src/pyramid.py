@@ -0,0 +1,207 @@
+"""
+多分辨率波形索引 - 2^k 抽取的最小/最大/RMS金字塔，随数据到达增量更新
+"""
+
+import numpy as np
+from ring_buffer import AudioRingBuffer
+
+# 最细一层每个条目汇总 2^9 = 512 个样本
+BASE_LEVEL = 9
+
+# 最粗一层的条目数不超过此值
+TOP_ENTRIES = 1024
+
+# 默认保留2小时（16kHz）
+DEFAULT_PYRAMID_SAMPLES = 16000 * 60 * 60 * 2
+
+
+class PyramidLevel:
+    """金字塔的一层：每个条目汇总 2^level 个样本的最小值、最大值与均方值"""
+
+    def __init__(self, level, history_samples):
+        self.level = level
+        self.decimation = 1 << level
+        capacity = -(-history_samples // self.decimation) + 1
+        self.mins = AudioRingBuffer(capacity, dtype=np.int16)
+        self.maxs = AudioRingBuffer(capacity, dtype=np.int16)
+        self.mean_squares = AudioRingBuffer(capacity, dtype=np.float32)
+        self.pending = None  # 等待与下一个条目合并到上一层的条目
+
+    @property
+    def written(self):
+        """已完成的条目总数（条目i覆盖样本 [i*decimation, (i+1)*decimation)）"""
+        return self.mins.total_written
+
+    @property
+    def first(self):
+        """仍保留的最早条目序号"""
+        return self.written - len(self.mins)
+
+    @property
+    def nbytes(self):
+        return sum(ring._storage.nbytes for ring in (self.mins, self.maxs, self.mean_squares))
+
+    def append(self, mins, maxs, mean_squares):
+        self.mins.append(mins)
+        self.maxs.append(maxs)
+        self.mean_squares.append(mean_squares)
+
+    def entries(self, begin, end):
+        """返回条目 [begin, end) 的 (最小值, 最大值, 均方值) 只读视图"""
+        back = self.written - begin
+        count = end - begin
+        return (self.mins.latest(back)[:count], self.maxs.latest(back)[:count],
+                self.mean_squares.latest(back)[:count])
+
+    def clear(self):
+        self.mins.clear()
+        self.maxs.clear()
+        self.mean_squares.clear()
+        self.pending = None
+
+
+class AudioPyramid:
+    """多分辨率最小/最大/RMS索引
+
+    最底层按 2^BASE_LEVEL 个样本汇总，往上每层把相邻两个条目合并为一个，
+    新数据到达时只向上传递新完成的条目（向量化reshape，摊销O(新样本数)）。
+    各层占用约为原始数据的几个百分点。query() 根据可见范围与像素宽度
+    选择每像素约一个条目的层级，因此缩放/平移的绘制开销与可见时长无关；
+    放大到不足一个底层条目时，从原始环形缓冲区直接取样本。
+    """
+
+    def __init__(self, raw_buffer=None, history_samples=DEFAULT_PYRAMID_SAMPLES,
+                 base_level=BASE_LEVEL, top_entries=TOP_ENTRIES):
+        self.raw_buffer = raw_buffer
+        self.history_samples = int(history_samples)
+        self.levels = []
+        level = base_level
+        while True:
+            self.levels.append(PyramidLevel(level, self.history_samples))
+            if self.history_samples >> level <= top_entries:
+                break
+            level += 1
+        self.reset()
+
+    @property
+    def base(self):
+        return self.levels[0]
+
+    @property
+    def nbytes(self):
+        """索引占用的内存（字节）"""
+        return sum(level.nbytes for level in self.levels)
+
+    @property
+    def overhead(self):
+        """索引内存相对同样时长int16原始数据的比例"""
+        return self.nbytes / (self.history_samples * 2)
+
+    def reset(self):
+        """清空索引"""
+        for level in self.levels:
+            level.clear()
+        self.total_samples = 0
+        self._tail = np.zeros(0, dtype=np.int16)  # 不足一个底层条目的样本
+
+    def push(self, samples):
+        """送入新样本，增量更新各层"""
+        samples = np.asarray(samples, dtype=np.int16)
+        if not len(samples):
+            return
+        self.total_samples += len(samples)
+        data = np.concatenate((self._tail, samples)) if len(self._tail) else samples
+        decimation = self.base.decimation
+        count = len(data) // decimation
+        self._tail = data[count * decimation:].copy()
+        if count == 0:
+            return
+
+        blocks = data[:count * decimation].reshape(count, decimation)
+        mins = blocks.min(axis=1)
+        maxs = blocks.max(axis=1)
+        wide = blocks.astype(np.float32)
+        mean_squares = (np.einsum('ij,ij->i', wide, wide, dtype=np.float64) / decimation).astype(np.float32)
+
+        for index, level in enumerate(self.levels):
+            level.append(mins, maxs, mean_squares)
+            if index + 1 == len(self.levels):
+                break
+            # 与上次剩下的条目一起两两合并，送往上一层
+            if level.pending is not None:
+                pending_min, pending_max, pending_ms = level.pending
+                mins = np.concatenate(([pending_min], mins))
+                maxs = np.concatenate(([pending_max], maxs))
+                mean_squares = np.concatenate(([pending_ms], mean_squares))
+            pairs = len(mins) // 2
+            level.pending = (mins[-1], maxs[-1], mean_squares[-1]) if len(mins) % 2 else None
+            if pairs == 0:
+                break
+            mins = mins[:2 * pairs].reshape(pairs, 2).min(axis=1)
+            maxs = maxs[:2 * pairs].reshape(pairs, 2).max(axis=1)
+            mean_squares = mean_squares[:2 * pairs].reshape(pairs, 2).mean(axis=1)
+
+    def select_level(self, samples_per_pixel):
+        """选择条目跨度不超过每像素样本数的最粗层级"""
+        chosen = self.base
+        for level in self.levels:
+            if level.decimation > samples_per_pixel:
+                break
+            chosen = level
+        return chosen
+
+    def query(self, start, end, pixels):
+        """取样本区间 [start, end) 的绘图数据
+
+        返回 (x, y, rms, decimation)：x/y 为每个条目的 (最小值, 最大值) 点对，
+        x 为条目起始样本序号；rms 与 x[::2] 对应。decimation 为1时 y 是原始样本，
+        rms 为None。
+        """
+        pixels = max(1, int(pixels))
+        start = max(int(start), 0)
+        end = min(int(end), self.total_samples)
+        if end <= start:
+            empty = np.zeros(0)
+            return empty, empty, None, 1
+
+        samples_per_pixel = (end - start) / pixels
+        raw = self.raw_buffer
+        if raw is not None and samples_per_pixel < self.base.decimation:
+            raw_start = raw.total_written - len(raw)
+            if start >= raw_start and end <= raw.total_written:
+                return self._query_raw(start, end, int(samples_per_pixel))
+
+        level = self.select_level(samples_per_pixel)
+        decimation = level.decimation
+        begin = max(start // decimation, level.first)
+        stop = min(-(-end // decimation), level.written)
+        if stop <= begin:
+            empty = np.zeros(0)
+            return empty, empty, None, decimation
+        mins, maxs, mean_squares = level.entries(begin, stop)
+        x = np.repeat(np.arange(begin, stop) * decimation, 2)
+        y = np.empty(2 * len(mins), dtype=np.int16)
+        y[0::2] = mins
+        y[1::2] = maxs
+        return x, y, np.sqrt(mean_squares), decimation
+
+    def _query_raw(self, start, end, factor):
+        """从原始样本取数据；每像素多于一个样本时按factor现场归约"""
+        raw = self.raw_buffer
+        samples = raw.latest(raw.total_written - start)[:end - start]
+        if factor <= 1:
+            return np.arange(start, end), samples, None, 1
+
+        # 按全局样本序号对齐分组，平移时分组边界保持不变
+        skip = (-start) % factor
+        count = (len(samples) - skip) // factor
+        if count <= 0:
+            return np.arange(start, end), samples, None, 1
+        blocks = samples[skip:skip + count * factor].reshape(count, factor)
+        y = np.empty(2 * count, dtype=np.int16)
+        y[0::2] = blocks.min(axis=1)
+        y[1::2] = blocks.max(axis=1)
+        wide = blocks.astype(np.float32)
+        rms = np.sqrt(np.einsum('ij,ij->i', wide, wide, dtype=np.float64) / factor)
+        x = np.repeat(start + skip + np.arange(count) * factor, 2)
+        return x, y, rms, factor
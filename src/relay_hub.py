@@ -0,0 +1,213 @@
+"""
+转发中心 - 保持与设备的唯一连接，把解码后的音频帧转发给多个本地订阅者（TCP / Unix套接字）
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+from collections import deque
+from frame_protocol import encode_frame, MAX_FRAME_SAMPLES
+from ring_buffer import SPSCSampleRing
+from async_ingest import AsyncIngest
+
+DEFAULT_RELAY_PORT = 8081
+
+# 每个订阅者最多排队的帧数：超过时丢弃最旧的帧，慢订阅者只丢自己的帧，不影响其他订阅者
+SUBSCRIBER_QUEUE_FRAMES = 64
+
+# 每个订阅者连接的发送缓冲上限（字节）：超过后暂停写入，新帧进入上面的队列
+SUBSCRIBER_WRITE_BUFFER = 64 * 1024
+
+
+class Subscriber(asyncio.Protocol):
+    """一个本地订阅者连接
+
+    发送缓冲未满时帧直接写入连接；连接暂停写入（对方读得慢）期间帧进入有界
+    队列，队列满时丢弃最旧的帧并计数。订阅者收到的是带连续帧序号的二进制帧，
+    被丢弃的帧在订阅者的 FrameParser 中计入 frames_lost。
+    """
+
+    def __init__(self, hub, max_queue):
+        self.hub = hub
+        self.max_queue = max_queue
+        self.queue = deque()
+        self.paused = False
+        self.transport = None
+        self.address = None
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    def connection_made(self, transport):
+        transport.set_write_buffer_limits(high=self.hub.write_buffer)
+        self.transport = transport
+        self.address = transport.get_extra_info('peername') or 'unix'
+        self.hub._add_subscriber(self)
+
+    def connection_lost(self, exc):
+        self.hub._remove_subscriber(self)
+        self.queue.clear()
+
+    def data_received(self, data):
+        pass  # 订阅者不需要发送数据
+
+    def pause_writing(self):
+        self.paused = True
+
+    def resume_writing(self):
+        self.paused = False
+        while self.queue and not self.paused:
+            self._write(self.queue.popleft())
+
+    def send(self, message):
+        """发送一帧（由事件循环线程调用）"""
+        if self.transport.is_closing():
+            return
+        if not self.paused:
+            self._write(message)
+            return
+        self.queue.append(message)
+        if len(self.queue) > self.max_queue:
+            self.queue.popleft()
+            self.frames_dropped += 1
+
+    def _write(self, message):
+        self.transport.write(message)
+        self.frames_sent += 1
+
+
+class RelayHub:
+    """转发中心
+
+    固件的 WiFiServer 只服务一个客户端，第二个上位机连接会挤掉第一个。转发中心
+    通过 AsyncIngest 保持唯一的上游连接（与 DataReceiver 相同的自动格式检测与解析），
+    每个解码出的帧只编码一次二进制帧，再写给所有订阅者。订阅者按设备的方式连接
+    （app.py 填写转发中心的地址与端口即可），也可以连接Unix套接字。
+    上游接收、编码与所有订阅者的发送都在同一个事件循环线程中完成。
+    """
+
+    def __init__(self, upstream_host, upstream_port, host='127.0.0.1', port=DEFAULT_RELAY_PORT,
+                 unix_path=None, max_queue=SUBSCRIBER_QUEUE_FRAMES,
+                 write_buffer=SUBSCRIBER_WRITE_BUFFER, on_status=None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.max_queue = max_queue
+        self.write_buffer = write_buffer
+        self.on_status = on_status
+        self.subscribers = []
+        self.servers = []
+        self.sequence = 0
+        self.frames_relayed = 0
+        self.subscriber_count = 0  # 累计连接过的订阅者数
+        self.ingest = AsyncIngest(on_status=self._on_upstream_status)
+        # 上游样本不在本进程分析，只需要一个小样本环
+        self.upstream = self.ingest.add_device('上游', upstream_host, upstream_port,
+                                               sample_ring=SPSCSampleRing(1 << 14),
+                                               on_frame=self._broadcast)
+
+    def start(self):
+        """启动事件循环，开始监听订阅者并连接上游"""
+        self.ingest.start()
+        asyncio.run_coroutine_threadsafe(self._start_servers(), self.ingest.loop).result()
+
+    def stop(self):
+        """断开所有订阅者与上游"""
+        if self.ingest.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._stop_servers(), self.ingest.loop).result()
+        self.ingest.stop()
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+    def stats(self):
+        """各订阅者的地址、已发送帧数、丢弃帧数与排队帧数"""
+        return [(s.address, s.frames_sent, s.frames_dropped, len(s.queue))
+                for s in list(self.subscribers)]
+
+    async def _start_servers(self):
+        loop = asyncio.get_running_loop()
+        factory = lambda: Subscriber(self, self.max_queue)
+        server = await loop.create_server(factory, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]  # 端口为0时使用系统分配的端口
+        self.servers.append(server)
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)  # 上次异常退出留下的套接字文件
+            self.servers.append(await loop.create_unix_server(factory, self.unix_path))
+
+    async def _stop_servers(self):
+        for server in self.servers:
+            server.close()
+        for subscriber in list(self.subscribers):
+            # 发送缓冲非空的订阅者（对方不再读取）直接中止，避免等待永远发不完的数据
+            if subscriber.transport.get_write_buffer_size():
+                subscriber.transport.abort()
+            else:
+                subscriber.transport.close()
+        for server in self.servers:
+            await server.wait_closed()
+        self.servers = []
+
+    def _add_subscriber(self, subscriber):
+        self.subscribers.append(subscriber)
+        self.subscriber_count += 1
+        print(f"订阅者连接: {subscriber.address}")
+
+    def _remove_subscriber(self, subscriber):
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+            print(f"订阅者断开: {subscriber.address} (发送 {subscriber.frames_sent} 帧, "
+                  f"丢弃 {subscriber.frames_dropped} 帧)")
+
+    def _on_upstream_status(self, device, connected, message):
+        print(f"上游{message}")
+        if self.on_status is not None:
+            self.on_status(connected, message)
+
+    def _broadcast(self, frame):
+        """事件循环线程：每帧编码一次，写给所有订阅者"""
+        sample_rate = self.upstream.parser.sample_rate
+        for start in range(0, len(frame), MAX_FRAME_SAMPLES):
+            message = encode_frame(frame[start:start + MAX_FRAME_SAMPLES], self.sequence, sample_rate)
+            self.sequence += 1
+            self.frames_relayed += 1
+            for subscriber in self.subscribers:
+                subscriber.send(message)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='ESP32S3 Sense 音频转发中心')
+    parser.add_argument('--upstream', default='192.168.0.194:8080', help='设备地址 IP:端口')
+    parser.add_argument('--host', default='127.0.0.1', help='订阅者监听地址')
+    parser.add_argument('--port', type=int, default=DEFAULT_RELAY_PORT, help='订阅者监听端口')
+    parser.add_argument('--unix', default=None, help='同时监听的Unix套接字路径')
+    parser.add_argument('--queue', type=int, default=SUBSCRIBER_QUEUE_FRAMES,
+                        help='每个订阅者最多排队的帧数')
+    parser.add_argument('--interval', type=float, default=5.0, help='状态输出间隔（秒）')
+    args = parser.parse_args()
+
+    upstream_host, _, upstream_port = args.upstream.rpartition(':')
+    if args.unix and not hasattr(socket, 'AF_UNIX'):
+        parser.error("当前系统不支持Unix套接字")
+    hub = RelayHub(upstream_host, int(upstream_port), args.host, args.port, args.unix, args.queue)
+    hub.start()
+    print(f"转发中心监听 {args.host}:{hub.port}" + (f" 与 {args.unix}" if args.unix else ""))
+    try:
+        while True:
+            time.sleep(args.interval)
+            dropped = sum(stats[2] for stats in hub.stats())
+            print(f"[{time.strftime('%H:%M:%S')}] 上游{'已连接' if hub.upstream.connected else '未连接'} | "
+                  f"转发 {hub.frames_relayed} 帧 | 订阅者 {len(hub.subscribers)} | 丢弃 {dropped} 帧")
+    except KeyboardInterrupt:
+        print("\n正在停止转发中心...")
+    finally:
+        hub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
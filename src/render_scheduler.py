@@ -0,0 +1,95 @@
+"""
+自适应刷新调度 - 数据有变化才重绘，渲染跟不上时合并帧，窗口最小化时暂停绘制
+"""
+
+import time
+from collections import deque
+from PyQt6.QtCore import QObject, QTimer
+from engine import DEFAULT_FPS
+
+MAX_FPS = 60
+
+# 渲染耗时指数平均的平滑系数
+RENDER_TIME_SMOOTHING = 0.2
+
+
+class RenderScheduler(QObject):
+    """图表刷新调度器
+
+    poll 每次触发都会调用（例如取走接收线程写入的新样本），render 只在
+    脏标记被置位且窗口可见时调用。定时器为单次触发：每帧结束后按目标
+    帧间隔减去本帧耗时安排下一帧；本帧耗时超过帧间隔时，至少留出同样
+    长的空闲时间处理界面事件，期间到达的数据合并到下一帧一起绘制，
+    不会像固定周期定时器那样积压。
+    """
+
+    def __init__(self, window, render, poll=None, fps=DEFAULT_FPS):
+        super().__init__()
+        self.window = window
+        self.render = render
+        self.poll = poll
+        self.dirty = True
+        self.paused = False
+        self.render_time = 0.0  # 渲染耗时的指数平均（秒）
+        self.frames_rendered = 0
+        self.frames_skipped = 0  # 无变化而跳过的触发次数
+        self._frame_times = deque(maxlen=2 * MAX_FPS)
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._tick)
+        self.set_fps(fps)
+
+    def set_fps(self, fps):
+        """设置目标帧率（1 ~ MAX_FPS）"""
+        self.fps = max(1, min(int(fps), MAX_FPS))
+        self.interval = 1.0 / self.fps
+
+    def mark_dirty(self, *args):
+        """标记需要重绘（可直接连接到任意信号）"""
+        self.dirty = True
+
+    def start(self):
+        self.timer.start(0)
+
+    def stop(self):
+        self.timer.stop()
+
+    @property
+    def achieved_fps(self):
+        """最近一秒内实际绘制的帧数"""
+        now = time.perf_counter()
+        while self._frame_times and now - self._frame_times[0] > 1.0:
+            self._frame_times.popleft()
+        return len(self._frame_times)
+
+    def _tick(self):
+        start = time.perf_counter()
+        try:
+            if self.poll is not None:
+                self.poll()
+            if self.window.isMinimized() or not self.window.isVisible():
+                # 暂停绘制，恢复显示时重绘一次
+                self.paused = True
+                self.dirty = True
+            elif self.dirty:
+                self.paused = False
+                # 先清除标记：绘制过程中产生的新变化留到下一帧
+                self.dirty = False
+                self._render_frame()
+            else:
+                self.frames_skipped += 1
+        finally:
+            busy = time.perf_counter() - start
+            self.timer.start(int(max(self.interval - busy, busy) * 1000))
+
+    def _render_frame(self):
+        start = time.perf_counter()
+        self.render()
+        now = time.perf_counter()
+        elapsed = now - start
+        if self.frames_rendered:
+            self.render_time += RENDER_TIME_SMOOTHING * (elapsed - self.render_time)
+        else:
+            self.render_time = elapsed
+        self.frames_rendered += 1
+        self._frame_times.append(now)
@@ -0,0 +1,174 @@
+"""
+音频环形缓冲区 - 固定容量、O(1)追加、零拷贝读取最新数据
+"""
+
+import numpy as np
+
+# 历史数据上限：16kHz采样率下5分钟
+MAX_HISTORY_SAMPLES = 16000 * 60 * 5
+
+
+class AudioRingBuffer:
+    """固定容量的音频环形缓冲区
+
+    存储区长度为容量的两倍，每个样本同时写入 i 和 i + capacity 两个位置，
+    因此任意"最新N个样本"在存储区中都是连续的，可以直接返回视图而无需拷贝。
+    追加一帧的开销只与帧长有关，与历史长度无关。
+    """
+
+    def __init__(self, capacity, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError("环形缓冲区容量必须大于0")
+        self.dtype = np.dtype(dtype)
+        self.capacity = int(capacity)
+        self._storage = np.zeros(2 * self.capacity, dtype=self.dtype)
+        self._head = 0  # 下一个写入位置
+        self._size = 0
+        self.total_written = 0  # 累计写入样本数
+        self.version = 0  # 数据版本号，每次写入、清空或改变容量后递增
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        """清空缓冲区"""
+        self._head = 0
+        self._size = 0
+        self.version += 1
+
+    def append(self, samples):
+        """追加样本（超出容量时覆盖最旧的数据）"""
+        samples = np.asarray(samples)
+        count = len(samples)
+        if count == 0:
+            return
+        self.total_written += count
+        if count > self.capacity:
+            samples = samples[-self.capacity:]
+            count = self.capacity
+
+        capacity = self.capacity
+        head = self._head
+        first = min(count, capacity - head)
+        rest = count - first
+        storage = self._storage
+        storage[head:head + first] = samples[:first]
+        storage[head + capacity:head + capacity + first] = samples[:first]
+        if rest:
+            storage[:rest] = samples[first:]
+            storage[capacity:capacity + rest] = samples[first:]
+
+        self._head = (head + count) % capacity
+        self._size = min(self._size + count, capacity)
+        self.version += 1
+
+    def latest(self, count=None):
+        """返回最新count个样本的只读视图（按时间顺序，默认全部）
+
+        视图直接引用内部存储，后续写入会改变其内容；需要长期保存时请复制。
+        """
+        if count is None or count > self._size:
+            count = self._size
+        end = self._head + self.capacity
+        view = self._storage[end - count:end]
+        view.flags.writeable = False
+        return view
+
+    def resize(self, capacity):
+        """修改容量，保留最新的数据"""
+        capacity = int(capacity)
+        if capacity == self.capacity:
+            return
+        if capacity <= 0:
+            raise ValueError("环形缓冲区容量必须大于0")
+        keep = self.latest(capacity).copy()
+        total_written = self.total_written
+        self.capacity = capacity
+        self._storage = np.zeros(2 * capacity, dtype=self.dtype)
+        self._head = 0
+        self._size = 0
+        self.append(keep)
+        self.total_written = total_written
+
+
+class SPSCSampleRing:
+    """单生产者/单消费者的无锁样本环
+
+    写索引只由生产者（接收线程）修改，读索引只由消费者（GUI定时器）修改，
+    两个索引都单调递增，双方都不需要加锁。生产者从不阻塞：消费者跟不上时
+    旧数据直接被覆盖，消费者读取时检测到并计入溢出统计，而不是让队列无限增长。
+    生产者写入存储区之前先把预留索引推进到本次写入的末尾，写完再发布写索引；
+    消费者拷贝完成后按预留索引检查，正在写入中的区域也算作已被覆盖。
+    """
+
+    def __init__(self, capacity=1 << 18, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError("样本环容量必须大于0")
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self._storage = np.zeros(self.capacity, dtype=self.dtype)
+        self.reserve_index = 0  # 生产者拥有，正在写入的区域的末尾
+        self.write_index = 0  # 生产者拥有
+        self.read_index = 0  # 消费者拥有
+        self.overrun_count = 0  # 发生溢出的次数（消费者统计）
+        self.overrun_samples = 0  # 因溢出丢失的样本数
+
+    def available(self):
+        """当前可读的样本数（不超过容量）"""
+        return min(self.write_index - self.read_index, self.capacity)
+
+    def write(self, samples):
+        """生产者调用：写入样本，永不阻塞"""
+        samples = np.asarray(samples)
+        count = len(samples)
+        if count == 0:
+            return
+        write_index = self.write_index
+        if count > self.capacity:
+            # 单次写入超过容量，只保留最新的数据
+            write_index += count - self.capacity
+            samples = samples[-self.capacity:]
+            count = self.capacity
+
+        # 先预留再写入，消费者据此发现拷贝期间被改写的样本
+        self.reserve_index = write_index + count
+        position = write_index % self.capacity
+        first = min(count, self.capacity - position)
+        self._storage[position:position + first] = samples[:first]
+        if count > first:
+            self._storage[:count - first] = samples[first:]
+        # 数据写完后再发布写索引
+        self.write_index = write_index + count
+
+    def read_available(self):
+        """消费者调用：一次取走所有可读样本（拷贝），无数据时返回空数组"""
+        write_index = self.write_index
+        read_index = self.read_index
+        if write_index - read_index > self.capacity:
+            self._record_overrun(write_index - self.capacity - read_index)
+            read_index = write_index - self.capacity
+
+        count = write_index - read_index
+        if count == 0:
+            return np.zeros(0, dtype=self.dtype)
+
+        position = read_index % self.capacity
+        first = min(count, self.capacity - position)
+        if first == count:
+            samples = self._storage[position:position + count].copy()
+        else:
+            samples = np.concatenate((self._storage[position:],
+                                      self._storage[:count - first]))
+
+        # 拷贝期间生产者可能已经覆盖（或正在覆盖）最旧的部分，丢弃这部分数据
+        overwritten = min(self.reserve_index - self.capacity - read_index, count)
+        if overwritten > 0:
+            self._record_overrun(overwritten)
+            samples = samples[overwritten:]
+
+        self.read_index = write_index
+        return samples
+
+    def _record_overrun(self, lost):
+        self.overrun_count += 1
+        self.overrun_samples += lost
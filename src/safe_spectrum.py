@@ -8,6 +8,7 @@ import pyqtgraph as pg
 from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget
 from PyQt6.QtCore import QTimer
 import sys
+from stft import StreamingSTFT
 
 class SafeSpectrumAnalyzer:
     """安全的频谱分析器"""
@@ -16,37 +17,24 @@ class SafeSpectrumAnalyzer:
         self.sample_rate = 16000
         self.fft_size = 2048
         self.freq_resolution = self.sample_rate / self.fft_size
+        # 窗函数与频率轴只计算一次，由STFT引擎缓存
+        self.stft = StreamingSTFT(self.sample_rate, self.fft_size)
         
-    def safe_fft(self, audio_data):
-        """安全的FFT计算"""
-        if len(audio_data) < self.fft_size:
-            # 如果数据不足，用零填充
-            padded_data = np.zeros(self.fft_size)
-            padded_data[:len(audio_data)] = audio_data
-            audio_data = padded_data
-        else:
-            # 取最近的FFT_SIZE个样本
-            audio_data = audio_data[-self.fft_size:]
-        
-        # 应用窗函数
-        window = np.hanning(self.fft_size)
-        windowed_data = audio_data * window
-        
-        # 计算FFT
-        fft_result = np.fft.fft(windowed_data)
-        
-        # 计算幅度谱
-        magnitude = np.abs(fft_result)
-        
-        # 计算频率轴
-        freq_axis = np.fft.fftfreq(self.fft_size, 1/self.sample_rate)
-        
-        # 只取正频率部分
-        positive_mask = freq_axis >= 0
-        freq_axis = freq_axis[positive_mask]
-        magnitude = magnitude[positive_mask]
+    def push(self, samples):
+        """送入新到达的样本，只对新样本构成的帧做FFT"""
+        self.stft.push(samples)
+    
+    @property
+    def version(self):
+        """频谱版本号，有新的频谱列时递增"""
+        return self.stft.version
+    
+    def safe_fft(self, audio_data=None):
+        """最新频谱（归一化到0-1），按STFT版本号缓存，没有新数据时不重新计算
         
-        return freq_axis, magnitude
+        还未累积满一帧时用 audio_data 补零计算；都没有时幅度为None。
+        """
+        return self.stft.frequencies, self.stft.normalized_spectrum(audio_data)
     
     def safe_db_conversion(self, magnitude):
         """安全的dB转换"""
@@ -94,24 +82,28 @@ class SafeSpectrumWindow(QMainWindow):
         self.plot_widget.setTitle('安全频谱分析')
         self.plot_widget.setXRange(0, 8000)  # 限制到8kHz避免溢出
         self.plot_widget.setYRange(-60, 0)
+        # 频谱曲线只创建一次，之后用setData更新
+        self.spectrum_curve = self.plot_widget.plot(pen=pg.mkPen('r', width=2))
         
         layout.addWidget(self.plot_widget)
         
         # 创建频谱分析器
         self.analyzer = SafeSpectrumAnalyzer()
         
-        # 模拟数据
-        self.audio_data = []
+        # 模拟数据：每次更新生成一个周期的新样本，相位连续
+        self.sample_index = 0
+        self.drawn_version = -1
         
         # 定时器更新
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_spectrum)
         self.timer.start(100)  # 10 FPS
         
-    def generate_test_data(self):
-        """生成测试数据"""
+    def generate_test_data(self, count=1600):
+        """生成测试数据（接着上一次的样本继续生成count个）"""
         # 生成包含多个频率的测试信号
-        t = np.linspace(0, 1, 2048)
+        t = (self.sample_index + np.arange(count)) / self.analyzer.sample_rate
+        self.sample_index += count
         signal = (np.sin(2 * np.pi * 440 * t) +  # 440Hz
                  0.5 * np.sin(2 * np.pi * 880 * t) +  # 880Hz
                  0.3 * np.sin(2 * np.pi * 1760 * t))  # 1760Hz
@@ -124,12 +116,16 @@ class SafeSpectrumWindow(QMainWindow):
     
     def update_spectrum(self):
         """更新频谱显示"""
-        # 生成测试数据
-        test_data = self.generate_test_data()
+        # 新样本送入STFT（100ms的样本）
+        self.analyzer.push(self.generate_test_data())
+        if self.analyzer.version == self.drawn_version:
+            return  # 没有新的频谱列，不重新计算与绘制
         
         try:
-            # 计算频谱
-            freq_axis, magnitude = self.analyzer.safe_fft(test_data)
+            # 取缓存的最新频谱
+            freq_axis, magnitude = self.analyzer.safe_fft()
+            if magnitude is None:
+                return
             
             # 转换为dB
             db_spectrum = self.analyzer.safe_db_conversion(magnitude)
@@ -143,8 +139,8 @@ class SafeSpectrumWindow(QMainWindow):
             normalized_db = normalized_db[freq_mask]
             
             # 更新图表
-            self.plot_widget.clear()
-            self.plot_widget.plot(freq_axis, normalized_db, pen=pg.mkPen('r', width=2))
+            self.spectrum_curve.setData(freq_axis, normalized_db)
+            self.drawn_version = self.analyzer.version
             
         except Exception as e:
             print(f"频谱更新错误: {e}")
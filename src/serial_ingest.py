@@ -0,0 +1,74 @@
+"""
+串口接收 - 通过USB-CDC/UART串口接收音频帧，与TCP共用同一套帧解析器
+"""
+
+import re
+
+# USB-CDC 忽略波特率，按USB全速传输；经USB转串口芯片时需要与固件一致
+DEFAULT_BAUDRATE = 2000000
+
+# 串口读取超时（秒）：没有数据时每隔这么久检查一次是否已断开
+SERIAL_TIMEOUT = 0.1
+
+# 串口地址：COM3、/dev/ttyACM0，可以用 @波特率 指定波特率，例如 /dev/ttyUSB0@921600
+SERIAL_ADDRESS_PATTERN = re.compile(r'^(COM\d+|/dev/\S+?)(?:@(\d+))?$', re.I)
+
+
+def parse_serial_address(address):
+    """解析串口地址，返回 (端口, 波特率)；不是串口地址时返回None"""
+    match = SERIAL_ADDRESS_PATTERN.match(address.strip())
+    if match is None:
+        return None
+    port, baudrate = match.groups()
+    return port, int(baudrate) if baudrate else DEFAULT_BAUDRATE
+
+
+class SerialStream:
+    """提供套接字 recv_into 接口的串口
+
+    FrameParser.receive() 直接调用 recv_into 读入预分配的接收缓冲区，串口与TCP
+    共用同一套二进制帧/JSON自动检测与解析。每次按 in_waiting 一次读取驱动中
+    已到达的全部字节（不超过缓冲区大小）；没有数据时阻塞到第一个字节到达，
+    超时后继续等待，直到串口被关闭。
+    """
+
+    def __init__(self, port, baudrate=DEFAULT_BAUDRATE, timeout=SERIAL_TIMEOUT):
+        # 只有打开串口时才导入pyserial，只用TCP时不需要安装
+        import serial
+        self.serial = serial.Serial(port, baudrate, timeout=timeout)
+        self.bytes_read = 0
+        self.read_count = 0
+
+    def recv_into(self, buffer, nbytes=0):
+        """读取到 buffer，返回读取的字节数（0表示串口已关闭）"""
+        view = memoryview(buffer)
+        size = min(nbytes or len(view), len(view))
+        while self.serial.is_open:
+            try:
+                waiting = self.serial.in_waiting
+                count = self.serial.readinto(view[:min(max(waiting, 1), size)])
+                if count and not waiting:
+                    # 等到的第一个字节之后，同一批数据通常已经到达
+                    waiting = min(self.serial.in_waiting, size - count)
+                    if waiting:
+                        count += self.serial.readinto(view[count:count + waiting])
+            except (OSError, TypeError):
+                if self.serial.is_open:
+                    raise
+                break  # 读取期间串口被 close() 关闭
+            if count:
+                self.bytes_read += count
+                self.read_count += 1
+                return count
+        return 0
+
+    def close(self):
+        # 先唤醒阻塞在读取中的接收线程；设备已拔出时 cancel_read 可能出错，
+        # 句柄仍要关闭，否则 Windows 上无法重新打开同一个COM口
+        try:
+            if hasattr(self.serial, 'cancel_read'):
+                self.serial.cancel_read()
+        except Exception:
+            pass
+        finally:
+            self.serial.close()
@@ -0,0 +1,272 @@
+"""
+共享内存样本环 - 接收器把样本发布到共享内存，同一主机上的其他分析进程零拷贝读取
+"""
+
+import os
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+from frame_protocol import DEFAULT_SAMPLE_RATE
+
+DEFAULT_SHARED_NAME = 'esp32_audio'
+
+# 共享内存默认容量：16kHz采样率下约16秒
+DEFAULT_SHARED_CAPACITY = 1 << 18
+
+# 头部：8个uint64字段（64字节），其后是 2 * capacity 个int16样本
+HEADER_FIELDS = 8
+HEADER_SIZE = HEADER_FIELDS * 8
+SHARED_MAGIC = 0x31474E4952445541  # b'AUDRING1'
+
+# 头部字段下标（OWNER_PID 为创建共享内存的进程号）
+MAGIC, CAPACITY, SAMPLE_RATE, RESERVE_INDEX, WRITE_INDEX, SEQUENCE, OWNER_PID = range(7)
+
+# 本进程发布的共享内存名称
+_published = set()
+
+
+class SharedSamplePublisher:
+    """共享内存样本环的发布端（单生产者）
+
+    布局与 AudioRingBuffer 相同：存储区长度为容量的两倍，每个样本同时写入
+    i 和 i + capacity 两个位置，读取端任意连续的一段都可以直接返回视图。
+    写入前先把 reserve_index 推进到本次写入的末尾，写完再发布 write_index 并
+    递增 sequence（已发布的帧数），读取端据此判断视图是否已被覆盖。
+    write(samples) 与 SPSCSampleRing 接口一致，也可以作为设备连接的样本环。
+    create=False 时连接另一个进程（例如 ProcessIngest 的主进程）已创建的共享内存
+    并从其中的写索引继续写入，共享内存的删除仍由创建方负责。
+    同名共享内存已存在时，只有创建它的进程已经退出（异常退出留下的）才删除
+    重建，并把 replaced_stale 置为True供调用方报告；仍在使用时抛出
+    FileExistsError，不接管其他发布端的共享内存。
+    """
+
+    def __init__(self, name=DEFAULT_SHARED_NAME, capacity=DEFAULT_SHARED_CAPACITY,
+                 sample_rate=DEFAULT_SAMPLE_RATE, create=True):
+        self.name = name
+        self.created = create
+        self.replaced_stale = False
+        if not create:
+            # 工作进程与创建共享内存的主进程共用资源跟踪器，不能取消跟踪
+            self.shm = _attach(name, untrack=False)
+            self.header = np.ndarray(HEADER_FIELDS, dtype=np.uint64, buffer=self.shm.buf)
+            self.capacity = int(self.header[CAPACITY])
+            self._storage = np.ndarray(2 * self.capacity, dtype=np.int16, buffer=self.shm.buf,
+                                       offset=HEADER_SIZE)
+            self.write_index = int(self.header[WRITE_INDEX])
+            self.sequence = int(self.header[SEQUENCE])
+            return
+        if capacity <= 0:
+            raise ValueError("样本环容量必须大于0")
+        self.capacity = int(capacity)
+        size = HEADER_SIZE + 2 * self.capacity * 2
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            _check_stale(name)
+            # 上次异常退出留下的共享内存
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.replaced_stale = True
+        _published.add(name)
+        self.header = np.ndarray(HEADER_FIELDS, dtype=np.uint64, buffer=self.shm.buf)
+        self._storage = np.ndarray(2 * self.capacity, dtype=np.int16, buffer=self.shm.buf,
+                                   offset=HEADER_SIZE)
+        self.header[:] = 0
+        self.header[CAPACITY] = self.capacity
+        self.header[SAMPLE_RATE] = sample_rate
+        self.header[OWNER_PID] = os.getpid()
+        self.write_index = 0
+        self.sequence = 0
+        # 所有字段就绪后再写魔数，读取端据此判断共享内存已初始化
+        self.header[MAGIC] = SHARED_MAGIC
+
+    def write(self, samples, sample_rate=None):
+        """写入样本并发布，永不阻塞（读取端跟不上时覆盖最旧的数据）"""
+        samples = np.asarray(samples)
+        count = len(samples)
+        if count == 0:
+            return
+        header = self.header
+        capacity = self.capacity
+        write_index = self.write_index
+        if count > capacity:
+            write_index += count - capacity
+            samples = samples[-capacity:]
+            count = capacity
+
+        header[RESERVE_INDEX] = write_index + count
+        position = write_index % capacity
+        first = min(count, capacity - position)
+        rest = count - first
+        storage = self._storage
+        storage[position:position + first] = samples[:first]
+        storage[position + capacity:position + capacity + first] = samples[:first]
+        if rest:
+            storage[:rest] = samples[first:]
+            storage[capacity:capacity + rest] = samples[first:]
+
+        if sample_rate:
+            header[SAMPLE_RATE] = sample_rate
+        self.write_index = write_index + count
+        self.sequence += 1
+        header[WRITE_INDEX] = self.write_index
+        header[SEQUENCE] = self.sequence
+
+    def set_sample_rate(self, sample_rate):
+        self.header[SAMPLE_RATE] = sample_rate
+
+    def close(self):
+        """释放共享内存，由本对象创建时同时删除（已连接的读取端仍可读到关闭前的数据）"""
+        if self.shm is None:
+            return
+        self.header = None
+        self._storage = None
+        self.shm.close()
+        if self.created:
+            self.shm.unlink()
+            _published.discard(self.name)
+        self.shm = None
+
+
+def _attach(name, untrack=True):
+    """连接已有的共享内存，本进程退出时不删除它"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.13 之前没有 track 参数，资源跟踪器会在读取进程退出时删除共享内存；
+        # 同一进程中的发布端仍需要跟踪，不能取消
+        shm = shared_memory.SharedMemory(name=name)
+        if untrack and name not in _published:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _process_alive(pid):
+    if os.name == 'nt':
+        # Windows 在最后一个句柄关闭时释放共享内存，已存在说明仍有进程在使用
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # 进程存在，属于其他用户
+    return True
+
+
+def _check_stale(name):
+    """同名共享内存仍在使用或不是样本环时抛出 FileExistsError"""
+    shm = _attach(name)
+    try:
+        if shm.size < HEADER_SIZE:
+            magic = owner = 0
+        else:
+            header = np.ndarray(HEADER_FIELDS, dtype=np.uint64, buffer=shm.buf)
+            magic, owner = int(header[MAGIC]), int(header[OWNER_PID])
+            del header
+    finally:
+        shm.close()
+    if magic != SHARED_MAGIC:
+        raise FileExistsError(f"共享内存 {name} 已存在且不是样本环")
+    if owner and _process_alive(owner):
+        raise FileExistsError(f"共享内存 {name} 正被进程 {owner} 发布，请使用其他名称")
+
+
+class SharedRingReader:
+    """共享内存样本环的读取端
+
+    latest() 与 read_available() 返回直接引用共享内存的只读视图，没有拷贝与
+    序列化。发布端只追加、从不等待读取端，视图中最旧的部分可能在使用期间被
+    覆盖：用完视图后调用 overwritten() 检查，返回值大于0时说明视图开头的这些
+    样本已被新数据替换，结果应丢弃或只使用视图末尾未被覆盖的部分。
+    每个读取端有自己的读索引，多个进程可以同时读取同一个样本环。
+    """
+
+    def __init__(self, name=DEFAULT_SHARED_NAME):
+        self.name = name
+        self.shm = _attach(name)
+        self.header = np.ndarray(HEADER_FIELDS, dtype=np.uint64, buffer=self.shm.buf)
+        if int(self.header[MAGIC]) != SHARED_MAGIC:
+            self.close()
+            raise ValueError(f"共享内存 {name} 不是样本环")
+        self.capacity = int(self.header[CAPACITY])
+        storage = np.ndarray(2 * self.capacity, dtype=np.int16, buffer=self.shm.buf,
+                             offset=HEADER_SIZE)
+        storage.flags.writeable = False
+        self._storage = storage
+        # 从连接时刻开始读取
+        self.read_index = self.write_index
+        self.view_start = self.read_index  # 最近一次返回的视图的首个样本下标
+        self.overrun_count = 0
+        self.overrun_samples = 0
+
+    @property
+    def write_index(self):
+        return int(self.header[WRITE_INDEX])
+
+    @property
+    def sample_rate(self):
+        return int(self.header[SAMPLE_RATE])
+
+    @property
+    def sequence(self):
+        """发布端已发布的帧数，可用于轮询是否有新数据"""
+        return int(self.header[SEQUENCE])
+
+    def latest(self, count):
+        """返回最新count个样本的只读视图（不超过容量与已写入的样本数）"""
+        write_index = self.write_index
+        count = min(count, self.capacity, write_index)
+        end = write_index % self.capacity + self.capacity
+        self.view_start = write_index - count
+        return self._storage[end - count:end]
+
+    def read_available(self):
+        """返回上次读取以来的新样本的只读视图，读取端跟不上时跳过被覆盖的部分"""
+        write_index = self.write_index
+        start = self.read_index
+        if write_index - start > self.capacity:
+            self.overrun_count += 1
+            self.overrun_samples += write_index - self.capacity - start
+            start = write_index - self.capacity
+        self.read_index = write_index
+        self.view_start = start
+        position = start % self.capacity
+        return self._storage[position:position + write_index - start]
+
+    def overwritten(self):
+        """最近一次返回的视图开头已被覆盖（或正在被覆盖）的样本数"""
+        return max(int(self.header[RESERVE_INDEX]) - self.capacity - self.view_start, 0)
+
+    def close(self):
+        """断开共享内存（之前返回的视图不能再使用）"""
+        if self.shm is None:
+            return
+        self.header = None
+        self._storage = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # 使用方仍持有视图，映射在视图释放后随对象回收
+        self.shm = None
+
+
+class SharedRingConsumer(SharedRingReader):
+    """拷贝样本的共享内存读取端，接口与 SPSCSampleRing 的消费者一致
+
+    read_available() 先拷贝新样本，再用 overwritten() 检查拷贝期间发布端是否
+    覆盖（或正在覆盖）了其中最旧的部分，丢弃这部分并计入溢出统计，返回的数组
+    不会再被其他进程修改。分析引擎、设备注册表等直接使用结果而不检查覆盖的
+    使用方应使用本类，而不是返回视图的 SharedRingReader。
+    """
+
+    def read_available(self):
+        """取走上次读取以来的新样本（拷贝），跳过被覆盖的部分"""
+        samples = super().read_available().copy()
+        overwritten = min(self.overwritten(), len(samples))
+        if overwritten > 0:
+            self.overrun_count += 1
+            self.overrun_samples += overwritten
+            samples = samples[overwritten:]
+        return samples
@@ -2,13 +2,13 @@ import sys
 import json
 import socket
 import threading
-import time
 import numpy as np
+from ring_buffer import AudioRingBuffer, MAX_HISTORY_SAMPLES
+from sliding_stats import SlidingStats
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QLabel, QPushButton, QTextEdit, QGroupBox,
-                             QGridLayout, QSpinBox, QComboBox, QProgressBar)
-from PyQt6.QtCore import QTimer, pyqtSignal, QObject, Qt
-from PyQt6.QtGui import QFont, QPalette, QColor
+                             QGridLayout, QSpinBox, QComboBox)
+from PyQt6.QtCore import QTimer, pyqtSignal, QObject
 
 class DataReceiver(QObject):
     """数据接收器类，用于从ESP32S3接收数据"""
@@ -108,15 +108,23 @@ class SimpleAudioVisualizer(QMainWindow):
         # 初始化UI
         self.init_ui()
         
-        # 初始化数据
-        self.audio_data = []
-        self.max_data_points = 1000
+        # 初始化数据（预分配的环形缓冲区）
+        self.max_data_points = self.data_points_input.value()
+        self.audio_buffer = AudioRingBuffer(self.max_data_points)
+        # 滑动窗口统计：随每帧增量更新，数据信息面板直接读取
+        self.stats = SlidingStats(self.audio_buffer)
         
         # 设置定时器用于更新显示
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_display)
         self.update_timer.start(100)  # 10 FPS
         
+        # 数据信息以较低频率刷新，且只在内容变化时更新
+        self._info_text = None
+        self.info_timer = QTimer()
+        self.info_timer.timeout.connect(self.update_info)
+        self.info_timer.start(250)  # 4 Hz
+        
     def init_ui(self):
         """初始化用户界面"""
         central_widget = QWidget()
@@ -182,7 +190,8 @@ class SimpleAudioVisualizer(QMainWindow):
         # 数据点数量设置
         control_layout.addWidget(QLabel("显示数据点:"))
         self.data_points_input = QSpinBox()
-        self.data_points_input.setRange(100, 5000)
+        self.data_points_input.setRange(100, MAX_HISTORY_SAMPLES)
+        self.data_points_input.setSingleStep(1000)
         self.data_points_input.setValue(1000)
         self.data_points_input.valueChanged.connect(self.update_max_data_points)
         control_layout.addWidget(self.data_points_input)
@@ -231,20 +240,17 @@ class SimpleAudioVisualizer(QMainWindow):
             
     def update_audio_data(self, data):
         """更新音频数据"""
-        self.audio_data.extend(data)
-        
-        # 限制数据点数量
-        if len(self.audio_data) > self.max_data_points:
-            self.audio_data = self.audio_data[-self.max_data_points:]
+        self.stats.append(data)
             
     def update_display(self):
         """更新显示"""
-        if self.audio_data:
+        audio_data = self.audio_buffer.latest()
+        if len(audio_data):
             current_chart_type = self.chart_type_combo.currentText()
             
             if current_chart_type == "波形图":
                 # 显示最新的音频数据
-                display_data = self.audio_data[-100:]  # 显示最后100个数据点
+                display_data = self.audio_buffer.latest(100).tolist()  # 显示最后100个数据点
                 display_text = "音频波形 (时域):\n"
                 
                 # 创建简单的文本波形
@@ -259,9 +265,9 @@ class SimpleAudioVisualizer(QMainWindow):
                 
             elif current_chart_type == "频谱图":
                 # 简单的频谱显示
-                if len(self.audio_data) >= 64:
+                if len(audio_data) >= 64:
                     # 计算简单的频谱（使用最近的数据）
-                    recent_data = self.audio_data[-512:] if len(self.audio_data) >= 512 else self.audio_data
+                    recent_data = self.audio_buffer.latest(512)
                     display_text = "音频频谱 (频域):\n"
                     
                     # 简单的频域分析 - 模拟FFT
@@ -273,9 +279,9 @@ class SimpleAudioVisualizer(QMainWindow):
                         end_idx = start_idx + chunk_size
                         chunk = recent_data[start_idx:end_idx]
                         
-                        if chunk:
+                        if len(chunk):
                             # 计算RMS值
-                            rms = np.sqrt(np.mean(np.array(chunk) ** 2))
+                            rms = np.sqrt(np.mean(chunk.astype(np.float64) ** 2))
                             
                             # 转换为dB (参考值32768)
                             if rms > 0:
@@ -293,7 +299,7 @@ class SimpleAudioVisualizer(QMainWindow):
                     
             elif current_chart_type == "瀑布图":
                 # 简单的瀑布图显示
-                display_data = self.audio_data[-50:]  # 显示最后50个数据点
+                display_data = self.audio_buffer.latest(50).tolist()  # 显示最后50个数据点
                 display_text = "音频瀑布图 (时频):\n"
                 
                 for i, value in enumerate(display_data):
@@ -306,22 +312,32 @@ class SimpleAudioVisualizer(QMainWindow):
                 
                 self.audio_display.setText(display_text)
             
-            # 更新统计信息
-            stats_text = f"图表类型: {current_chart_type}\n"
-            stats_text += f"数据点数量: {len(self.audio_data)}\n"
-            stats_text += f"最大值: {max(self.audio_data) if self.audio_data else 0}\n"
-            stats_text += f"最小值: {min(self.audio_data) if self.audio_data else 0}\n"
-            stats_text += f"平均值: {sum(self.audio_data)/len(self.audio_data) if self.audio_data else 0:.2f}\n"
-            stats_text += f"最新值: {self.audio_data[-1] if self.audio_data else 0}"
-            self.data_stats.setText(stats_text)
+    def update_info(self):
+        """更新数据信息（统计量O(1)读取，内容不变时不刷新）"""
+        if not len(self.audio_buffer):
+            return
+        stats = self.stats
+        info_text = f"图表类型: {self.chart_type_combo.currentText()}\n"
+        info_text += f"数据点数量: {stats.count}\n"
+        info_text += f"最大值: {stats.maximum}\n"
+        info_text += f"最小值: {stats.minimum}\n"
+        info_text += f"平均值: {stats.mean:.2f}\n"
+        info_text += f"RMS: {stats.rms:.1f}\n"
+        info_text += f"峰值保持: {stats.peak_hold}\n"
+        info_text += f"削波: {stats.clip_count} 样本 (累计 {stats.total_clips})\n"
+        info_text += f"最新值: {self.audio_buffer.latest(1)[0]}"
+        if info_text != self._info_text:
+            self._info_text = info_text
+            self.data_stats.setText(info_text)
             
     def update_max_data_points(self):
         """更新最大数据点数量"""
         self.max_data_points = self.data_points_input.value()
+        self.stats.resize(self.max_data_points)
         
     def clear_data(self):
         """清除数据"""
-        self.audio_data = []
+        self.stats.clear()
         self.audio_display.setText("数据已清除")
         
     def change_chart_type(self, chart_type):
@@ -0,0 +1,246 @@
+"""
+滑动窗口统计 - 随每帧增量更新，O(1)读取最大/最小/均值/RMS/峰值保持/削波计数
+"""
+
+from collections import deque
+import numpy as np
+
+DEFAULT_STATS_BLOCK = 1024
+
+# 峰值保持时长：16kHz采样率下2秒
+DEFAULT_HOLD_SAMPLES = 16000 * 2
+
+# int16满幅即视为削波
+CLIP_HIGH = 32767
+CLIP_LOW = -32768
+
+
+def count_clipped(samples):
+    """统计达到满幅的样本数"""
+    return int(np.count_nonzero((samples >= CLIP_HIGH) | (samples <= CLIP_LOW)))
+
+
+class SlidingStats:
+    """AudioRingBuffer 窗口内的增量统计
+
+    通过 append() 代替直接写入缓冲区：新样本的和、平方和、削波数累加进来，
+    被覆盖的最旧样本从中减去（整数运算，无累积误差）。最大/最小值按块汇总，
+    用单调队列维护完整块的极值，窗口起点所在的不完整块（不超过一块）
+    在读取时单独计算，因此读取开销与历史长度无关。
+    """
+
+    def __init__(self, buffer, block_size=DEFAULT_STATS_BLOCK, hold_samples=DEFAULT_HOLD_SAMPLES):
+        self.buffer = buffer
+        self.block_size = int(block_size)
+        self.hold_samples = hold_samples
+        self.version = 0  # 每次更新后递增
+        self.total_clips = 0  # 累计削波样本数（不随窗口滑出，只由 append() 累加）
+        self.peak_hold = 0
+        self._hold_age = 0
+        self.rebuild()
+        self._update_peak_hold(self.buffer.latest())
+
+    def rebuild(self):
+        """从缓冲区现有数据重新计算窗口统计（改变容量或外部直接写入缓冲区后调用）
+
+        只重新计算窗口内的和、削波数与极值；累计削波数与峰值保持不受影响。
+        """
+        self._sum = 0
+        self._sum_squares = 0
+        self.clip_count = 0  # 窗口内削波样本数
+        self._max_blocks = deque()  # (块序号, 块最大值)，最大值单调递减
+        self._min_blocks = deque()  # (块序号, 块最小值)，最小值单调递增
+        self._partial_index = None  # 当前未写满的块
+        self._partial_max = None
+        self._partial_min = None
+        self._extremes = None
+        self._extremes_version = -1
+
+        samples = self.buffer.latest()
+        self._ingest(samples, self.buffer.total_written - len(samples))
+        self.version += 1
+
+    def clear(self):
+        """清空缓冲区与统计（包括累计削波数与峰值保持）"""
+        self.buffer.clear()
+        self.total_clips = 0
+        self.peak_hold = 0
+        self._hold_age = 0
+        self.rebuild()
+
+    def resize(self, capacity):
+        """修改缓冲区容量并重新计算"""
+        self.buffer.resize(capacity)
+        self.rebuild()
+
+    def append(self, samples):
+        """写入一帧到缓冲区并增量更新统计"""
+        samples = np.asarray(samples)
+        count = len(samples)
+        if count == 0:
+            return
+        buffer = self.buffer
+        if count >= buffer.capacity:
+            buffer.append(samples)
+            self.rebuild()
+            self.total_clips += count_clipped(samples)
+            self._update_peak_hold(samples)
+            return
+
+        size = len(buffer)
+        expired_count = size + count - buffer.capacity
+        if expired_count > 0:
+            expired = buffer.latest(size)[:expired_count].astype(np.int64)
+            self._sum -= int(np.sum(expired))
+            self._sum_squares -= int(np.dot(expired, expired))
+            self.clip_count -= count_clipped(expired)
+
+        start = buffer.total_written
+        buffer.append(samples)
+        self.total_clips += self._ingest(samples, start)
+        self._prune()
+        self._update_peak_hold(samples)
+        self.version += 1
+
+    def _ingest(self, samples, start):
+        """累加新样本到窗口统计，返回其中的削波样本数；start为首个样本的全局序号"""
+        if not len(samples):
+            return 0
+        values = samples.astype(np.int64)
+        self._sum += int(np.sum(values))
+        self._sum_squares += int(np.dot(values, values))
+        clipped = count_clipped(samples)
+        self.clip_count += clipped
+
+        block_size = self.block_size
+        offset = 0
+        # 先补齐当前未写满的块
+        head = (-start) % block_size
+        if head:
+            self._extend_partial(start // block_size, samples[:head])
+            offset = min(head, len(samples))
+            if start + offset < (start // block_size + 1) * block_size:
+                return clipped
+            self._close_partial()
+
+        # 完整的块一次性求极值
+        full = (len(samples) - offset) // block_size
+        if full:
+            blocks = samples[offset:offset + full * block_size].reshape(full, block_size)
+            first_index = (start + offset) // block_size
+            for index, block_max, block_min in zip(range(first_index, first_index + full),
+                                                   blocks.max(axis=1).tolist(),
+                                                   blocks.min(axis=1).tolist()):
+                self._push_block(index, block_max, block_min)
+            offset += full * block_size
+
+        if offset < len(samples):
+            self._extend_partial((start + offset) // block_size, samples[offset:])
+        return clipped
+
+    def _extend_partial(self, index, samples):
+        block_max = int(np.max(samples))
+        block_min = int(np.min(samples))
+        if self._partial_index != index:
+            self._partial_index = index
+            self._partial_max = block_max
+            self._partial_min = block_min
+        else:
+            self._partial_max = max(self._partial_max, block_max)
+            self._partial_min = min(self._partial_min, block_min)
+
+    def _close_partial(self):
+        self._push_block(self._partial_index, self._partial_max, self._partial_min)
+        self._partial_index = None
+
+    def _push_block(self, index, block_max, block_min):
+        max_blocks = self._max_blocks
+        while max_blocks and max_blocks[-1][1] <= block_max:
+            max_blocks.pop()
+        max_blocks.append((index, block_max))
+        min_blocks = self._min_blocks
+        while min_blocks and min_blocks[-1][1] >= block_min:
+            min_blocks.pop()
+        min_blocks.append((index, block_min))
+
+    def _window_start(self):
+        return self.buffer.total_written - len(self.buffer)
+
+    def _prune(self):
+        """移除已不完全位于窗口内的块"""
+        first_full = -(-self._window_start() // self.block_size)
+        for blocks in (self._max_blocks, self._min_blocks):
+            while blocks and blocks[0][0] < first_full:
+                blocks.popleft()
+
+    def _update_peak_hold(self, samples):
+        if not len(samples):
+            return
+        peak = max(int(np.max(samples)), -int(np.min(samples)))
+        self._hold_age += len(samples)
+        if peak >= self.peak_hold or self._hold_age > self.hold_samples:
+            self.peak_hold = peak
+            self._hold_age = 0
+
+    def _window_extremes(self):
+        """窗口内 (最大值, 最小值)，按版本号缓存"""
+        if self._extremes_version == self.version:
+            return self._extremes
+        self._extremes_version = self.version
+        size = len(self.buffer)
+        if size == 0:
+            self._extremes = (None, None)
+            return self._extremes
+
+        self._prune()
+        candidates_max = [self._max_blocks[0][1]] if self._max_blocks else []
+        candidates_min = [self._min_blocks[0][1]] if self._min_blocks else []
+
+        start = self._window_start()
+        block_size = self.block_size
+        boundary = start // block_size if start % block_size else None
+        if boundary is not None:
+            # 窗口起点落在块中间，这一块只统计仍在窗口内的部分
+            end = min((boundary + 1) * block_size, self.buffer.total_written)
+            region = self.buffer.latest(size)[:end - start]
+            candidates_max.append(int(np.max(region)))
+            candidates_min.append(int(np.min(region)))
+        if self._partial_index is not None and self._partial_index != boundary:
+            candidates_max.append(self._partial_max)
+            candidates_min.append(self._partial_min)
+
+        self._extremes = (max(candidates_max), min(candidates_min))
+        return self._extremes
+
+    @property
+    def count(self):
+        return len(self.buffer)
+
+    @property
+    def maximum(self):
+        return self._window_extremes()[0]
+
+    @property
+    def minimum(self):
+        return self._window_extremes()[1]
+
+    @property
+    def mean(self):
+        return self._sum / len(self.buffer) if len(self.buffer) else 0.0
+
+    @property
+    def rms(self):
+        return float(np.sqrt(self._sum_squares / len(self.buffer))) if len(self.buffer) else 0.0
+
+    def snapshot(self):
+        """当前全部统计量的字典（供其他线程读取）"""
+        return {
+            'count': self.count,
+            'maximum': self.maximum,
+            'minimum': self.minimum,
+            'mean': self.mean,
+            'rms': self.rms,
+            'peak_hold': self.peak_hold,
+            'clip_count': self.clip_count,
+            'total_clips': self.total_clips,
+        }
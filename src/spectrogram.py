@@ -0,0 +1,113 @@
+"""
+时频瀑布图缓冲区 - 预分配的二维环形float32 dB频谱数组
+"""
+
+import numpy as np
+
+# 瀑布图保留的历史时长（秒）
+SPECTROGRAM_HISTORY_SECONDS = 10 * 60
+
+# dB显示范围（相对满幅正弦波，dBFS）
+DB_FLOOR = -100.0
+DB_CEILING = 0.0
+
+
+class SpectrogramBuffer:
+    """环形的dB频谱列缓冲区
+
+    每一行是一个时间帧的频谱（行数固定为容量，列数为频点数）。新的STFT列
+    在写入时直接转换为dB存入对应行，不移动已有数据；按时间顺序读取时
+    分为"较旧"和"较新"两段视图，显示端按偏移放置即可，无需重建整幅图像。
+    """
+
+    def __init__(self, num_bins, capacity, reference=1.0, floor_db=DB_FLOOR,
+                 column_seconds=1.0, max_freq=None):
+        if capacity <= 0:
+            raise ValueError("瀑布图容量必须大于0")
+        self.num_bins = int(num_bins)
+        self.capacity = int(capacity)
+        self.column_seconds = column_seconds  # 每列对应的时长
+        self.max_freq = max_freq if max_freq is not None else self.num_bins - 1
+        self.floor_db = floor_db
+        # 幅度为reference时对应0dB
+        self.reference_db = 20 * np.log10(reference)
+        self._min_magnitude = reference * 10 ** (floor_db / 20)
+        self._storage = np.full((self.capacity, self.num_bins), floor_db, dtype=np.float32)
+        self.generation = -1  # 每次清空后递增，显示端据此判断需要全部重绘
+        self.clear()
+
+    @classmethod
+    def for_stft(cls, stft, seconds=SPECTROGRAM_HISTORY_SECONDS, floor_db=DB_FLOOR):
+        """按STFT参数创建保留seconds秒历史的缓冲区，以int16满幅正弦波为0dB"""
+        capacity = int(np.ceil(seconds * stft.sample_rate / stft.hop_size))
+        reference = 32768 * float(np.sum(stft.window)) / 2
+        return cls(stft.num_bins, capacity, reference, floor_db,
+                   column_seconds=stft.hop_size / stft.sample_rate,
+                   max_freq=float(stft.frequencies[-1]))
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        """清空缓冲区"""
+        self._head = 0  # 下一列的写入行
+        self._size = 0
+        self.total_columns = 0  # 累计写入的列数
+        self.version = 0  # 每次写入后递增，清空后归零
+        self.generation += 1
+        self._storage.fill(self.floor_db)
+
+    def append(self, magnitudes):
+        """写入若干列频谱幅度 (列数, 频点数)，原地转换为dB"""
+        count = len(magnitudes)
+        if count == 0:
+            return
+        self.total_columns += count
+        if count > self.capacity:
+            magnitudes = magnitudes[-self.capacity:]
+            count = self.capacity
+
+        head = self._head
+        first = min(count, self.capacity - head)
+        self._to_db(magnitudes[:first], self._storage[head:head + first])
+        if count > first:
+            self._to_db(magnitudes[first:], self._storage[:count - first])
+
+        self._head = (head + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+        self.version += 1
+
+    def _to_db(self, magnitudes, out):
+        """20*log10(幅度/参考值)，结果直接写入out并截断到下限"""
+        np.maximum(magnitudes, self._min_magnitude, out=out)
+        np.log10(out, out=out)
+        out *= 20
+        out -= self.reference_db
+
+    def segments(self):
+        """按时间顺序返回 (较旧段, 较新段) 两个只读视图
+
+        未写满时较旧段为空；两段拼接即为全部历史，最后一行是最新的一列。
+        """
+        older = self._storage[self._head:self._size]
+        newer = self._storage[:self._head]
+        older.flags.writeable = False
+        newer.flags.writeable = False
+        return older, newer
+
+    @property
+    def head(self):
+        """下一列的写入行（环形偏移）"""
+        return self._head
+
+    def rows(self, start, stop):
+        """按存储顺序返回第 start ~ stop 行的只读视图（不按时间排序）"""
+        view = self._storage[start:stop]
+        view.flags.writeable = False
+        return view
+
+    def latest(self):
+        """返回最新一列的dB频谱（无数据时返回None）"""
+        if self._size == 0:
+            return None
+        return self._storage[self._head - 1]
@@ -0,0 +1,106 @@
+"""
+瀑布图显示 - 与环形dB频谱缓冲区同布局的彩色图像，每次只着色新增的列
+"""
+
+import numpy as np
+import pyqtgraph as pg
+from pyqtgraph import functions as fn
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QImage
+from spectrogram import DB_FLOOR, DB_CEILING
+
+
+class SpectrogramView:
+    """在PlotWidget上显示SpectrogramBuffer
+
+    缓冲区的每一行（一个时间帧）对应图像中的一列像素，图像与缓冲区一样环形
+    存放。新列到达时只把这几列的dB值经查找表着色、原地写入图像，不重新生成
+    整幅图像；绘制时按环形偏移把图像分成较旧、较新两段放到时间轴上（横轴为
+    相对最新一列的时间，秒）。色阶固定为 DB_FLOOR ~ DB_CEILING。
+    """
+
+    def __init__(self, plot_widget, buffer, colormap='viridis'):
+        self.buffer = buffer
+        self.version = None
+        self.visible = True
+        self.generation = None  # 已着色的缓冲区清空代数
+        self.columns_drawn = 0  # 已着色的累计列数
+        lut = pg.colormap.get(colormap).getLookupTable(nPts=256)[:, :3].astype(np.uint32)
+        # 颜色打包为 0xFFRRGGBB，按像素直接写入RGB32图像
+        self.colors = 0xFF000000 | (lut[:, 0] << 16) | (lut[:, 1] << 8) | lut[:, 2]
+        self.scale = (len(self.colors) - 1) / (DB_CEILING - DB_FLOOR)
+        self.pixels = np.full((buffer.num_bins, buffer.capacity), self.colors[0], dtype=np.uint32)
+        # 图像直接引用像素数组，修改数组即修改图像
+        self.image = fn.ndarray_to_qimage(self.pixels, QImage.Format.Format_RGB32)
+        self.item = WrappedImageItem(self)
+        plot_widget.addItem(self.item)
+
+    def setVisible(self, visible):
+        """显示/隐藏瀑布图（与曲线图元接口一致，供视图切换使用）"""
+        self.visible = visible
+        self.item.setVisible(visible)
+        if visible:
+            # 隐藏期间不着色，重新显示时补上这期间新增的列
+            self.version = None
+            self.update()
+
+    def update(self):
+        """缓冲区有新列时着色新列并重绘，返回是否刷新"""
+        buffer = self.buffer
+        if not self.visible or (buffer.version, buffer.generation) == (self.version, self.generation):
+            return False
+        self.version = buffer.version
+
+        count = buffer.total_columns - self.columns_drawn
+        if buffer.generation != self.generation or count > buffer.capacity:
+            count = buffer.capacity  # 清空过或落后超过一圈，全部重新着色
+            self.generation = buffer.generation
+        self.columns_drawn = buffer.total_columns
+        start = buffer.head - count
+        if start < 0:
+            self._color_rows(start + buffer.capacity, buffer.capacity)
+            start = 0
+        self._color_rows(start, buffer.head)
+        self.item.refresh()
+        return True
+
+    def _color_rows(self, start, stop):
+        if stop <= start:
+            return
+        db = self.buffer.rows(start, stop)
+        index = np.clip((db - DB_FLOOR) * self.scale, 0, len(self.colors) - 1).astype(np.uint8)
+        self.pixels[:, start:stop] = self.colors[index].T
+
+
+class WrappedImageItem(pg.GraphicsObject):
+    """按环形偏移分两段绘制同一幅图像的图元"""
+
+    def __init__(self, view):
+        super().__init__()
+        self.view = view
+        self._rect = QRectF()
+
+    def refresh(self):
+        buffer = self.view.buffer
+        width = len(buffer) * buffer.column_seconds
+        rect = QRectF(-width, 0, width, buffer.max_freq)
+        if rect != self._rect:
+            self.prepareGeometryChange()
+            self._rect = rect
+        self.update()
+
+    def boundingRect(self):
+        return QRectF(self._rect)
+
+    def paint(self, painter, option, widget=None):
+        buffer = self.view.buffer
+        size = len(buffer)
+        head = buffer.head
+        column_seconds = buffer.column_seconds
+        x = -size * column_seconds
+        # 较旧段（写满后从写入行到末尾），然后较新段（开头到写入行）
+        for start, count in ((head, size - head), (0, head)):
+            if count:
+                painter.drawImage(QRectF(x, 0, count * column_seconds, buffer.max_freq),
+                                  self.view.image, QRectF(start, 0, count, buffer.num_bins))
+                x += count * column_seconds
@@ -0,0 +1,97 @@
+"""
+流式短时傅里叶变换 - 预计算窗函数/频率轴，按跳步增量计算实数FFT
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class StreamingSTFT:
+    """流式STFT引擎
+
+    样本到达时调用 push()，每累积 hop_size 个新样本输出一列频谱；
+    窗函数、频率轴与频段切片只在构造时计算一次。最新频谱及其归一化结果
+    按版本号缓存，没有新数据时重复读取不会重新计算。
+    """
+
+    def __init__(self, sample_rate=16000, fft_size=2048, hop_size=None, max_freq=None):
+        if hop_size is None:
+            hop_size = fft_size // 2  # 默认50%重叠
+        if not 0 < hop_size <= fft_size:
+            raise ValueError("跳步必须在 1 到 fft_size 之间")
+        self.sample_rate = sample_rate
+        self.fft_size = fft_size
+        self.hop_size = hop_size
+
+        self.window = np.hanning(fft_size).astype(np.float32)
+        all_freqs = np.fft.rfftfreq(fft_size, 1 / sample_rate)
+        stop = len(all_freqs) if max_freq is None else np.searchsorted(all_freqs, max_freq, side='right')
+        self.band = slice(0, int(stop))
+        self.frequencies = all_freqs[self.band]
+        self.reset()
+
+    @property
+    def num_bins(self):
+        return len(self.frequencies)
+
+    @property
+    def overlap(self):
+        """帧重叠比例"""
+        return 1 - self.hop_size / self.fft_size
+
+    def reset(self):
+        """清空内部状态"""
+        self._tail = np.zeros(0, dtype=np.float32)  # 尚未构成完整帧的样本
+        self.latest = None  # 最新一列频谱幅度
+        self.version = 0  # 每计算出新的频谱列后递增
+        self.frames_computed = 0
+        self._normalized = None
+        self._normalized_version = -1
+
+    def push(self, samples):
+        """送入新样本，返回新计算出的频谱列 (帧数, 频点数)"""
+        samples = np.asarray(samples, dtype=np.float32)
+        data = np.concatenate((self._tail, samples)) if len(self._tail) else samples
+        if len(data) < self.fft_size:
+            self._tail = data.copy() if data is samples else data
+            return np.zeros((0, self.num_bins), dtype=np.float32)
+
+        count = (len(data) - self.fft_size) // self.hop_size + 1
+        frames = sliding_window_view(data, self.fft_size)[::self.hop_size][:count]
+        spectra = np.abs(np.fft.rfft(frames * self.window, axis=1)[:, self.band])
+
+        self._tail = data[count * self.hop_size:].copy()
+        self.latest = spectra[-1]
+        self.version += 1
+        self.frames_computed += count
+        return spectra
+
+    def compute(self, samples):
+        """对一段样本单独计算一帧频谱（不足时补零，过长时取最后fft_size个）"""
+        samples = np.asarray(samples, dtype=np.float32)
+        frame = np.zeros(self.fft_size, dtype=np.float32)
+        recent = samples[-self.fft_size:]
+        frame[:len(recent)] = recent
+        return np.abs(np.fft.rfft(frame * self.window)[self.band])
+
+    def normalized_spectrum(self, fallback_samples=None):
+        """返回归一化到0-1的最新频谱
+
+        还未累积满一帧时，用 fallback_samples 补零计算（不缓存）；
+        都没有时返回None。
+        """
+        if self.latest is None:
+            if fallback_samples is None or not len(fallback_samples):
+                return None
+            return normalize(self.compute(fallback_samples))
+
+        if self._normalized_version != self.version:
+            self._normalized = normalize(self.latest)
+            self._normalized_version = self.version
+        return self._normalized
+
+
+def normalize(magnitude):
+    """归一化到0-1范围"""
+    peak = np.max(magnitude)
+    return magnitude / peak if peak > 0 else magnitude
@@ -0,0 +1,166 @@
+"""
+UDP接收 - 每个数据报一个带序号的二进制帧，抖动缓冲重排序并补偿丢失的帧
+"""
+
+import re
+import socket
+import numpy as np
+from frame_protocol import FRAME_HEADER, FRAME_HEADER_SIZE, FRAME_MAGIC, MAX_FRAME_SAMPLES, PCM_DTYPE
+
+# 抖动缓冲深度（帧）：缺失的帧最多等到其后这么多帧到达，之后按补偿方式填充
+DEFAULT_JITTER_FRAMES = 4
+
+# 丢失帧的补偿方式：zero 填充静音，repeat 重复上一帧
+FILL_MODES = ('zero', 'repeat')
+
+# 序号跳变超过这么多帧时视为设备重启，重新同步
+RESYNC_FRAMES = 1000
+
+# 超过这么久（秒）没有数据报时不再等待缺失的帧，放出缓冲中的帧
+IDLE_FLUSH_TIMEOUT = 0.1
+
+# 单个数据报最大字节数（帧头 + 最大帧长）
+MAX_DATAGRAM_SIZE = FRAME_HEADER_SIZE + MAX_FRAME_SAMPLES * 2
+
+# 接收缓冲区：Wi-Fi突发到达时内核先缓存，避免在内核中丢包
+UDP_RECEIVE_BUFFER = 1 << 20
+
+# UDP地址：udp:// 后跟本机监听地址（可省略，表示所有网卡），端口另行指定
+UDP_ADDRESS_PATTERN = re.compile(r'^udp://(\S*)$', re.I)
+
+
+def parse_udp_address(address):
+    """解析UDP地址，返回本机监听地址；不是UDP地址时返回None"""
+    match = UDP_ADDRESS_PATTERN.match(address.strip())
+    if match is None:
+        return None
+    return match.group(1) or '0.0.0.0'
+
+
+def open_udp_socket(host, port, timeout=IDLE_FLUSH_TIMEOUT):
+    """创建并绑定UDP接收套接字"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER)
+    sock.bind((host, port))
+    sock.settimeout(timeout)
+    return sock
+
+
+def decode_datagram(data):
+    """解析一个数据报，返回 (帧序号, 采样率, int16样本)；不是完整的帧时返回None"""
+    if len(data) < FRAME_HEADER_SIZE:
+        return None
+    magic, flags, count, sequence, sample_rate = FRAME_HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC or count > MAX_FRAME_SAMPLES or len(data) < FRAME_HEADER_SIZE + count * 2:
+        return None
+    samples = np.frombuffer(data, dtype=PCM_DTYPE, count=count,
+                            offset=FRAME_HEADER_SIZE).astype(np.int16)
+    return sequence, sample_rate, samples
+
+
+class JitterBuffer:
+    """抖动缓冲
+
+    按帧序号重排序后输出。按序到达的帧立即输出，不增加延迟；出现缺口时
+    等待缺失的帧，直到其后又到达 depth 帧（或 flush()），再按 fill 方式补偿
+    （静音或重复上一帧），保证输出的样本数与时间轴一致。统计：
+    frames_lost 补偿的帧、frames_reordered 乱序但及时到达的帧、
+    frames_late 到达时已被补偿而丢弃的帧、frames_duplicate 重复的帧（包括
+    已输出的帧被重发）。补偿过的序号被记住，用来区分迟到与重复。
+    32位序号回绕后继续递增；跳变超过 RESYNC_FRAMES 时视为设备重启。
+    """
+
+    def __init__(self, depth=DEFAULT_JITTER_FRAMES, fill='zero'):
+        if fill not in FILL_MODES:
+            raise ValueError(f"不支持的补偿方式: {fill}")
+        self.depth = depth
+        self.fill = fill
+        self.reset()
+
+    def reset(self):
+        self.pending = {}  # 扩展序号 -> 样本
+        self.concealed = set()  # 已补偿、尚未迟到的扩展序号
+        self.next_sequence = None  # 下一个输出的扩展序号
+        self.highest = None  # 已到达的最大扩展序号
+        self.last_frame = None
+        self.frames_received = 0
+        self.frames_lost = 0
+        self.frames_reordered = 0
+        self.frames_late = 0
+        self.frames_duplicate = 0
+        self.resync_count = 0
+
+    def counters(self):
+        """各项统计"""
+        return {
+            'frames_received': self.frames_received,
+            'frames_lost': self.frames_lost,
+            'frames_reordered': self.frames_reordered,
+            'frames_late': self.frames_late,
+            'frames_duplicate': self.frames_duplicate,
+        }
+
+    def push(self, sequence, samples):
+        """放入一帧，返回现在可以按序输出的帧列表"""
+        self.frames_received += 1
+        if self.next_sequence is None:
+            self.next_sequence = self.highest = sequence
+        else:
+            # 与已到达的最大序号比较，展开32位回绕
+            delta = (sequence - self.highest) & 0xFFFFFFFF
+            if delta >= 0x80000000:
+                delta -= 0x100000000
+            sequence = self.highest + delta
+            if abs(sequence - self.next_sequence) > RESYNC_FRAMES:
+                frames = self.flush()
+                self.resync_count += 1
+                self.concealed.clear()
+                self.next_sequence = self.highest = sequence
+                self.pending[sequence] = samples
+                return frames + self._release()
+
+        if sequence < self.next_sequence:
+            if sequence in self.concealed:
+                # 已被补偿的帧迟到；之后再收到同一帧算作重复
+                self.concealed.discard(sequence)
+                self.frames_late += 1
+            else:
+                self.frames_duplicate += 1
+            return []
+        if sequence in self.pending:
+            self.frames_duplicate += 1
+            return []
+        if sequence < self.highest:
+            self.frames_reordered += 1
+        else:
+            self.highest = sequence
+        self.pending[sequence] = samples
+        return self._release()
+
+    def flush(self):
+        """不再等待缺失的帧，补偿缺口并输出缓冲中的全部帧"""
+        return self._release(flush=True)
+
+    def _release(self, flush=False):
+        frames = []
+        while self.pending:
+            frame = self.pending.pop(self.next_sequence, None)
+            if frame is None:
+                if not flush and self.highest - self.next_sequence < self.depth:
+                    break  # 继续等待缺失的帧
+                frame = self.last_frame if self.fill == 'repeat' else np.zeros_like(self.last_frame)
+                self.frames_lost += 1
+                self._remember_concealed(self.next_sequence)
+            else:
+                self.last_frame = frame
+            frames.append(frame)
+            self.next_sequence += 1
+        return frames
+
+    def _remember_concealed(self, sequence):
+        concealed = self.concealed
+        concealed.add(sequence)
+        if len(concealed) > 2 * RESYNC_FRAMES:
+            # 落后超过 RESYNC_FRAMES 的帧到达时会触发重新同步，不必再记住
+            oldest = sequence - RESYNC_FRAMES
+            self.concealed = {s for s in concealed if s >= oldest}
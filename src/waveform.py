@@ -0,0 +1,123 @@
+"""
+波形抽取 - 将任意长度的历史数据归约为逐像素的最小/最大值对
+"""
+
+import numpy as np
+from ring_buffer import AudioRingBuffer
+
+DEFAULT_PIXELS = 1000
+
+
+class MinMaxDecimator:
+    """波形图的最小/最大值抽取器
+
+    缓冲区窗口按每像素一个桶划分（桶按全局样本序号对齐），每个桶输出
+    (最小值, 最大值) 两个点，瞬态尖峰不会像等间隔抽样那样被跳过。
+    每次 update() 只归约新到达的样本，已完成的桶结果保存在小环形缓冲区中；
+    横轴数组按桶数缓存，绘图开销与屏幕宽度成正比，与历史长度无关。
+    """
+
+    def __init__(self, buffer, pixels=DEFAULT_PIXELS):
+        self.buffer = buffer
+        self.pixels = max(1, int(pixels))
+        self._layout = None
+
+    def set_pixels(self, pixels):
+        """设置可用的像素宽度（变化时重新归约；窗口尚未显示时忽略）"""
+        pixels = int(pixels)
+        if pixels > 0 and pixels != self.pixels:
+            self.pixels = pixels
+            self._layout = None
+
+    def _rebuild(self):
+        """按当前容量与像素宽度重新划分桶，并归约缓冲区中的全部数据"""
+        capacity = self.buffer.capacity
+        self.bucket_size = max(1, -(-capacity // self.pixels))
+        slots = -(-capacity // self.bucket_size) + 1
+        self._mins = AudioRingBuffer(slots, dtype=self.buffer.dtype)
+        self._maxs = AudioRingBuffer(slots, dtype=self.buffer.dtype)
+        self._partial_count = 0
+        self._partial_min = 0
+        self._partial_max = 0
+
+        # 横轴：每个桶的最小/最大值画在同一横坐标上
+        self._x_pairs = np.repeat(np.arange(slots + 1) * self.bucket_size, 2)
+        self._x_samples = np.arange(capacity)
+        self._y_pairs = np.empty(2 * (slots + 1), dtype=self.buffer.dtype)
+
+        samples = self.buffer.latest()
+        self._consumed = self.buffer.total_written - len(samples)
+        self._size = 0
+        self._layout = (capacity, self.pixels)
+        self._ingest(samples)
+
+    def _ingest(self, samples):
+        """归约新样本"""
+        count = len(samples)
+        if count == 0:
+            return
+        bucket = self.bucket_size
+        offset = 0
+        # 先补齐当前未满的桶
+        head = (-self._consumed) % bucket
+        if head:
+            part = samples[:head]
+            part_min, part_max = part.min(), part.max()
+            if self._partial_count:
+                part_min = min(part_min, self._partial_min)
+                part_max = max(part_max, self._partial_max)
+            self._partial_min, self._partial_max = part_min, part_max
+            self._partial_count += len(part)
+            offset = len(part)
+            if (self._consumed + offset) % bucket == 0:
+                self._mins.append([part_min])
+                self._maxs.append([part_max])
+                self._partial_count = 0
+
+        # 完整的桶一次性归约
+        full = (count - offset) // bucket
+        if full:
+            blocks = samples[offset:offset + full * bucket].reshape(full, bucket)
+            self._mins.append(blocks.min(axis=1))
+            self._maxs.append(blocks.max(axis=1))
+            offset += full * bucket
+
+        if offset < count:
+            rest = samples[offset:]
+            self._partial_min, self._partial_max = rest.min(), rest.max()
+            self._partial_count = len(rest)
+
+        self._consumed += count
+        self._size = min(self._size + count, self.buffer.capacity)
+
+    def update(self):
+        """归约新到达的数据，返回用于绘图的 (x, y)"""
+        buffer = self.buffer
+        new = buffer.total_written - self._consumed if self._layout else 0
+        if (self._layout != (buffer.capacity, self.pixels)
+                or new < 0 or new > len(buffer)
+                or len(buffer) != min(self._size + new, buffer.capacity)):
+            # 容量/宽度变化或缓冲区被清空，重新归约
+            self._rebuild()
+        elif new:
+            self._ingest(buffer.latest(new))
+
+        size = len(buffer)
+        if self.bucket_size == 1:
+            # 数据点不多于像素数，直接显示原始样本
+            return self._x_samples[:size], buffer.latest()
+
+        # 窗口起点所在的桶含有已滑出窗口的样本，不显示
+        start = buffer.total_written - size
+        bucket = self.bucket_size
+        complete = max(0, buffer.total_written // bucket - (-(-start // bucket)))
+        complete = min(complete, len(self._mins))
+        y = self._y_pairs
+        y[0:2 * complete:2] = self._mins.latest(complete)
+        y[1:2 * complete:2] = self._maxs.latest(complete)
+        points = 2 * complete
+        if self._partial_count and size:
+            y[points] = self._partial_min
+            y[points + 1] = self._partial_max
+            points += 2
+        return self._x_pairs[:points], y[:points]
@@ -1,96 +1,32 @@
 import sys
-import json
-import socket
-import threading
-import time
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QLabel, QPushButton, QTextEdit, QGroupBox,
                              QGridLayout, QSpinBox, QComboBox)
-from PyQt6.QtCore import QTimer, pyqtSignal, QObject, Qt
-from PyQt6.QtGui import QFont, QPalette, QColor
+from PyQt6.QtCore import QTimer, pyqtSignal, QObject
 import pyqtgraph as pg
-import numpy as np
+from ring_buffer import SPSCSampleRing, MAX_HISTORY_SAMPLES
+from engine import StreamReceiver
+from chart_views import ChartViewManager
+from render_scheduler import RenderScheduler, DEFAULT_FPS, MAX_FPS
+from compute_worker import ComputeWorker
+from spectrogram import SpectrogramBuffer
+from spectrogram_view import SpectrogramView
 
-class DataReceiver(QObject):
-    """数据接收器类，用于从ESP32S3接收数据"""
-    data_received = pyqtSignal(list)
+class ReceiverSignals(QObject):
     connection_status = pyqtSignal(bool, str)
+
+class DataReceiver(StreamReceiver):
+    """数据接收器类，用于从ESP32S3接收数据
+
+    接收与解析全部在 StreamReceiver 中（无Qt），接收线程直接写入样本环；
+    这里只把连接状态转成 connection_status 信号，以排队方式送到GUI线程。
+    """
     
-    def __init__(self, host='192.168.0.194', port=8080):
-        super().__init__()
-        self.host = host
-        self.port = port
-        self.socket = None
-        self.connected = False
-        self.running = False
-        self.buffer = ""
-        
-    def connect_to_device(self):
-        """连接到ESP32S3设备"""
-        try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(5)
-            self.socket.connect((self.host, self.port))
-            self.connected = True
-            self.connection_status.emit(True, f"已连接到 {self.host}:{self.port}")
-            return True
-        except Exception as e:
-            self.connected = False
-            self.connection_status.emit(False, f"连接失败: {str(e)}")
-            return False
-    
-    def disconnect_from_device(self):
-        """断开与设备的连接"""
-        self.running = False
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
-            self.socket = None
-        self.connected = False
-        self.connection_status.emit(False, "已断开连接")
-    
-    def start_receiving(self):
-        """开始接收数据"""
-        if not self.connected:
-            return
-            
-        self.running = True
-        self.receive_thread = threading.Thread(target=self._receive_data)
-        self.receive_thread.daemon = True
-        self.receive_thread.start()
-    
-    def _receive_data(self):
-        """接收数据的线程函数"""
-        while self.running and self.connected and self.socket:
-            try:
-                data = self.socket.recv(1024)
-                if data:
-                    self.buffer += data.decode('utf-8')
-                    
-                    while '\n' in self.buffer:
-                        line, self.buffer = self.buffer.split('\n', 1)
-                        line = line.strip()
-                        
-                        if line:
-                            try:
-                                json_data = json.loads(line)
-                                if 'audio_data' in json_data:
-                                    audio_data = json_data['audio_data']
-                                    self.data_received.emit(audio_data)
-                            except json.JSONDecodeError:
-                                try:
-                                    audio_data = [int(x) for x in line.split(',') if x.strip()]
-                                    if audio_data:
-                                        self.data_received.emit(audio_data)
-                                except ValueError:
-                                    print(f"无法解析数据: {line[:50]}...")
-            except Exception as e:
-                print(f"接收数据错误: {e}")
-                self.connected = False
-                self.connection_status.emit(False, f"连接错误: {str(e)}")
-                break
+    def __init__(self, sample_ring, host='192.168.0.194', port=8080, read_size=65536):
+        self.signals = ReceiverSignals()
+        self.connection_status = self.signals.connection_status
+        super().__init__(sample_ring, host, port, read_size,
+                         on_status=self.connection_status.emit)
 
 class WorkingAudioVisualizer(QMainWindow):
     """工作版音频可视化器 - 避免所有坐标问题"""
@@ -101,21 +37,44 @@ class WorkingAudioVisualizer(QMainWindow):
         self.setGeometry(100, 100, 1200, 800)
         
         # 初始化数据接收器
-        self.data_receiver = DataReceiver()
-        self.data_receiver.data_received.connect(self.update_audio_data)
+        # 接收线程写入样本环，分析线程定期一次取走全部新数据
+        self.sample_ring = SPSCSampleRing()
+        self.data_receiver = DataReceiver(sample_ring=self.sample_ring)
         self.data_receiver.connection_status.connect(self.update_connection_status)
         
         # 初始化UI
         self.init_ui()
         
         # 初始化数据
-        self.audio_data = []
-        self.max_data_points = 1000
-        
-        # 设置定时器用于更新图表
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_plots)
-        self.update_timer.start(50)  # 20 FPS
+        self.max_data_points = self.data_points_input.value()
+        # 分析线程：滑动统计、波形抽取与流式STFT（16kHz，显示0-8kHz），
+        # 按当前视图生成可直接绘图的数组，GUI线程只负责setData
+        self.compute_worker = ComputeWorker(self.sample_ring, self.max_data_points,
+                                            fps=self.fps_input.value())
+        self.compute_worker.frame_ready.connect(self.apply_frame)
+        self.frame = None
+        self.stats_snapshot = None
+        # 瀑布图：分析线程送来的STFT新列（50%重叠）写入环形dB频谱缓冲区，保留10分钟历史
+        self.spectrogram = SpectrogramBuffer.for_stft(self.compute_worker.stft)
+        
+        # 创建各图表类型的图元（只创建一次）
+        self.create_chart_views()
+        
+        # 刷新调度：数据或视图有变化才重绘，渲染跟不上时合并帧，窗口最小化时暂停
+        self.render_scheduler = RenderScheduler(self, self.update_plots,
+                                                fps=self.fps_input.value())
+        self.render_scheduler.start()
+        
+        # 视图变化时通知分析线程重新生成绘图数据
+        self.graph_widget.plotItem.vb.sigResized.connect(self.update_view_request)
+        self.update_view_request()
+        self.compute_worker.start()
+        
+        # 数据信息以较低频率刷新，且只在内容变化时更新
+        self._info_text = None
+        self.info_timer = QTimer()
+        self.info_timer.timeout.connect(self.update_info)
+        self.info_timer.start(250)  # 4 Hz
         
     def init_ui(self):
         """初始化用户界面"""
@@ -179,7 +138,8 @@ class WorkingAudioVisualizer(QMainWindow):
         # 数据点数量设置
         display_layout.addWidget(QLabel("显示数据点:"))
         self.data_points_input = QSpinBox()
-        self.data_points_input.setRange(100, 5000)
+        self.data_points_input.setRange(100, MAX_HISTORY_SAMPLES)
+        self.data_points_input.setSingleStep(1000)
         self.data_points_input.setValue(1000)
         self.data_points_input.valueChanged.connect(self.update_max_data_points)
         display_layout.addWidget(self.data_points_input)
@@ -191,6 +151,19 @@ class WorkingAudioVisualizer(QMainWindow):
         self.chart_type_combo.currentTextChanged.connect(self.change_chart_type)
         display_layout.addWidget(self.chart_type_combo)
         
+        # 目标帧率（数据无变化时不重绘，实际帧率可能低于目标）
+        display_layout.addWidget(QLabel("目标帧率:"))
+        self.fps_input = QSpinBox()
+        self.fps_input.setRange(1, MAX_FPS)
+        self.fps_input.setValue(DEFAULT_FPS)
+        self.fps_input.setSuffix(" FPS")
+        self.fps_input.valueChanged.connect(self.update_target_fps)
+        display_layout.addWidget(self.fps_input)
+        
+        # 实际帧率与渲染耗时
+        self.render_info = QLabel("帧率: -- FPS  渲染: -- ms\n分析: -- ms")
+        display_layout.addWidget(self.render_info)
+        
         control_layout.addWidget(display_group)
         
         # 数据信息组
@@ -222,9 +195,6 @@ class WorkingAudioVisualizer(QMainWindow):
         self.graph_widget.setLabel('bottom', '时间')
         self.graph_widget.setTitle('ESP32S3 Sense 音频数据')
         
-        # 创建数据曲线
-        self.audio_curve = self.graph_widget.plot(pen=pg.mkPen('b', width=2))
-        
         chart_layout.addWidget(self.graph_widget)
         return chart_widget
         
@@ -253,112 +223,102 @@ class WorkingAudioVisualizer(QMainWindow):
             self.connection_status.setStyleSheet("color: red; font-weight: bold;")
             self.connect_btn.setText("连接")
             
-    def update_audio_data(self, data):
-        """更新音频数据"""
-        self.audio_data.extend(data)
-        
-        if len(self.audio_data) > self.max_data_points:
-            self.audio_data = self.audio_data[-self.max_data_points:]
+    def update_view_request(self, *args):
+        """把当前视图（所需结果、像素宽度）登记给分析线程"""
+        chart_type = self.chart_type_combo.currentText()
+        self.compute_worker.set_view(products=self.chart_products[chart_type],
+                                     pixels=self.graph_widget.plotItem.vb.width())
+        
+    def apply_frame(self):
+        """取走分析线程生成的帧，图表由刷新调度绘制"""
+        frame = self.compute_worker.take_frame()
+        if frame is None:
+            return
+        self.spectrogram.append(frame['columns'])
+        self.stats_snapshot = frame['stats']
+        self.frame = frame
+        self.render_scheduler.mark_dirty()
             
     def update_plots(self):
-        """更新图表显示"""
-        if self.audio_data and hasattr(self, 'audio_curve'):
-            current_chart_type = self.chart_type_combo.currentText()
-            
-            if current_chart_type == "波形图":
-                # 波形图 - 显示时域数据
-                x_data = np.arange(len(self.audio_data))
-                if len(self.audio_data) > 1000:
-                    step = len(self.audio_data) // 1000
-                    x_data = x_data[::step]
-                    y_data = self.audio_data[::step]
-                else:
-                    y_data = self.audio_data
-                self.audio_curve.setData(x_data, y_data)
+        """更新图表显示（数组均由分析线程算好，这里只调用setData）"""
+        frame = self.frame
+        if frame is None:
+            return
+        current_chart_type = self.chart_type_combo.currentText()
+        
+        if current_chart_type == "波形图":
+            if 'waveform' in frame:
+                self.waveform_curve.setData(*frame['waveform'])
                 
-            elif current_chart_type == "频谱图":
-                # 频谱图 - 使用线性幅度
-                if len(self.audio_data) >= 64:
-                    try:
-                        recent_data = self.audio_data[-2048:] if len(self.audio_data) >= 2048 else self.audio_data
-                        
-                        # 应用窗函数
-                        window = np.hanning(len(recent_data))
-                        windowed_data = recent_data * window
-                        
-                        # 计算FFT
-                        fft_data = np.fft.fft(windowed_data)
-                        freq_data = np.fft.fftfreq(len(recent_data), 1/16000)
-                        
-                        # 只显示正频率部分
-                        positive_freq_mask = (freq_data >= 0) & (freq_data <= 8000)
-                        freq_data = freq_data[positive_freq_mask]
-                        fft_data = np.abs(fft_data[positive_freq_mask])
-                        
-                        # 归一化到0-1范围
-                        if np.max(fft_data) > 0:
-                            fft_normalized = fft_data / np.max(fft_data)
-                        else:
-                            fft_normalized = fft_data
-                        
-                        self.audio_curve.setData(freq_data, fft_normalized)
-                        
-                    except Exception as e:
-                        print(f"频谱计算错误: {e}")
-                        self.audio_curve.setData([], [])
-                    
-            elif current_chart_type == "瀑布图":
-                # 瀑布图 - 显示信号强度
-                x_data = np.arange(len(self.audio_data))
-                intensity = np.abs(self.audio_data)
-                self.audio_curve.setData(x_data, intensity)
+        elif current_chart_type == "频谱图":
+            if 'spectrum' in frame:
+                self.spectrum_curve.setData(*frame['spectrum'])
+                
+        elif current_chart_type == "瀑布图":
+            # 瀑布图 - 时频图，仅在有新的频谱列时刷新图像
+            self.spectrogram_view.update()
             
-            # 更新数据信息
-            info_text = f"图表类型: {current_chart_type}\n"
-            info_text += f"数据点数量: {len(self.audio_data)}\n"
-            info_text += f"最大值: {max(self.audio_data) if self.audio_data else 0}\n"
-            info_text += f"最小值: {min(self.audio_data) if self.audio_data else 0}\n"
-            info_text += f"平均值: {sum(self.audio_data)/len(self.audio_data) if self.audio_data else 0:.2f}"
+    def update_info(self):
+        """更新数据信息（统计量O(1)读取，内容不变时不刷新）"""
+        scheduler = self.render_scheduler
+        self.render_info.setText(f"帧率: {scheduler.achieved_fps} FPS  "
+                                 f"渲染: {scheduler.render_time * 1000:.1f} ms\n"
+                                 f"分析: {self.compute_worker.compute_time * 1000:.1f} ms")
+        stats = self.stats_snapshot
+        if not stats or not stats['count']:
+            return
+        info_text = f"图表类型: {self.chart_type_combo.currentText()}\n"
+        info_text += f"数据点数量: {stats['count']}\n"
+        info_text += f"最大值: {stats['maximum']}\n"
+        info_text += f"最小值: {stats['minimum']}\n"
+        info_text += f"平均值: {stats['mean']:.2f}\n"
+        info_text += f"RMS: {stats['rms']:.1f}\n"
+        info_text += f"峰值保持: {stats['peak_hold']}\n"
+        info_text += f"削波: {stats['clip_count']} 样本 (累计 {stats['total_clips']})"
+        if info_text != self._info_text:
+            self._info_text = info_text
             self.data_info.setText(info_text)
             
     def update_max_data_points(self):
         """更新最大数据点数量"""
         self.max_data_points = self.data_points_input.value()
+        self.compute_worker.resize(self.max_data_points)
+        
+    def update_target_fps(self):
+        """更新目标帧率"""
+        self.render_scheduler.set_fps(self.fps_input.value())
+        self.compute_worker.set_fps(self.fps_input.value())
+        
+    def create_chart_views(self):
+        """创建各图表类型的曲线/图像（只创建一次，切换时只改变可见性）"""
+        self.waveform_curve = self.graph_widget.plot(pen=pg.mkPen('b', width=2))
+        self.spectrum_curve = self.graph_widget.plot(pen=pg.mkPen('r', width=2))
+        self.spectrogram_view = SpectrogramView(self.graph_widget, self.spectrogram)
+        
+        self.chart_views = ChartViewManager(self.graph_widget)
+        # 波形图 - 显示时域数据，16位音频范围
+        self.chart_views.add_view("波形图", [self.waveform_curve], '振幅', '时间',
+                                  'ESP32S3 Sense 音频波形', y_range=(-32768, 32768))
+        # 频谱图 - 线性幅度归一化到0-1，显示0-8kHz
+        self.chart_views.add_view("频谱图", [self.spectrum_curve], '幅度', '频率 (Hz)',
+                                  'ESP32S3 Sense 音频频谱', x_range=(0, 8000), y_range=(0, 1))
+        # 瀑布图 - 横轴为时间，纵轴为频率，颜色表示dB；横轴随历史长度自动缩放
+        self.chart_views.add_view("瀑布图", [self.spectrogram_view], '频率 (Hz)', '时间 (秒)',
+                                  'ESP32S3 Sense 音频瀑布图', y_range=(0, 8000))
+        self.chart_views.show(self.chart_type_combo.currentText())
+        
+        # 各图表类型需要分析线程计算的结果（瀑布图只需要STFT新列，每帧都会送来）
+        self.chart_products = {
+            "波形图": ('waveform',),
+            "频谱图": ('spectrum',),
+            "瀑布图": (),
+        }
         
     def change_chart_type(self, chart_type):
         """切换图表类型"""
         print(f"切换到图表类型: {chart_type}")
-        
-        # 清除现有图表
-        self.graph_widget.clear()
-        
-        if chart_type == "波形图":
-            # 波形图
-            self.audio_curve = self.graph_widget.plot(pen=pg.mkPen('b', width=2))
-            self.graph_widget.setLogMode(x=False, y=False)
-            self.graph_widget.setLabel('left', '振幅')
-            self.graph_widget.setLabel('bottom', '时间')
-            self.graph_widget.setTitle('ESP32S3 Sense 音频波形')
-            self.graph_widget.setYRange(-32768, 32768)
-            
-        elif chart_type == "频谱图":
-            # 频谱图 - 使用线性坐标
-            self.audio_curve = self.graph_widget.plot(pen=pg.mkPen('r', width=2))
-            self.graph_widget.setLogMode(x=False, y=False)  # 完全避免对数坐标
-            self.graph_widget.setLabel('left', '幅度')
-            self.graph_widget.setLabel('bottom', '频率 (Hz)')
-            self.graph_widget.setTitle('ESP32S3 Sense 音频频谱')
-            self.graph_widget.setXRange(0, 8000)
-            self.graph_widget.setYRange(0, 1)  # 归一化范围
-            
-        elif chart_type == "瀑布图":
-            # 瀑布图
-            self.audio_curve = self.graph_widget.plot(pen=pg.mkPen('g', width=2))
-            self.graph_widget.setLogMode(x=False, y=False)
-            self.graph_widget.setLabel('left', '强度')
-            self.graph_widget.setLabel('bottom', '时间')
-            self.graph_widget.setTitle('ESP32S3 Sense 音频瀑布图')
-            self.graph_widget.setYRange(0, 32768)
+        self.chart_views.show(chart_type)
+        self.update_view_request()
 
 def main():
     """主函数"""
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+多设备异步接收测试脚本
+"""
+
+import os
+import sys
+import time
+import socket
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from frame_protocol import FrameParser, encode_frame
+from async_ingest import AsyncIngest
+from engine import AnalysisEngine
+from test_audio_simulator import AudioSimulator
+
+def start_simulators(count, modes=('binary',)):
+    """在本机启动多个模拟器（系统分配端口），返回模拟器列表"""
+    simulators = []
+    for i in range(count):
+        simulator = AudioSimulator('127.0.0.1', 0, modes[i % len(modes)])
+        threading.Thread(target=simulator.start_server, daemon=True).start()
+        simulators.append(simulator)
+    deadline = time.perf_counter() + 2.0
+    while not all(s.running for s in simulators):
+        assert time.perf_counter() < deadline, "模拟器启动超时"
+        time.sleep(0.01)
+    return simulators
+
+def stop_simulators(simulators):
+    for simulator in simulators:
+        simulator.stop_server()
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def test_many_devices():
+    """测试一个事件循环同时接收多个设备，每个设备独立检测格式"""
+    print("测试多设备接收...")
+    simulators = start_simulators(8, modes=('binary', 'json', 'csv'))
+    ingest = AsyncIngest(reconnect_delay=0.1)
+    ingest.start()
+    try:
+        devices = [ingest.add_device(f"设备{i}", '127.0.0.1', s.port)
+                   for i, s in enumerate(simulators)]
+        assert wait_for(lambda: all(d.samples_received >= 4096 for d in devices))
+        assert all(d.connected for d in devices)
+    finally:
+        ingest.stop()
+        stop_simulators(simulators)
+    assert not any(d.connected for d in devices)
+    for device, simulator in zip(devices, simulators):
+        expected = FrameParser.MODE_BINARY if simulator.mode == 'binary' else FrameParser.MODE_TEXT
+        assert device.parser.mode == expected
+        samples = device.sample_ring.read_available()
+        assert len(samples) == device.samples_received and np.abs(samples).max() <= 1200
+    total = sum(d.samples_received for d in devices)
+    print(f"✓ {len(devices)} 个设备共接收 {total} 样本")
+
+def test_reconnect_and_remove():
+    """测试设备断开后自动重连、连接失败状态与移除设备"""
+    print("\n测试重连与移除...")
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(2)
+
+    def serve():
+        # 第一个连接发送几帧后关闭，第二个连接持续发送
+        for connection in range(2):
+            client, _ = server.accept()
+            try:
+                for sequence in range(5 if connection == 0 else 1000):
+                    client.sendall(encode_frame(np.full(160, connection + 1), sequence))
+                    time.sleep(0.005)
+            except OSError:
+                pass
+            finally:
+                client.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    unused = socket.socket()
+    unused.bind(('127.0.0.1', 0))
+    closed_port = unused.getsockname()[1]
+    unused.close()
+
+    statuses = []
+    ingest = AsyncIngest(on_status=lambda device, connected, message:
+                         statuses.append((device.name, connected, message)),
+                         reconnect_delay=0.05)
+    ingest.start()
+    try:
+        device = ingest.add_device('主设备', '127.0.0.1', server.getsockname()[1])
+        missing = ingest.add_device('离线设备', '127.0.0.1', closed_port)
+        assert wait_for(lambda: device.connect_count == 2 and device.samples_received > 800)
+        assert not missing.connected and missing.message.startswith("连接失败")
+        assert device.sample_ring.read_available()[-1] == 2
+        ingest.remove_device('主设备')
+        assert not device.connected and device.message == "已断开连接"
+        assert list(ingest.devices) == ['离线设备']
+    finally:
+        ingest.stop()
+        server.close()
+    device_statuses = [connected for name, connected, _ in statuses if name == '主设备']
+    assert device_statuses == [True, False, True, False]
+    print(f"✓ 重连 {device.connect_count} 次，状态变化 {len(device_statuses)} 次")
+
+def test_engine_bridge():
+    """测试设备样本环直接作为分析引擎的输入"""
+    print("\n测试分析引擎对接...")
+    simulators = start_simulators(2)
+    ingest = AsyncIngest()
+    engines = []
+    for i, simulator in enumerate(simulators):
+        device = ingest.add_device(f"设备{i}", '127.0.0.1', simulator.port)
+        engine = AnalysisEngine(device.sample_ring, 4096, fps=60)
+        engine.set_view(products=('peak_frequency',))
+        engine.start()
+        engines.append(engine)
+    ingest.start()
+    try:
+        assert wait_for(lambda: all(d.samples_received >= 8192 for d in ingest.devices.values()))
+        time.sleep(0.1)
+        frames = [engine.take_frame() for engine in engines]
+    finally:
+        ingest.stop()
+        for engine in engines:
+            engine.stop()
+        stop_simulators(simulators)
+    for frame in frames:
+        assert frame['stats']['count'] == 4096
+        assert abs(frame['peak_frequency'] - 440) < 16
+    print(f"✓ 主频 {[frame['peak_frequency'] for frame in frames]} Hz")
+
+def main():
+    """主函数"""
+    print("多设备异步接收测试")
+    print("=" * 30)
+
+    tests = [test_many_devices, test_reconnect_and_remove, test_engine_bridge]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
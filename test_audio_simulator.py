@@ -3,19 +3,30 @@
 音频数据模拟器 - 用于测试GUI程序
 """
 
+import os
+import sys
 import socket
 import json
 import time
 import math
 import threading
 import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from frame_protocol import encode_frame
 
 class AudioSimulator:
     """音频数据模拟器"""
     
-    def __init__(self, host='localhost', port=8080):
+    MODES = ('json', 'csv', 'binary')
+
+    def __init__(self, host='localhost', port=8080, mode='json'):
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的发送模式: {mode}")
         self.host = host
         self.port = port
+        self.mode = mode  # json: 与固件sendAudioData一致; csv: sendRawAudioData; binary: 二进制帧
         self.server_socket = None
         self.running = False
         self.frequency = 440  # 440Hz正弦波
@@ -28,6 +39,7 @@ class AudioSimulator:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.server_socket.bind((self.host, self.port))
+            self.port = self.server_socket.getsockname()[1]  # 端口为0时使用系统分配的端口
             self.server_socket.listen(1)
             
             print(f"模拟服务器启动在 {self.host}:{self.port}")
@@ -53,20 +65,15 @@ class AudioSimulator:
     def handle_client(self, client_socket):
         """处理客户端连接"""
         try:
-            start_time = time.time()
+            sequence = 0
             
             while self.running:
                 # 生成模拟音频数据
                 audio_data = self.generate_audio_data()
                 
-                # 创建JSON数据
-                json_data = {
-                    "audio_data": audio_data
-                }
-                
                 # 发送数据
-                message = json.dumps(json_data) + "\n"
-                client_socket.send(message.encode('utf-8'))
+                client_socket.sendall(self.encode_message(audio_data, sequence))
+                sequence += 1
                 
                 # 控制发送频率
                 time.sleep(0.01)  # 100Hz
@@ -76,6 +83,19 @@ class AudioSimulator:
         finally:
             client_socket.close()
     
+    def encode_message(self, audio_data, sequence=0):
+        """按当前模式编码一帧音频数据"""
+        if self.mode == 'binary':
+            return encode_frame(audio_data, sequence, self.sample_rate)
+        if self.mode == 'csv':
+            return (",".join(str(x) for x in audio_data) + "\n").encode('utf-8')
+        
+        # 创建JSON数据
+        json_data = {
+            "audio_data": audio_data
+        }
+        return (json.dumps(json_data) + "\n").encode('utf-8')
+    
     def generate_audio_data(self):
         """生成模拟音频数据"""
         data = []
@@ -91,6 +111,41 @@ class AudioSimulator:
         
         return data
     
+    def send_udp(self, count=None, loss=0.0, reorder=0.0):
+        """以UDP数据报发送二进制帧到 host:port（每个数据报一帧），可模拟丢包与乱序
+
+        loss 为每帧被丢弃的概率；reorder 为每帧被推迟到下一帧之后发送的概率。
+        count 为发送的帧数（含被丢弃的帧），None 表示一直发送直到 stop_server()。
+        """
+        udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.running = True
+        self.datagrams_sent = self.datagrams_dropped = self.datagrams_reordered = 0
+        held = None
+        sequence = 0
+        try:
+            while self.running and (count is None or sequence < count):
+                datagram = encode_frame(self.generate_audio_data(), sequence, self.sample_rate)
+                sequence += 1
+                if random.random() < loss:
+                    self.datagrams_dropped += 1
+                elif held is None and random.random() < reorder:
+                    held = datagram
+                    self.datagrams_reordered += 1
+                else:
+                    udp_socket.sendto(datagram, (self.host, self.port))
+                    self.datagrams_sent += 1
+                    if held is not None:
+                        udp_socket.sendto(held, (self.host, self.port))
+                        self.datagrams_sent += 1
+                        held = None
+                time.sleep(0.01)  # 100Hz
+            if held is not None:
+                udp_socket.sendto(held, (self.host, self.port))
+                self.datagrams_sent += 1
+        finally:
+            udp_socket.close()
+            self.running = False
+
     def stop_server(self):
         """停止服务器"""
         self.running = False
@@ -102,7 +157,27 @@ def main():
     print("ESP32S3 Sense 音频数据模拟器")
     print("=" * 40)
     
-    simulator = AudioSimulator()
+    parser = argparse.ArgumentParser(description="ESP32S3 Sense 音频数据模拟器")
+    parser.add_argument('--host', default='localhost', help="监听地址（UDP模式下为接收方地址）")
+    parser.add_argument('--port', type=int, default=8080, help="监听端口（UDP模式下为接收方端口）")
+    parser.add_argument('--mode', choices=AudioSimulator.MODES, default='json',
+                        help="发送格式: json (默认), csv 或 binary 二进制帧")
+    parser.add_argument('--udp', action='store_true',
+                        help="以UDP数据报发送二进制帧到 --host:--port")
+    parser.add_argument('--loss', type=float, default=0.0, help="UDP模式模拟丢包概率")
+    parser.add_argument('--reorder', type=float, default=0.0, help="UDP模式模拟乱序概率")
+    args = parser.parse_args()
+    
+    simulator = AudioSimulator(args.host, args.port, args.mode)
+    if args.udp:
+        print(f"UDP发送到 {args.host}:{args.port}  丢包: {args.loss:.0%}  乱序: {args.reorder:.0%}")
+        try:
+            simulator.send_udp(loss=args.loss, reorder=args.reorder)
+        except KeyboardInterrupt:
+            print(f"\n已发送 {simulator.datagrams_sent} 个数据报，"
+                  f"丢弃 {simulator.datagrams_dropped}，乱序 {simulator.datagrams_reordered}")
+        return
+    print(f"发送模式: {args.mode}")
     
     try:
         simulator.start_server()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+分析线程测试脚本
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt6.QtWidgets import QApplication
+from ring_buffer import SPSCSampleRing
+from compute_worker import ComputeWorker
+from engine import FrameResults
+
+# 与含界面控件的测试在同一进程中运行时（pytest）共用同一个QApplication
+app = QApplication.instance() or QApplication([])
+
+def wait_frame(worker, timeout=2.0):
+    """轮询取走一帧"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        frame = worker.take_frame()
+        if frame is not None:
+            return frame
+        time.sleep(0.005)
+    raise AssertionError("等待分析帧超时")
+
+def sine(count, start=0):
+    t = (start + np.arange(count)) / 16000
+    return (8000 * np.sin(2 * np.pi * 1000 * t)).astype(np.int16)
+
+def test_frames_follow_view():
+    """测试按当前视图生成绘图数组，统计与数据一致"""
+    print("测试视图数据...")
+    ring = SPSCSampleRing()
+    worker = ComputeWorker(ring, 4000, envelope_block_size=64, pyramid=True, fps=60)
+    worker.set_view(products=('waveform',), pixels=200, x_range=(0, 1), follow=True)
+    worker.start()
+    try:
+        samples = sine(8000)
+        ring.write(samples)
+        time.sleep(0.1)
+        frame = wait_frame(worker)
+        x_data, y_data = frame['waveform']
+        assert len(x_data) == len(y_data) and len(y_data) <= 2 * 202
+        assert frame['stats']['count'] == 4000
+        assert frame['stats']['maximum'] == samples[-4000:].max()
+
+        worker.set_view(products=('spectrum',))
+        frame = wait_frame(worker)
+        frequencies, spectrum = frame['spectrum']
+        assert abs(frequencies[np.argmax(spectrum)] - 1000) < 16
+
+        worker.set_view(products=('history',), x_range=(0, 0.1))
+        frame = wait_frame(worker)
+        x_range, (x_data, _), _ = frame['history']
+        # 跟随最新：保持可见时长，右端对齐最新数据
+        assert np.allclose(x_range, (0.4, 0.5))
+        assert x_data[-1] <= 0.5
+    finally:
+        worker.stop()
+    print("✓ 各视图数据正确")
+
+def test_columns_accumulate():
+    """测试GUI未及时取帧时瀑布图频谱列不丢失"""
+    print("\n测试频谱列累积...")
+    ring = SPSCSampleRing()
+    worker = ComputeWorker(ring, 4000, fps=60)
+    worker.set_view(products=(), pixels=100)
+    worker.start()
+    try:
+        for i in range(20):
+            ring.write(sine(1024, i * 1024))
+            time.sleep(0.01)
+        time.sleep(0.1)
+        frame = wait_frame(worker)
+        expected = (20 * 1024 - worker.stft.fft_size) // worker.stft.hop_size + 1
+        assert frame['columns'].shape == (expected, worker.stft.num_bins)
+        assert worker.take_frame() is None
+    finally:
+        worker.stop()
+    print(f"✓ 共 {expected} 列")
+
+def test_settings_change():
+    """测试修改历史长度与包络块大小"""
+    print("\n测试设置修改...")
+    ring = SPSCSampleRing()
+    worker = ComputeWorker(ring, 4000, envelope_block_size=64, fps=60)
+    worker.set_view(products=('envelope',), pixels=100)
+    worker.start()
+    try:
+        ring.write(sine(6000))
+        time.sleep(0.1)
+        wait_frame(worker)
+        worker.resize(2000)
+        worker.set_envelope_block_size(100)
+        frame = wait_frame(worker)
+        assert frame['stats']['count'] == 2000
+        assert len(frame['envelope'][1]) == 20
+    finally:
+        worker.stop()
+    print("✓ 设置修改后重新计算")
+
+def test_views_share_results():
+    """测试多个视图共用一帧结果，增加视图不会重复计算FFT"""
+    print("\n测试结果共用...")
+    calls = []
+
+    def spectrum(results):
+        calls.append('spectrum')
+        return [1.0, 3.0, 2.0]
+
+    def peak(results):
+        return int(np.argmax(results['spectrum']))
+
+    results = FrameResults({'spectrum': spectrum, 'peak': peak})
+    assert results['peak'] == 1 and results['spectrum'] == [1.0, 3.0, 2.0]
+    assert calls == ['spectrum']
+
+    ring = SPSCSampleRing()
+    worker = ComputeWorker(ring, 4000, envelope_block_size=64, fps=60)
+    worker.set_view(products=('spectrum',), pixels=100)
+    worker.start()
+    try:
+        ring.write(sine(8000))
+        time.sleep(0.1)
+        wait_frame(worker)
+        ffts = worker.stft.frames_computed
+        worker.set_view(products=('waveform', 'spectrum', 'peak_frequency', 'level'))
+        frame = wait_frame(worker)
+        assert worker.stft.frames_computed == ffts
+        assert abs(frame['peak_frequency'] - 1000) < 16
+        assert frame['level'][0] > 0
+    finally:
+        worker.stop()
+    print(f"✓ 仪表盘视图未增加FFT次数 ({ffts} 帧)")
+
+def main():
+    """主函数"""
+    print("分析线程测试")
+    print("=" * 30)
+
+    tests = [test_frames_follow_view, test_columns_accumulate, test_settings_change,
+             test_views_share_results]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+设备注册表与设备总览测试脚本
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtWidgets import QApplication
+from ring_buffer import SPSCSampleRing
+from device_registry import DeviceRegistry, SPARKLINE_PIXELS
+from device_overview import DeviceOverviewWidget, parse_device
+from test_async_ingest import start_simulators, stop_simulators, wait_for
+
+app = QApplication.instance() or QApplication([])
+
+def test_registry_tracks_devices():
+    """测试注册表按设备缓冲样本并统计电平、吞吐量与缩略波形"""
+    print("测试设备注册表...")
+    simulators = start_simulators(4)
+    statuses = []
+    registry = DeviceRegistry(history_seconds=1,
+                              on_status=lambda name, connected, message: statuses.append(name))
+    for i, simulator in enumerate(simulators):
+        registry.add_device(f"设备{i}", '127.0.0.1', simulator.port)
+    tap = SPSCSampleRing()
+    registry.attach("设备0", tap)
+    registry.start()
+    try:
+        assert wait_for(lambda: all(entry.connected for entry in registry))
+        for _ in range(5):
+            time.sleep(0.1)
+            registry.poll()
+        registry.detach("设备0", tap)
+        removed = registry.remove_device("设备3")
+    finally:
+        registry.stop()
+        stop_simulators(simulators)
+
+    assert len(registry) == 3 and "设备3" not in registry and not removed.connected
+    assert sorted(set(statuses)) == [f"设备{i}" for i in range(4)]
+    for entry in registry:
+        assert len(entry.audio_buffer) == 16000
+        assert entry.samples_per_second > 0
+        rms, peak = entry.level
+        # 模拟器：振幅1000的正弦波加±100噪声
+        assert 600 < rms < 800 and 900 < peak <= 1100
+        x_data, y_data = entry.sparkline_data
+        assert len(x_data) == len(y_data) <= 2 * (SPARKLINE_PIXELS + 2)
+    assert len(tap.read_available()) > 0
+    rates = [f"{entry.samples_per_second:.0f}" for entry in registry]
+    print(f"✓ 吞吐量 {rates} 样本/秒")
+
+def test_overview_tiles():
+    """测试总览按注册表增删磁贴、只更新有变化的磁贴、点击打开设备"""
+    print("\n测试设备总览...")
+    registry = DeviceRegistry(history_seconds=1)
+    for i in range(32):
+        registry.add_device(f"设备{i}", '127.0.0.1', 1)
+    overview = DeviceOverviewWidget(registry)
+    overview.timer.stop()
+    overview.resize(960, 600)
+    overview.sync_tiles()
+    overview.show()
+    assert len(overview.tiles) == 32
+
+    # 直接写入设备样本环（代替事件循环线程）
+    t = np.arange(1600) / 16000
+    for entry in list(registry)[:8]:
+        entry.connection.sample_ring.write((8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16))
+        entry.connection.connected = True
+    overview.refresh()
+    changed = registry.poll()
+    assert changed == []  # 已取走的数据与未变化的状态不会再次触发更新
+    tile = overview.tiles["设备0"]
+    assert tile.connected and not tile.path.isEmpty()
+    assert abs(tile.peak_db - 20 * np.log10(8000 / 32768)) < 0.1
+    overview.grab()
+
+    activated = []
+    overview.device_activated.connect(activated.append)
+    position = QPointF(10, 10)
+    event = QMouseEvent(QMouseEvent.Type.MouseButtonRelease, position, position,
+                        Qt.MouseButton.LeftButton, Qt.MouseButton.NoButton,
+                        Qt.KeyboardModifier.NoModifier)
+    tile.mouseReleaseEvent(event)
+    assert activated == ["设备0"]
+
+    registry.remove_device("设备31")
+    overview.sync_tiles()
+    assert len(overview.tiles) == 31
+    assert parse_device("产线1=10.0.0.5:8080") == ("产线1", "10.0.0.5", 8080)
+    assert parse_device("10.0.0.6:9000") == ("10.0.0.6:9000", "10.0.0.6", 9000)
+    print(f"✓ {len(overview.tiles)} 个磁贴，刷新耗时 {overview.refresh_time * 1000:.2f} ms")
+
+def main():
+    """主函数"""
+    print("设备注册表测试")
+    print("=" * 30)
+
+    tests = [test_registry_tracks_devices, test_overview_tiles]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
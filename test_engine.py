@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+无界面分析引擎测试脚本
+"""
+
+import os
+import sys
+import time
+import socket
+import threading
+import subprocess
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+sys.path.insert(0, SRC_DIR)
+from frame_protocol import encode_frame
+from ring_buffer import SPSCSampleRing
+from engine import StreamReceiver, AnalysisEngine
+from headless import HeadlessRunner
+
+def sine(count, start=0):
+    t = (start + np.arange(count)) / 16000
+    return (8000 * np.sin(2 * np.pi * 1000 * t)).astype(np.int16)
+
+def start_server(duration, frame_size=320):
+    """本地服务器：按实时速率发送二进制帧，返回端口"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+
+    def serve():
+        client, _ = server.accept()
+        deadline = time.perf_counter() + duration
+        sequence = 0
+        try:
+            while time.perf_counter() < deadline:
+                client.sendall(encode_frame(sine(frame_size, sequence * frame_size), sequence))
+                sequence += 1
+                time.sleep(frame_size / 16000)
+        finally:
+            client.close()
+            server.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()[1]
+
+def test_no_qt_import():
+    """测试引擎与无界面入口不加载Qt"""
+    print("测试无Qt依赖...")
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); import engine, headless; "
+            "print(any(name.split('.')[0] in ('PyQt6', 'pyqtgraph') for name in sys.modules))")
+    output = subprocess.check_output([sys.executable, '-c', code, SRC_DIR], text=True)
+    assert output.strip() == 'False', output
+    print("✓ 未加载PyQt6/pyqtgraph")
+
+def test_receiver_feeds_engine():
+    """测试接收器写入样本环，引擎通过普通回调交付帧"""
+    print("\n测试接收与分析...")
+    port = start_server(1.0)
+    ring = SPSCSampleRing()
+    statuses = []
+    frames = []
+    receiver = StreamReceiver(ring, '127.0.0.1', port,
+                              on_status=lambda connected, message: statuses.append(connected))
+    engine = AnalysisEngine(ring, 4000, envelope_block_size=64, fps=60)
+    engine.on_frame = lambda: frames.append(engine.take_frame())
+    engine.set_view(products=('peak_frequency',))
+    engine.start()
+    try:
+        assert receiver.connect_to_device()
+        receiver.start_receiving()
+        time.sleep(0.6)
+    finally:
+        receiver.disconnect_from_device()
+        engine.stop()
+    assert statuses[0] is True and statuses[-1] is False
+    assert receiver.samples_received >= 4000
+    frame = frames[-1]
+    assert frame['stats']['count'] == 4000
+    assert abs(frame['peak_frequency'] - 1000) < 16
+    assert frame['level'][1] > 0
+    print(f"✓ 接收 {receiver.samples_received} 样本，交付 {len(frames)} 帧")
+
+def test_headless_runner():
+    """测试无界面运行器定期输出特征与运行指标"""
+    print("\n测试无界面运行...")
+    port = start_server(0.8)
+    records = []
+    runner = HeadlessRunner('127.0.0.1', port, history_samples=4000, interval=0.25,
+                            on_record=records.append)
+    runner.run(duration=1.0, reconnect_delay=0.1)
+    assert not runner.engine.running and not runner.receiver.connected
+    assert len(records) >= 2
+    record = records[1]
+    assert record['samples_per_second'] > 8000
+    assert record['frames_per_second'] > 0
+    assert abs(record['peak_frequency'] - 1000) < 16
+    assert abs(record['peak_dbfs'] - 20 * np.log10(8000 / 32768)) < 0.5
+    assert 'RMS' in HeadlessRunner.format_record(record)
+    print(f"✓ {len(records)} 条记录: {HeadlessRunner.format_record(record)}")
+
+def test_reconnect_releases_sockets():
+    """测试设备断开后接收线程关闭套接字，反复重连不泄漏文件描述符"""
+    print("\n测试重连释放连接...")
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(8)
+
+    def serve():
+        # 每个连接发送一帧后立即关闭
+        for sequence in range(20):
+            client, _ = server.accept()
+            client.sendall(encode_frame(sine(320), sequence))
+            client.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    receiver = StreamReceiver(SPSCSampleRing(), '127.0.0.1', server.getsockname()[1])
+    # 有 /proc 时同时检查本进程打开的文件描述符数
+    fd_count = lambda: len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else 0
+    try:
+        for attempt in range(20):
+            assert receiver.connect_to_device()
+            receiver.start_receiving()
+            receiver.receive_thread.join(2.0)
+            assert not receiver.connected and receiver.socket is None
+            if attempt == 1:
+                baseline = fd_count()
+        assert receiver.samples_received == 20 * 320
+        assert fd_count() <= baseline, f"文件描述符从 {baseline} 增加到 {fd_count()}"
+    finally:
+        receiver.disconnect_from_device()
+        server.close()
+    print("✓ 20 次重连后没有遗留的套接字")
+
+def test_analysis_error_recovery():
+    """测试某一帧分析出错时分析线程记录错误并继续运行"""
+    print("\n测试分析出错后继续...")
+    ring = SPSCSampleRing()
+    engine = AnalysisEngine(ring, 4000, fps=60)
+    push = engine.stft.push
+    failures = [RuntimeError("坏帧")]
+
+    def failing_push(samples):
+        if failures:
+            raise failures.pop()
+        return push(samples)
+
+    engine.stft.push = failing_push
+    engine.set_view(products=('peak_frequency',))
+    engine.start()
+    try:
+        ring.write(sine(4000))
+        time.sleep(0.2)
+        assert engine.error_count == 1 and engine.last_error == "坏帧"
+        ring.write(sine(4000, 4000))
+        time.sleep(0.2)
+        assert engine.thread.is_alive()
+        frame = engine.take_frame()
+    finally:
+        engine.stop()
+    assert frame is not None and abs(frame['peak_frequency'] - 1000) < 16
+    print(f"✓ 出错 {engine.error_count} 次后继续生成帧")
+
+def main():
+    """主函数"""
+    print("无界面分析引擎测试")
+    print("=" * 30)
+
+    tests = [test_no_qt_import, test_receiver_feeds_engine, test_headless_runner,
+             test_reconnect_releases_sockets, test_analysis_error_recovery]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
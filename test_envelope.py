@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+音频包络测试脚本
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from envelope import EnvelopeTracker, to_dbfs
+
+def reference_envelope(samples, block_size):
+    """逐块循环计算的参考结果"""
+    rms, peak = [], []
+    for i in range(0, len(samples) - block_size + 1, block_size):
+        block = samples[i:i + block_size].astype(np.float64)
+        rms.append(np.sqrt(np.mean(block ** 2)))
+        peak.append(np.max(np.abs(block)))
+    return np.array(rms), np.array(peak)
+
+def test_incremental_matches_loop():
+    """测试按任意块送入时结果与逐块循环一致"""
+    print("测试增量计算...")
+    samples = np.random.randint(-32768, 32768, 5000).astype(np.int16)
+    envelope = EnvelopeTracker(block_size=64)
+    new_blocks = 0
+    for start in range(0, len(samples), 333):
+        new_blocks += envelope.push(samples[start:start + 333])
+
+    expected_rms, expected_peak = reference_envelope(samples, 64)
+    rms, peak = envelope.latest()
+    assert new_blocks == len(expected_rms) == len(envelope)
+    assert np.allclose(rms, expected_rms, rtol=1e-5)
+    assert np.array_equal(peak, expected_peak)
+    print(f"✓ {new_blocks} 块结果一致")
+
+def test_block_size_and_rebuild():
+    """测试修改块大小后从历史数据重建"""
+    print("\n测试修改块大小...")
+    samples = np.random.randint(-1000, 1000, 4096).astype(np.int16)
+    envelope = EnvelopeTracker(block_size=64)
+    envelope.push(samples)
+    envelope.set_block_size(256)
+    assert len(envelope) == 0
+    envelope.rebuild(samples)
+    expected_rms, _ = reference_envelope(samples, 256)
+    assert np.allclose(envelope.latest()[0], expected_rms, rtol=1e-5)
+    print("✓ 重建结果正确")
+
+def test_level_and_window_stats():
+    """测试电平与窗口统计"""
+    print("\n测试电平与统计...")
+    envelope = EnvelopeTracker(block_size=100)
+    assert envelope.level() == (0.0, 0.0)
+    envelope.push(np.full(1000, 1000, dtype=np.int16))
+    envelope.push(np.full(1000, -32768, dtype=np.int16))
+    rms, peak = envelope.level()
+    assert rms == 32768 and peak == 32768
+    assert abs(to_dbfs(rms)) < 1e-6
+
+    window_rms, window_peak = envelope.window_stats(2000)
+    assert np.isclose(window_rms, np.sqrt((1000 ** 2 + 32768 ** 2) / 2))
+    assert window_peak == 32768
+    print(f"✓ 电平 {to_dbfs(rms):.1f} dBFS，窗口RMS {window_rms:.0f}")
+
+def main():
+    """主函数"""
+    print("音频包络测试")
+    print("=" * 30)
+
+    tests = [test_incremental_matches_loop, test_block_size_and_rebuild,
+             test_level_and_window_stats]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+帧协议测试脚本 - 测试二进制帧解析与JSON自动回退
+"""
+
+import os
+import sys
+import socket
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from frame_protocol import (FrameParser, TextLineDecoder, decode_text_line,
+                            encode_frame, FRAME_HEADER_SIZE)
+from test_audio_simulator import AudioSimulator
+
+def feed_in_chunks(parser, data, chunk_size):
+    """按固定大小分块送入解析器"""
+    frames = []
+    for i in range(0, len(data), chunk_size):
+        frames.extend(parser.feed(data[i:i + chunk_size]))
+    return frames
+
+def test_binary_roundtrip():
+    """测试二进制帧编解码（含跨块拆分）"""
+    print("测试二进制帧编解码...")
+    samples = [np.arange(i, i + 1024, dtype=np.int16) for i in range(5)]
+    stream = b''.join(encode_frame(s, seq, 16000) for seq, s in enumerate(samples))
+
+    for chunk_size in (1, 7, 1024, len(stream)):
+        parser = FrameParser()
+        frames = feed_in_chunks(parser, stream, chunk_size)
+        assert parser.mode == FrameParser.MODE_BINARY
+        assert len(frames) == len(samples)
+        for frame, expected in zip(frames, samples):
+            assert frame.dtype == np.int16
+            assert np.array_equal(frame, expected)
+        assert parser.frames_lost == 0
+
+    print("✓ 二进制帧编解码正确")
+
+def test_sequence_gap_and_resync():
+    """测试丢帧统计与帧头损坏后的重新同步"""
+    print("\n测试丢帧统计与重新同步...")
+    frame = np.ones(16, dtype=np.int16)
+    stream = (encode_frame(frame, 0) + b'garbage' + encode_frame(frame, 1) +
+              encode_frame(frame, 4))
+
+    parser = FrameParser()
+    frames = parser.feed(stream)
+    assert len(frames) == 3
+    assert parser.frames_lost == 2
+    assert parser.resync_count >= 1
+
+    print(f"✓ 丢帧 {parser.frames_lost} 帧，重新同步 {parser.resync_count} 次")
+
+def test_text_fallback():
+    """测试JSON与逗号分隔文本的自动回退"""
+    print("\n测试JSON/文本自动回退...")
+    parser = FrameParser()
+    frames = feed_in_chunks(parser, b'{"audio_data":[1,-2,3]}\n4,5,6\nnot data\n', 5)
+    assert parser.mode == FrameParser.MODE_TEXT
+    assert [f.tolist() for f in frames] == [[1, -2, 3], [4, 5, 6]]
+
+    print("✓ 文本模式解析正确")
+
+def test_fast_text_decoder():
+    """测试向量化文本解码器与逐元素解析结果一致"""
+    print("\n测试向量化文本解码器...")
+    decoder = TextLineDecoder()
+    fast_lines = [
+        b'{"audio_data":[1,-2,3]}',
+        b'{"audio_data": [1, -2, 3]}',
+        b'1,-2,3',
+        b'1, -2 ,3',
+        b'{"audio_data":[40000,-40000,0]}',
+    ]
+    for line in fast_lines:
+        frame = decoder(line)
+        assert frame.dtype == np.int16
+        assert np.array_equal(frame, decode_text_line(line)), line
+    assert decoder.fast_lines == len(fast_lines)
+
+    # 未知格式回退到json.loads/逐元素解析
+    fallback_lines = [b'{"audio_data":[1,2],"seq":5}', b'1,2,', b'{"status":"ok"}']
+    for line in fallback_lines:
+        frame, expected = decoder(line), decode_text_line(line)
+        assert (frame is None and expected is None) or np.array_equal(frame, expected), line
+    assert decoder.fallback_lines == len(fallback_lines)
+    assert decoder.samples_decoded == 3 * len(fast_lines) + 4
+    assert decoder.samples_per_second > 0
+
+    print(f"✓ 解码结果一致，快速路径 {decoder.fast_lines} 行，回退 {decoder.fallback_lines} 行")
+
+def test_text_decoder_parity():
+    """测试溢出、单个数值等边界输入与逐元素解析结果一致"""
+    print("\n测试文本解码边界情况...")
+    decoder = TextLineDecoder()
+    lines = [
+        b'3000000000,1', b'-3000000000,1', b'99999999999999999999,1',
+        b'-99999999999999999999,1', b'{"audio_data":[3000000000,-3000000000]}',
+        b'5', b'-5', b'', b'  ', b'-,1', b' ,1', b'1,- 2', b'1.5,2', b'+5,01',
+        b'031,  ', b' ,032', b'1,-',
+        b'{"audio_data":[]}', b'{"audio_data":[01,2]}', b'{"audio_data":[+1,2]}',
+    ]
+    for line in lines:
+        frame, expected = decoder(line), decode_text_line(line)
+        if expected is None:
+            assert frame is None, line
+        else:
+            assert frame.dtype == np.int16
+            assert np.array_equal(frame, expected), line
+    assert decoder(b'3000000000,1').tolist() == [32767, 1]
+
+    print("✓ 边界输入与逐元素解析结果一致")
+
+def test_receive_into_small_ring():
+    """测试recv_into接收路径（小缓冲区触发数据搬移与扩容）"""
+    print("\n测试recv_into接收路径...")
+    lines = b''.join(b'{"audio_data":[%d,%d]}\n' % (i, -i) for i in range(200))
+    binary = b''.join(encode_frame(np.full(1024, i, dtype=np.int16), i) for i in range(3))
+
+    for payload, expected in ((lines, 200), (binary, 3)):
+        server_side, client_side = socket.socketpair()
+        server_side.sendall(payload)
+        server_side.close()
+
+        parser = FrameParser(ring_size=64, read_size=37)
+        frames = []
+        while True:
+            result = parser.receive(client_side)
+            if result is None:
+                break
+            frames.extend(result)
+        client_side.close()
+
+        assert len(frames) == expected
+        assert parser.bytes_received == len(payload)
+        assert frames[-1][0] == (199 if expected == 200 else 2)
+
+    print("✓ 小缓冲区下接收与解析正确")
+
+def test_simulator_binary_mode():
+    """测试模拟器二进制模式端到端传输"""
+    print("\n测试模拟器二进制模式...")
+    simulator = AudioSimulator(mode='binary')
+    simulator.running = True
+    server_side, client_side = socket.socketpair()
+    sender = threading.Thread(target=simulator.handle_client, args=(server_side,))
+    sender.daemon = True
+    sender.start()
+
+    parser = FrameParser()
+    frames = []
+    try:
+        while len(frames) < 3:
+            data = client_side.recv(4096)
+            assert data, "连接意外关闭"
+            frames.extend(parser.feed(data))
+    finally:
+        simulator.running = False
+        client_side.close()
+
+    assert parser.mode == FrameParser.MODE_BINARY
+    assert all(len(f) == 1024 for f in frames)
+    assert parser.sample_rate == simulator.sample_rate
+    wire_bytes = FRAME_HEADER_SIZE + 1024 * 2
+    print(f"✓ 接收 {len(frames)} 帧，每帧 {wire_bytes} 字节")
+
+def main():
+    """主函数"""
+    print("帧协议测试")
+    print("=" * 30)
+
+    tests = [test_binary_roundtrip, test_sequence_gap_and_resync,
+             test_text_fallback, test_fast_text_decoder, test_text_decoder_parity,
+             test_receive_into_small_ring,
+             test_simulator_binary_mode]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
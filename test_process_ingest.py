@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+多进程接收测试脚本
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from process_ingest import ProcessIngest
+from shared_ring import SharedRingReader
+from engine import AnalysisEngine
+from test_async_ingest import start_simulators, stop_simulators, wait_for
+
+def test_worker_processes():
+    """测试设备分组到工作进程接收，主进程从共享内存读取样本与连接状态"""
+    print("测试多进程接收...")
+    simulators = start_simulators(5, modes=('binary', 'json', 'csv'))
+    statuses = []
+    ingest = ProcessIngest(devices_per_worker=2, on_status=lambda device, connected, message:
+                           statuses.append((device.name, connected)))
+    devices = [ingest.add_device(f"设备{i}", '127.0.0.1', s.port)
+               for i, s in enumerate(simulators)]
+    ingest.start()
+    workers = list(ingest.workers)
+    try:
+        assert ingest.worker_count == 3 and len(workers) == 3
+        assert wait_for(lambda: all(d.samples_received >= 4096 for d in devices), timeout=15.0)
+        assert all(d.connected and d.connect_count == 1 for d in devices)
+        assert os.getpid() not in {worker.pid for worker in workers}
+        for device in devices:
+            samples = device.sample_ring.read_available()
+            assert 4096 <= len(samples) <= device.samples_received
+            assert np.abs(samples).max() <= 1200
+            assert device.sample_ring.sample_rate == 16000
+        try:
+            ingest.add_device("设备5", '127.0.0.1', 1)
+            assert False, "运行时不能添加设备"
+        except RuntimeError:
+            pass
+    finally:
+        ingest.stop()
+        stop_simulators(simulators)
+
+    assert not any(d.connected for d in devices)
+    assert not any(worker.is_alive() for worker in workers) and ingest.workers == []
+    for device in devices:
+        assert [connected for name, connected in statuses if name == device.name] == [True, False]
+        try:
+            SharedRingReader(device.shm_name)
+            assert False, "停止后共享内存应被删除"
+        except FileNotFoundError:
+            pass
+    total = sum(d.samples_received for d in devices)
+    print(f"✓ {len(devices)} 个设备、{ingest.worker_count} 个工作进程共接收 {total} 样本")
+
+def test_engine_bridge():
+    """测试共享内存样本环直接作为分析引擎的输入"""
+    print("\n测试分析引擎对接...")
+    simulators = start_simulators(2)
+    ingest = ProcessIngest()
+    engines = []
+    for i, simulator in enumerate(simulators):
+        device = ingest.add_device(f"设备{i}", '127.0.0.1', simulator.port)
+        engine = AnalysisEngine(device.sample_ring, 4096, fps=60)
+        engine.set_view(products=('peak_frequency',))
+        engine.start()
+        engines.append(engine)
+    ingest.start()
+    try:
+        assert ingest.worker_count == 1
+        assert wait_for(lambda: all(d.samples_received >= 8192 for d in ingest.devices.values()),
+                        timeout=15.0)
+        time.sleep(0.1)
+        frames = [engine.take_frame() for engine in engines]
+    finally:
+        for engine in engines:
+            engine.stop()
+        ingest.stop()
+        stop_simulators(simulators)
+    for frame in frames:
+        assert frame['stats']['count'] == 4096
+        assert abs(frame['peak_frequency'] - 440) < 16
+    print(f"✓ 主频 {[frame['peak_frequency'] for frame in frames]} Hz")
+
+def main():
+    """主函数"""
+    print("多进程接收测试")
+    print("=" * 30)
+
+    tests = [test_worker_processes, test_engine_bridge]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+多分辨率波形索引测试脚本
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from ring_buffer import AudioRingBuffer
+from pyramid import AudioPyramid
+
+def feed(pyramid, raw, total, seed=0):
+    """按不规则帧长送入total个随机样本，返回全部样本"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    written = 0
+    while written < total:
+        frame = rng.integers(-30000, 30000, min(rng.integers(1, 3000), total - written)).astype(np.int16)
+        raw.append(frame)
+        pyramid.push(frame)
+        frames.append(frame)
+        written += len(frame)
+    return np.concatenate(frames)
+
+def test_levels_match_direct_reduction():
+    """测试每一层都等于对原始数据直接按2^k分块归约"""
+    print("测试各层归约...")
+    raw = AudioRingBuffer(100000)
+    pyramid = AudioPyramid(raw, history_samples=1 << 20, base_level=6, top_entries=64)
+    samples = feed(pyramid, raw, 300000)
+    for level in pyramid.levels:
+        decimation = level.decimation
+        assert level.written == len(samples) // decimation
+        mins, maxs, mean_squares = level.entries(level.first, level.written)
+        blocks = samples[level.first * decimation:level.written * decimation].reshape(-1, decimation)
+        assert np.array_equal(mins, blocks.min(axis=1))
+        assert np.array_equal(maxs, blocks.max(axis=1))
+        assert np.allclose(mean_squares, np.mean(blocks.astype(np.float64) ** 2, axis=1), rtol=1e-4)
+    print(f"✓ {len(pyramid.levels)} 层结果一致")
+
+def test_memory_overhead():
+    """测试默认参数下索引内存为原始数据的几个百分点"""
+    print("\n测试内存占用...")
+    pyramid = AudioPyramid()
+    assert pyramid.overhead < 0.05
+    print(f"✓ 2小时索引 {pyramid.nbytes / 1e6:.1f} MB，占原始数据 {pyramid.overhead:.1%}")
+
+def test_query_scales_with_pixels():
+    """测试任意缩放下输出点数与像素宽度成正比，并能放大到单个样本"""
+    print("\n测试缩放查询...")
+    raw = AudioRingBuffer(50000)
+    pyramid = AudioPyramid(raw, history_samples=1 << 22)
+    samples = feed(pyramid, raw, 2000000, seed=1)
+    total = len(samples)
+
+    for span in (total, 500000, 20000):
+        x_data, y_data, rms, decimation = pyramid.query(total - span, total, 800)
+        assert len(x_data) == len(y_data) and len(rms) == len(y_data) // 2
+        assert len(y_data) <= 4 * 800 + 4
+        # 最小/最大值点对覆盖了区间内的真实极值（条目边界可能向两侧多包含一些样本）
+        assert y_data.max() >= samples[total - span:].max()
+
+    x_data, y_data, rms, decimation = pyramid.query(total - 300, total, 800)
+    assert decimation == 1 and rms is None
+    assert np.array_equal(y_data, samples[-300:])
+    assert x_data[0] == total - 300
+    print("✓ 输出点数与缩放级别无关")
+
+def main():
+    """主函数"""
+    print("多分辨率波形索引测试")
+    print("=" * 30)
+
+    tests = [test_levels_match_direct_reduction, test_memory_overhead,
+             test_query_scales_with_pixels]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+转发中心测试脚本
+"""
+
+import os
+import sys
+import time
+import socket
+import tempfile
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from frame_protocol import FrameParser, encode_frame
+from relay_hub import RelayHub
+from test_async_ingest import start_simulators, stop_simulators, wait_for
+
+class SubscriberClient:
+    """在后台线程中持续读取转发中心的订阅者"""
+
+    def __init__(self, family, address):
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(address)
+        self.parser = FrameParser()
+        self.frames = []
+        self.thread = threading.Thread(target=self._read, daemon=True)
+        self.thread.start()
+
+    def _read(self):
+        while True:
+            try:
+                frames = self.parser.receive(self.sock)
+            except OSError:
+                return
+            if frames is None:
+                return
+            self.frames.extend(frames)
+
+    def close(self):
+        self.sock.close()
+        self.thread.join(1.0)
+
+def test_fan_out():
+    """测试多个TCP与Unix套接字订阅者共享一个上游连接，收到相同的帧"""
+    print("测试转发...")
+    simulators = start_simulators(1, modes=('json',))
+    unix_path = os.path.join(tempfile.mkdtemp(), 'relay.sock')
+    hub = RelayHub('127.0.0.1', simulators[0].port, port=0, unix_path=unix_path)
+    hub.start()
+    clients = []
+    try:
+        clients = [SubscriberClient(socket.AF_INET, ('127.0.0.1', hub.port)) for _ in range(3)]
+        clients.append(SubscriberClient(socket.AF_UNIX, unix_path))
+        assert wait_for(lambda: len(hub.subscribers) == 4)
+        start = hub.frames_relayed
+        assert wait_for(lambda: hub.frames_relayed >= start + 20)
+    finally:
+        hub.stop()
+        for client in clients:
+            client.close()
+        stop_simulators(simulators)
+
+    assert hub.upstream.connect_count == 1 and hub.subscriber_count == 4
+    assert not os.path.exists(unix_path)
+    # 各订阅者连接时刻不同，比较所有订阅者都收到的最后一段帧
+    tail = min(len(client.frames) for client in clients)
+    assert tail >= 20
+    for client in clients[1:]:
+        assert all(np.array_equal(a, b) for a, b in zip(client.frames[-tail:], clients[0].frames[-tail:]))
+    for client in clients:
+        assert client.parser.mode == FrameParser.MODE_BINARY
+        assert client.parser.frames_lost == 0 and client.parser.resync_count == 0
+    print(f"✓ {len(clients)} 个订阅者，上游连接 {hub.upstream.connect_count} 次，"
+          f"转发 {hub.frames_relayed} 帧")
+
+def test_slow_subscriber():
+    """测试不读取数据的订阅者只丢弃自己的帧，队列有界，不影响其他订阅者"""
+    print("\n测试慢订阅者...")
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    go = threading.Event()
+    frame_count = 6000  # 共约12MB，超过内核套接字缓冲区能容纳的量
+
+    def serve():
+        client, _ = server.accept()
+        go.wait(3.0)
+        try:
+            for sequence in range(frame_count):
+                client.sendall(encode_frame(np.full(1024, sequence % 1000), sequence))
+                if sequence % 20 == 19:
+                    time.sleep(0.001)
+            time.sleep(1.0)
+        except OSError:
+            pass
+        finally:
+            client.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    hub = RelayHub('127.0.0.1', server.getsockname()[1], port=0, max_queue=8, write_buffer=4096)
+    hub.start()
+    slow = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    fast = None
+    try:
+        slow.connect(('127.0.0.1', hub.port))
+        fast = SubscriberClient(socket.AF_INET, ('127.0.0.1', hub.port))
+        assert wait_for(lambda: len(hub.subscribers) == 2 and hub.upstream.connected)
+        go.set()
+        assert wait_for(lambda: hub.frames_relayed == frame_count, timeout=10.0)
+        assert wait_for(lambda: len(fast.frames) == frame_count)
+        stats = {address[1]: (sent, dropped, queued) for address, sent, dropped, queued in hub.stats()}
+        slow_port, fast_port = slow.getsockname()[1], fast.sock.getsockname()[1]
+    finally:
+        hub.stop()
+        slow.close()
+        if fast is not None:
+            fast.close()
+        server.close()
+
+    sent, dropped, queued = stats[slow_port]
+    assert dropped > 0 and queued <= 8 and sent + dropped + queued == frame_count
+    assert stats[fast_port][1] == 0
+    assert fast.parser.frames_lost == 0
+    assert [frame[0] for frame in fast.frames[:3]] == [0, 1, 2]
+    print(f"✓ 慢订阅者发送 {sent} 帧、丢弃 {dropped} 帧，正常订阅者收到全部 {len(fast.frames)} 帧")
+
+def main():
+    """主函数"""
+    print("转发中心测试")
+    print("=" * 30)
+
+    tests = [test_fan_out, test_slow_subscriber]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+刷新调度测试脚本
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt6.QtWidgets import QApplication
+from render_scheduler import RenderScheduler, MAX_FPS
+
+# 与含界面控件的测试在同一进程中运行时（pytest）共用同一个QApplication
+app = QApplication.instance() or QApplication([])
+
+class FakeWindow:
+    """只提供调度器需要的窗口状态"""
+
+    def __init__(self):
+        self.minimized = False
+
+    def isMinimized(self):
+        return self.minimized
+
+    def isVisible(self):
+        return True
+
+def make_scheduler(render_seconds=0.0, fps=20):
+    window = FakeWindow()
+    calls = {'render': 0, 'poll': 0}
+
+    def render():
+        calls['render'] += 1
+        time.sleep(render_seconds)
+
+    def poll():
+        calls['poll'] += 1
+
+    scheduler = RenderScheduler(window, render, poll=poll, fps=fps)
+    return scheduler, window, calls
+
+def test_render_only_when_dirty():
+    """测试只在有变化时重绘，poll 每次都调用"""
+    print("测试脏标记...")
+    scheduler, _, calls = make_scheduler()
+    for _ in range(5):
+        scheduler._tick()
+    assert calls['render'] == 1 and calls['poll'] == 5
+    assert scheduler.frames_skipped == 4
+
+    scheduler.mark_dirty()
+    scheduler.mark_dirty()
+    scheduler._tick()
+    scheduler._tick()
+    assert calls['render'] == 2
+    assert scheduler.achieved_fps == 2
+    scheduler.stop()
+    print("✓ 多次标记合并为一帧")
+
+def test_pause_when_minimized():
+    """测试窗口最小化时暂停绘制，恢复后重绘一次"""
+    print("\n测试最小化暂停...")
+    scheduler, window, calls = make_scheduler()
+    scheduler._tick()
+    window.minimized = True
+    scheduler.mark_dirty()
+    for _ in range(3):
+        scheduler._tick()
+    assert calls['render'] == 1 and calls['poll'] == 4 and scheduler.paused
+
+    window.minimized = False
+    scheduler._tick()
+    scheduler._tick()
+    assert calls['render'] == 2 and not scheduler.paused
+    scheduler.stop()
+    print("✓ 最小化期间只取数据不绘制")
+
+def test_slow_render_backs_off():
+    """测试渲染超过帧间隔时下一帧至少留出同样长的空闲时间"""
+    print("\n测试渲染过慢...")
+    scheduler, _, _ = make_scheduler(render_seconds=0.04, fps=MAX_FPS)
+    scheduler._tick()
+    assert scheduler.timer.interval() >= 40
+    assert scheduler.render_time >= 0.04
+
+    scheduler.set_fps(1000)
+    assert scheduler.fps == MAX_FPS
+    fast, _, _ = make_scheduler(fps=10)
+    fast._tick()
+    assert 90 <= fast.timer.interval() <= 100
+    scheduler.stop()
+    fast.stop()
+    print(f"✓ 下一帧间隔 {scheduler.timer.interval()} ms")
+
+def main():
+    """主函数"""
+    print("刷新调度测试")
+    print("=" * 30)
+
+    tests = [test_render_only_when_dirty, test_pause_when_minimized, test_slow_render_backs_off]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
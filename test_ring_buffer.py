@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+环形缓冲区测试脚本
+"""
+
+import os
+import sys
+import time
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from ring_buffer import AudioRingBuffer, SPSCSampleRing
+
+def test_append_and_latest():
+    """测试追加与读取最新数据（含回绕）"""
+    print("测试追加与读取...")
+    buffer = AudioRingBuffer(10)
+    reference = []
+    for start in range(0, 57, 7):
+        frame = np.arange(start, start + 7, dtype=np.int16)
+        buffer.append(frame)
+        reference.extend(frame.tolist())
+        for count in (1, 5, 10, None):
+            expected = reference[-10:][-count:] if count else reference[-10:]
+            assert buffer.latest(count).tolist() == expected
+
+    assert len(buffer) == 10
+    assert buffer.total_written == len(reference)
+    print("✓ 追加与读取正确")
+
+def test_zero_copy_view():
+    """测试latest返回只读视图而非拷贝"""
+    print("\n测试零拷贝视图...")
+    buffer = AudioRingBuffer(8)
+    buffer.append(np.arange(13, dtype=np.int16))
+    view = buffer.latest(8)
+    assert view.base is not None
+    assert not view.flags.writeable
+    print("✓ 返回只读视图")
+
+def test_oversized_frame():
+    """测试单帧超过容量时只保留最新数据"""
+    print("\n测试超长帧...")
+    buffer = AudioRingBuffer(4)
+    buffer.append([1, 2])
+    buffer.append(np.arange(100, 110))
+    assert buffer.latest().tolist() == [106, 107, 108, 109]
+    assert buffer.total_written == 12
+    print("✓ 超长帧处理正确")
+
+def test_resize_preserves_data():
+    """测试改变容量时保留最新数据"""
+    print("\n测试改变容量...")
+    buffer = AudioRingBuffer(6)
+    buffer.append(np.arange(9))
+    version = buffer.version
+
+    buffer.resize(4)
+    assert buffer.latest().tolist() == [5, 6, 7, 8]
+    buffer.resize(10)
+    assert buffer.latest().tolist() == [5, 6, 7, 8]
+    buffer.append([9, 10])
+    assert buffer.latest().tolist() == [5, 6, 7, 8, 9, 10]
+    assert buffer.total_written == 11
+    assert buffer.version > version
+
+    buffer.clear()
+    assert len(buffer) == 0 and len(buffer.latest()) == 0
+    print("✓ 改变容量后数据保留")
+
+def test_spsc_overrun_detection():
+    """测试消费者过慢时的溢出统计"""
+    print("\n测试样本环溢出统计...")
+    ring = SPSCSampleRing(16, dtype=np.int32)
+    ring.write(np.arange(10))
+    assert ring.read_available().tolist() == list(range(10))
+    assert len(ring.read_available()) == 0
+
+    ring.write(np.arange(10, 40))
+    samples = ring.read_available()
+    assert samples.tolist() == list(range(24, 40))
+    assert ring.overrun_count == 1 and ring.overrun_samples == 14
+    print(f"✓ 溢出 {ring.overrun_count} 次，丢失 {ring.overrun_samples} 样本")
+
+def test_spsc_threaded_handoff():
+    """测试接收线程写入、消费者批量读取时数据连续且无重复"""
+    print("\n测试多线程无锁交接...")
+    ring = SPSCSampleRing(4096, dtype=np.int32)
+    total = 200000
+    frame = 1024
+
+    def producer():
+        for start in range(0, total, frame):
+            ring.write(np.arange(start, min(start + frame, total), dtype=np.int32))
+            time.sleep(0)  # 让出GIL，使读写交替进行
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    received = []
+    while thread.is_alive() or ring.available():
+        chunk = ring.read_available()
+        if len(chunk):
+            received.append(chunk)
+        else:
+            time.sleep(0.0005)
+    thread.join()
+    received.append(ring.read_available())
+
+    data = np.concatenate(received)
+    steps = np.diff(data)
+    # 样本严格递增；出现跳跃时跳过的样本数必须与溢出统计一致
+    assert np.all(steps >= 1)
+    assert int(np.sum(steps - 1)) + data[0] == ring.overrun_samples
+    assert data[-1] == total - 1
+    assert len(data) + ring.overrun_samples == total
+    print(f"✓ 读取 {len(data)} 样本，溢出 {ring.overrun_count} 次 / {ring.overrun_samples} 样本")
+
+def test_spsc_no_torn_reads():
+    """测试单次写入超过（容量 - 积压）时，拷贝期间正在被改写的样本不会被读出"""
+    print("\n测试写入中的区域不被读出...")
+    ring = SPSCSampleRing(1 << 16, dtype=np.int64)
+    total = 40000000
+    burst = 60000  # 接近容量，消费者有积压时写入必然覆盖正在拷贝的区域
+
+    def producer():
+        for start in range(0, total, burst):
+            ring.write(np.arange(start, min(start + burst, total), dtype=np.int64))
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    chunks = []
+    while thread.is_alive() or ring.available():
+        chunk = ring.read_available()
+        if len(chunk):
+            chunks.append(chunk)
+    thread.join()
+    chunks.append(ring.read_available())
+
+    # 每次读取的样本必须连续：被改写的样本会表现为跳跃
+    torn = sum(int(np.count_nonzero(np.diff(chunk) != 1)) for chunk in chunks)
+    assert torn == 0, f"读到 {torn} 处被改写的样本"
+    data = np.concatenate(chunks)
+    assert np.all(np.diff(data) >= 1)
+    assert len(data) + ring.overrun_samples == total
+    print(f"✓ {len(chunks)} 次读取均连续，溢出 {ring.overrun_count} 次 / {ring.overrun_samples} 样本")
+
+def main():
+    """主函数"""
+    print("环形缓冲区测试")
+    print("=" * 30)
+
+    tests = [test_append_and_latest, test_zero_copy_view,
+             test_oversized_frame, test_resize_preserves_data,
+             test_spsc_overrun_detection, test_spsc_threaded_handoff,
+             test_spsc_no_torn_reads]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+串口接收测试脚本 - 用伪终端对代替开发板
+"""
+
+import os
+import sys
+import json
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from frame_protocol import encode_frame
+from ring_buffer import SPSCSampleRing
+from engine import StreamReceiver
+from serial_ingest import parse_serial_address, DEFAULT_BAUDRATE
+
+def sine(count, sample_rate, start=0):
+    t = (start + np.arange(count)) / sample_rate
+    return (8000 * np.sin(2 * np.pi * 1000 * t)).astype(np.int16)
+
+def encode(samples, sequence, sample_rate, mode):
+    if mode == 'binary':
+        return encode_frame(samples, sequence, sample_rate)
+    return (json.dumps({"audio_data": samples.tolist()}, separators=(',', ':')) + "\n").encode()
+
+def receive_over_pty(sample_rate, seconds, mode='binary', realtime=True):
+    """伪终端主端按10ms一帧写入，串口接收器从从端读取，返回 (接收器, 串口, 发送的样本, 用时)"""
+    master, slave = os.openpty()
+    frame_size = sample_rate // 100
+    frames = [sine(frame_size, sample_rate, i * frame_size)
+              for i in range(int(seconds * 100))]
+    ring = SPSCSampleRing(1 << 20)
+    receiver = StreamReceiver(ring, os.ttyname(slave))
+    assert receiver.connect_to_device(), "打开串口失败"
+    receiver.start_receiving()
+    total = len(frames) * frame_size
+    start = time.perf_counter()
+    try:
+        for sequence, frame in enumerate(frames):
+            os.write(master, encode(frame, sequence, sample_rate, mode))
+            if realtime:
+                time.sleep(max(start + (sequence + 1) / 100 - time.perf_counter(), 0))
+        deadline = time.perf_counter() + 5.0
+        while receiver.samples_received < total and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+    finally:
+        stream = receiver.socket
+        receiver.disconnect_from_device()
+        receiver.receive_thread.join(1.0)
+        os.close(master)
+        os.close(slave)
+    return receiver, stream, np.concatenate(frames), elapsed
+
+def test_parse_serial_address():
+    """测试串口地址识别"""
+    print("测试串口地址...")
+    assert parse_serial_address("COM3") == ("COM3", DEFAULT_BAUDRATE)
+    assert parse_serial_address("/dev/ttyUSB0@921600") == ("/dev/ttyUSB0", 921600)
+    assert parse_serial_address("192.168.0.194") is None
+    print("✓ COM3、/dev/ttyUSB0@921600 识别为串口，IP地址不是")
+
+def test_realtime_rates():
+    """测试按实时速率发送16kHz与48kHz单声道，样本完整、采样率与帧序号正确"""
+    print("\n测试实时接收...")
+    for sample_rate in (16000, 48000):
+        receiver, stream, sent, _ = receive_over_pty(sample_rate, 0.5)
+        received = receiver.sample_ring.read_available()
+        assert np.array_equal(received, sent)
+        assert receiver.parser.mode == 'binary' and receiver.parser.sample_rate == sample_rate
+        assert receiver.parser.frames_lost == 0 and receiver.parser.resync_count == 0
+        print(f"✓ {sample_rate} Hz: {len(received)} 样本，"
+              f"平均每次读取 {stream.bytes_read / stream.read_count:.0f} 字节")
+
+def test_headroom():
+    """测试不限速写入时的接收速率，相对48kHz实时速率的余量"""
+    print("\n测试吞吐余量...")
+    for mode in ('binary', 'json'):
+        receiver, stream, sent, elapsed = receive_over_pty(48000, 5.0, mode, realtime=False)
+        assert np.array_equal(receiver.sample_ring.read_available(), sent)
+        headroom = len(sent) / elapsed / 48000
+        # 批量读取：平均每次读取远多于一个字节
+        assert stream.bytes_read / stream.read_count > 64
+        assert headroom > 2, f"{mode} 余量不足: {headroom:.1f}x"
+        print(f"✓ {mode}: {len(sent) / elapsed:,.0f} 样本/秒，为48kHz实时速率的 {headroom:.1f} 倍")
+
+def wait_for_samples(receiver, count, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while receiver.samples_received < count and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    return receiver.samples_received >= count
+
+def test_reopen_after_disconnect():
+    """测试设备断开（关闭伪终端主端）后串口句柄被释放，同一个端口可以重新打开"""
+    print("\n测试断开后重新打开...")
+    master, slave = os.openpty()
+    port = os.ttyname(slave)
+    statuses = []
+    # 同时记录报告状态时串口是否已经释放
+    receiver = StreamReceiver(SPSCSampleRing(), port,
+                              on_status=lambda connected, message:
+                              statuses.append((connected, receiver.socket is None)))
+    try:
+        assert receiver.connect_to_device()
+        receiver.start_receiving()
+        stream = receiver.socket
+        os.write(master, encode_frame(sine(160, 16000), 0))
+        assert wait_for_samples(receiver, 160)
+
+        # 拔出设备：读取出错，接收线程关闭串口后才报告断开
+        os.close(master)
+        os.close(slave)
+        receiver.receive_thread.join(2.0)
+        assert not receiver.receive_thread.is_alive()
+        assert statuses == [(True, False), (False, True)] and not receiver.connected
+        assert not stream.serial.is_open and receiver.socket is None
+
+        # 旧句柄已释放，系统把同一个伪终端编号分配给新设备
+        master, slave = os.openpty()
+        if sys.platform.startswith('linux'):
+            assert os.ttyname(slave) == port, f"{port} 仍被占用"
+        receiver.host = os.ttyname(slave)
+        assert receiver.connect_to_device()
+        receiver.start_receiving()
+        os.write(master, encode_frame(sine(160, 16000), 0))
+        assert wait_for_samples(receiver, 320)
+    finally:
+        receiver.disconnect_from_device()
+        if receiver.receive_thread is not None:
+            receiver.receive_thread.join(1.0)
+        os.close(master)
+        os.close(slave)
+    print(f"✓ 断开后重新打开 {port} 并继续接收")
+
+def main():
+    """主函数"""
+    print("串口接收测试")
+    print("=" * 30)
+
+    if not hasattr(os, 'openpty'):
+        print("当前系统没有伪终端，跳过")
+        return
+
+    tests = [test_parse_serial_address, test_realtime_rates, test_headroom,
+             test_reopen_after_disconnect]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
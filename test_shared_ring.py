@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+共享内存样本环测试脚本
+"""
+
+import os
+import sys
+import threading
+import subprocess
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+sys.path.insert(0, SRC_DIR)
+from multiprocessing import shared_memory, resource_tracker
+from shared_ring import (SharedSamplePublisher, SharedRingReader, SharedRingConsumer,
+                         RESERVE_INDEX, MAGIC, OWNER_PID, HEADER_FIELDS, SHARED_MAGIC)
+from headless import HeadlessRunner
+from test_engine import start_server
+
+def test_publish_and_read():
+    """测试读取端的视图直接引用共享内存、跨越环尾时仍连续"""
+    print("测试发布与读取...")
+    name = f"test_audio_{os.getpid()}"
+    publisher = SharedSamplePublisher(name, capacity=1000)
+    reader = SharedRingReader(name)
+    try:
+        data = np.arange(2500, dtype=np.int16)
+        publisher.write(data[:700], sample_rate=48000)
+        first = reader.read_available()
+        assert np.array_equal(first, data[:700]) and reader.overwritten() == 0
+        publisher.write(data[700:1500])  # 跨越环尾
+        second = reader.read_available()
+        assert np.array_equal(second, data[700:1500])
+        latest = reader.latest(900)
+        assert np.array_equal(latest, data[600:1500])
+        assert np.shares_memory(latest, reader._storage) and not latest.flags.writeable
+        assert reader.sample_rate == 48000 and reader.sequence == 2
+
+        # 视图使用期间发布端覆盖了视图开头的样本
+        publisher.write(data[1500:1800])
+        assert reader.overwritten() == 200
+        assert np.array_equal(latest[200:], data[800:1500])
+
+        # 积压恰好一个容量时不丢数据；超过容量时跳过被覆盖的部分并计入溢出
+        publisher.write(data[1800:2500])
+        assert np.array_equal(reader.read_available(), data[1500:2500])
+        assert reader.overrun_count == 0
+        publisher.write(data[:1200])
+        assert np.array_equal(reader.read_available(), data[200:1200])
+        assert reader.overrun_count == 1 and reader.overrun_samples == 200
+    finally:
+        reader.close()
+        publisher.close()
+    print("✓ 零拷贝视图、覆盖检测与溢出统计正确")
+
+def test_consumer_drops_overwritten():
+    """测试拷贝读取端丢弃读取期间被覆盖的样本并计入溢出"""
+    print("\n测试拷贝读取端...")
+    name = f"test_audio_{os.getpid()}"
+    publisher = SharedSamplePublisher(name, capacity=16)
+    consumer = SharedRingConsumer(name)
+    try:
+        data = np.arange(40, dtype=np.int16)
+        publisher.write(data[:10])
+        samples = consumer.read_available()
+        assert np.array_equal(samples, data[:10]) and not np.shares_memory(samples, consumer._storage)
+
+        # 发布端已预留、正在写入的12个样本覆盖了待读样本中最旧的6个
+        publisher.write(data[10:20])
+        publisher.header[RESERVE_INDEX] = 20 + 12
+        assert np.array_equal(consumer.read_available(), data[16:20])
+        assert consumer.overrun_count == 1 and consumer.overrun_samples == 6
+        publisher.write(data[20:32])
+        assert np.array_equal(consumer.read_available(), data[20:32])
+        assert consumer.overrun_count == 1
+    finally:
+        consumer.close()
+        publisher.close()
+    print(f"✓ 丢弃 {consumer.overrun_samples} 个被覆盖的样本")
+
+def test_existing_segment():
+    """测试同名共享内存正在使用时拒绝接管，只重建发布进程已退出的共享内存"""
+    print("\n测试同名共享内存...")
+    name = f"test_audio_{os.getpid()}"
+    publisher = SharedSamplePublisher(name, capacity=100)
+    try:
+        SharedSamplePublisher(name, capacity=100)
+        assert False, "不应接管正在使用的共享内存"
+    except FileExistsError as e:
+        assert str(os.getpid()) in str(e)
+    finally:
+        publisher.close()
+
+    # 模拟异常退出的发布进程留下的共享内存
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    stale = shared_memory.SharedMemory(name=name, create=True, size=4096)
+    resource_tracker.unregister(stale._name, 'shared_memory')
+    header = np.ndarray(HEADER_FIELDS, dtype=np.uint64, buffer=stale.buf)
+    header[MAGIC] = SHARED_MAGIC
+    header[OWNER_PID] = dead.pid
+    del header
+    stale.close()
+    publisher = SharedSamplePublisher(name, capacity=100)
+    try:
+        assert publisher.replaced_stale and publisher.capacity == 100
+        reader = SharedRingReader(name)
+        publisher.write(np.arange(10, dtype=np.int16))
+        assert reader.read_available().tolist() == list(range(10))
+        reader.close()
+    finally:
+        publisher.close()
+    print("✓ 拒绝接管正在使用的共享内存，重建异常退出留下的共享内存")
+
+def test_other_process_reads():
+    """测试无界面运行器发布样本，另一个进程按名称连接并读取"""
+    print("\n测试跨进程读取...")
+    name = f"test_audio_{os.getpid()}"
+    port = start_server(1.0)
+    runner = HeadlessRunner('127.0.0.1', port, history_samples=4000, interval=0.25, publish=name)
+    thread = threading.Thread(target=runner.run, args=(1.2, 0.1))
+    thread.start()
+    # 子进程读取最新8000个样本，与服务器发送的正弦波逐点比较
+    code = ("import sys, time; sys.path.insert(0, sys.argv[1]); import numpy as np; "
+            "from shared_ring import SharedRingReader; from test_engine import sine; "
+            "reader = SharedRingReader(sys.argv[2]); deadline = time.time() + 3\n"
+            "while reader.write_index < 8000 and time.time() < deadline: time.sleep(0.01)\n"
+            "view = reader.latest(8000)\n"
+            "match = np.array_equal(view, sine(len(view), reader.view_start))\n"
+            "print(len(view), reader.sample_rate, match or reader.overwritten() > 0)")
+    try:
+        output = subprocess.check_output(
+            [sys.executable, '-c', code, SRC_DIR, name], text=True,
+            cwd=os.path.dirname(SRC_DIR), timeout=10)
+        # 读取进程退出不会删除共享内存
+        reader = SharedRingReader(name)
+        assert reader.write_index >= 8000
+        reader.close()
+    finally:
+        thread.join()
+    assert output.split()[-3:] == ['8000', '16000', 'True'], output
+    try:
+        SharedRingReader(name)
+        assert False, "运行器退出后共享内存应被删除"
+    except FileNotFoundError:
+        pass
+    print(f"✓ 子进程读取 {output.split()[-3]} 样本，与发送数据一致")
+
+def main():
+    """主函数"""
+    print("共享内存样本环测试")
+    print("=" * 30)
+
+    tests = [test_publish_and_read, test_consumer_drops_overwritten, test_existing_segment,
+             test_other_process_reads]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
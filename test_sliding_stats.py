@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+滑动窗口统计测试脚本
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from ring_buffer import AudioRingBuffer
+from sliding_stats import SlidingStats, count_clipped
+
+def check_against_window(stats):
+    """与直接对整个窗口计算的结果比较"""
+    window = stats.buffer.latest().astype(np.int64)
+    assert stats.count == len(window)
+    assert stats.maximum == window.max()
+    assert stats.minimum == window.min()
+    assert np.isclose(stats.mean, window.mean())
+    assert np.isclose(stats.rms, np.sqrt(np.mean(window ** 2)))
+    assert stats.clip_count == count_clipped(window)
+
+def test_matches_full_window():
+    """测试不同帧长、块大小与容量下结果与全窗口计算一致"""
+    print("测试增量统计...")
+    rng = np.random.default_rng(0)
+    checks = 0
+    for capacity, block_size in ((1000, 64), (1000, 1024), (4096, 100), (7, 3)):
+        stats = SlidingStats(AudioRingBuffer(capacity), block_size=block_size)
+        for _ in range(60):
+            frame = rng.integers(-32768, 32768, rng.integers(1, 700)).astype(np.int16)
+            stats.append(frame)
+            check_against_window(stats)
+            checks += 1
+    print(f"✓ {checks} 次比较全部一致")
+
+def test_resize_and_clear():
+    """测试改变容量与清空后重新计算"""
+    print("\n测试改变容量...")
+    stats = SlidingStats(AudioRingBuffer(500), block_size=32)
+    stats.append(np.arange(-300, 300, dtype=np.int16))
+    stats.resize(100)
+    check_against_window(stats)
+    assert stats.maximum == 299 and stats.minimum == 200
+    stats.append(np.array([-5000], dtype=np.int16))
+    check_against_window(stats)
+
+    stats.clear()
+    assert stats.count == 0 and stats.maximum is None and stats.rms == 0.0
+    print("✓ 改变容量与清空正确")
+
+def test_peak_hold_and_clipping():
+    """测试峰值保持与削波计数"""
+    print("\n测试峰值保持与削波...")
+    stats = SlidingStats(AudioRingBuffer(100), block_size=16, hold_samples=200)
+    loud = np.array([32767, -32768, 100], dtype=np.int16)
+    stats.append(loud)
+    assert stats.peak_hold == 32768
+    assert stats.clip_count == 2 and stats.total_clips == 2
+
+    quiet = np.full(50, 10, dtype=np.int16)
+    for _ in range(3):
+        stats.append(quiet)
+    # 削波样本已滑出窗口，但累计值保留；保持时间内峰值不下降
+    assert stats.clip_count == 0 and stats.total_clips == 2
+    assert stats.peak_hold == 32768
+    stats.append(quiet)
+    stats.append(quiet)
+    assert stats.peak_hold == 10
+    print("✓ 峰值保持与削波计数正确")
+
+def test_resize_keeps_totals():
+    """测试改变容量只重新计算窗口统计，不重复累计削波数、不重置峰值保持"""
+    print("\n测试改变容量后的累计值...")
+    stats = SlidingStats(AudioRingBuffer(100), block_size=16, hold_samples=1000)
+    stats.append(np.array([32767, 5, -7], dtype=np.int16))
+    assert stats.clip_count == 1 and stats.total_clips == 1
+    for capacity in (200, 50, 80):
+        stats.resize(capacity)
+        check_against_window(stats)
+        assert stats.total_clips == 1 and stats.peak_hold == 32767
+    # 整帧超过容量时重新计算窗口，帧内的削波只累计一次
+    stats.append(np.full(100, -32768, dtype=np.int16))
+    assert stats.clip_count == 80 and stats.total_clips == 101
+    assert stats.peak_hold == 32768
+
+    stats.clear()
+    assert stats.total_clips == 0 and stats.peak_hold == 0
+    print("✓ 多次改变容量后累计削波数与峰值保持不变")
+
+def main():
+    """主函数"""
+    print("滑动窗口统计测试")
+    print("=" * 30)
+
+    tests = [test_matches_full_window, test_resize_and_clear, test_peak_hold_and_clipping,
+             test_resize_keeps_totals]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
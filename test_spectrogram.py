@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+瀑布图缓冲区测试脚本
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from stft import StreamingSTFT
+from spectrogram import SpectrogramBuffer, SPECTROGRAM_HISTORY_SECONDS, DB_FLOOR
+
+def test_wraparound_order():
+    """测试环形写入后两段视图按时间顺序拼接"""
+    print("测试环形写入顺序...")
+    buffer = SpectrogramBuffer(3, 5)
+    columns = []
+    for step in range(1, 13):
+        column = np.full((1, 3), 10.0 ** step)
+        buffer.append(column)
+        columns.append(20.0 * step)
+        older, newer = buffer.segments()
+        history = np.concatenate((older, newer))
+        assert len(history) == min(step, 5)
+        assert np.allclose(history[:, 0], columns[-5:])
+        assert np.isclose(buffer.latest()[0], columns[-1])
+    assert buffer.total_columns == 12
+    print("✓ 环形写入顺序正确")
+
+def test_db_conversion():
+    """测试满幅正弦波约为0dB，静音截断到下限"""
+    print("\n测试dB转换...")
+    stft = StreamingSTFT(16000, 2048, max_freq=8000)
+    buffer = SpectrogramBuffer.for_stft(stft, seconds=1)
+    freq = 1000  # 正好落在频点上
+    t = np.arange(4096) / 16000
+    buffer.append(stft.push(32767 * np.sin(2 * np.pi * freq * t)))
+    buffer.append(stft.push(np.zeros(4096)))
+    older, newer = buffer.segments()
+    assert abs(np.max(newer[0]) - 0.0) < 0.1
+    assert np.allclose(newer[-1], DB_FLOOR)
+    print(f"✓ 满幅 {np.max(newer[0]):.2f} dB，静音 {newer[-1][0]:.0f} dB")
+
+def test_ten_minute_history_realtime():
+    """测试16kHz、50%重叠下10分钟历史的容量与处理速度"""
+    print("\n测试10分钟历史...")
+    stft = StreamingSTFT(16000, 2048, max_freq=8000)
+    buffer = SpectrogramBuffer.for_stft(stft)
+    assert stft.overlap == 0.5
+    assert buffer.capacity * buffer.column_seconds >= SPECTROGRAM_HISTORY_SECONDS
+
+    frame = np.random.randint(-1000, 1000, 1024).astype(np.int16)
+    frames = 16000 * 60 // 1024  # 一分钟数据
+    start = time.perf_counter()
+    for _ in range(frames):
+        buffer.append(stft.push(frame))
+    elapsed = time.perf_counter() - start
+    speed = frames * 1024 / 16000 / elapsed
+    assert buffer.total_columns == stft.frames_computed
+    assert speed > 10, f"处理速度仅为实时的 {speed:.1f} 倍"
+    print(f"✓ 容量 {buffer.capacity} 列，处理速度为实时的 {speed:.0f} 倍")
+
+def test_view_colors_only_new_columns():
+    """测试瀑布图显示每次只着色新增的列，跨越环尾、隐藏后与清空后都与整幅着色一致"""
+    print("\n测试瀑布图增量着色...")
+    # 只有这个测试需要Qt
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+    import pyqtgraph as pg
+    from spectrogram_view import SpectrogramView
+    app = QApplication.instance() or QApplication([])
+
+    buffer = SpectrogramBuffer(8, 10)
+    plot = pg.PlotWidget()
+    view = SpectrogramView(plot, buffer)
+    rng = np.random.default_rng(1)
+
+    def expected():
+        index = np.clip((buffer.rows(0, buffer.capacity) - DB_FLOOR) * view.scale, 0, 255)
+        return view.colors[index.astype(np.uint8)].T
+
+    for step in range(8):
+        before = view.pixels.copy()
+        buffer.append(10.0 ** rng.uniform(-5, 0, (3, 8)))
+        assert view.update() and not view.update()
+        changed = np.nonzero(np.any(view.pixels != before, axis=0))[0]
+        written = {(buffer.head - 1 - i) % buffer.capacity for i in range(3)}
+        assert set(changed.tolist()) <= written
+        assert np.array_equal(view.pixels, expected())
+
+    # 隐藏期间落后超过一圈，重新显示时补齐
+    view.setVisible(False)
+    buffer.append(10.0 ** rng.uniform(-5, 0, (25, 8)))
+    assert not view.update()
+    view.setVisible(True)
+    assert np.array_equal(view.pixels, expected())
+    # 清空后再写入不少于已着色列数的列：累计列数的差值看似正常，仍须全部重新着色
+    buffer.clear()
+    buffer.append(np.ones((2, 8)))
+    view.update()
+    buffer.clear()
+    buffer.append(10.0 ** rng.uniform(-5, 0, (view.columns_drawn + 3, 8)))
+    assert view.update()
+    assert np.array_equal(view.pixels, expected())
+    small = SpectrogramBuffer(4, 10)
+    small_view = SpectrogramView(plot, small)
+    small.append(np.ones((3, 4)))
+    small_view.update()
+    small.clear()
+    small.append(10.0 ** rng.uniform(-5, 0, (5, 4)))
+    small_view.update()
+    index = np.clip((small.rows(0, small.capacity) - DB_FLOOR) * small_view.scale, 0, 255)
+    assert np.array_equal(small_view.pixels, small_view.colors[index.astype(np.uint8)].T)
+    buffer.clear()
+    buffer.append(np.ones((2, 8)))
+    view.update()
+    assert np.array_equal(view.pixels, expected())
+    assert view.item.boundingRect().width() == 2 * buffer.column_seconds
+    app.processEvents()
+    print("✓ 只更新新增的列，结果与整幅着色一致")
+
+def main():
+    """主函数"""
+    print("瀑布图缓冲区测试")
+    print("=" * 30)
+
+    tests = [test_wraparound_order, test_db_conversion, test_ten_minute_history_realtime,
+             test_view_colors_only_new_columns]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+流式STFT测试脚本
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from stft import StreamingSTFT
+
+def make_tone(freq, count, sample_rate=16000):
+    """生成int16正弦测试信号"""
+    t = np.arange(count) / sample_rate
+    return (1000 * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+def test_matches_direct_fft():
+    """测试增量计算结果与逐帧直接FFT一致"""
+    print("测试与直接FFT一致...")
+    stft = StreamingSTFT(16000, 512, hop_size=128)
+    signal = make_tone(1000, 5000)
+    # 按不规则的块大小送入
+    columns = [stft.push(signal[i:i + 300]) for i in range(0, len(signal), 300)]
+    spectra = np.concatenate(columns)
+
+    window = np.hanning(512)
+    expected_count = (len(signal) - 512) // 128 + 1
+    assert spectra.shape == (expected_count, 257)
+    for index in (0, expected_count // 2, expected_count - 1):
+        frame = signal[index * 128:index * 128 + 512]
+        expected = np.abs(np.fft.rfft(frame * window))
+        assert np.allclose(spectra[index], expected, rtol=1e-4, atol=1e-2)
+    assert stft.frames_computed == expected_count
+    print(f"✓ {expected_count} 帧结果一致")
+
+def test_band_limit_and_peak():
+    """测试频段限制与峰值频率"""
+    print("\n测试频段限制...")
+    stft = StreamingSTFT(16000, 2048, max_freq=4000)
+    stft.push(make_tone(440, 4096))
+    assert stft.frequencies[-1] <= 4000
+    assert len(stft.latest) == len(stft.frequencies)
+    peak = stft.frequencies[np.argmax(stft.latest)]
+    assert abs(peak - 440) <= 16000 / 2048
+    print(f"✓ 峰值频率 {peak:.1f} Hz")
+
+def test_normalized_cache():
+    """测试无新数据时复用缓存的归一化频谱"""
+    print("\n测试频谱缓存...")
+    stft = StreamingSTFT(16000, 256)
+    partial = make_tone(2000, 100)
+    assert stft.normalized_spectrum() is None
+    fallback = stft.normalized_spectrum(partial)
+    assert len(fallback) == stft.num_bins and np.max(fallback) == 1.0
+
+    stft.push(make_tone(2000, 512))
+    first = stft.normalized_spectrum()
+    assert stft.normalized_spectrum() is first
+    stft.push(make_tone(2000, 10))  # 不足一个跳步，不产生新列
+    assert stft.normalized_spectrum() is first
+    stft.push(make_tone(2000, 256))
+    assert stft.normalized_spectrum() is not first
+    print("✓ 缓存按版本号失效")
+
+def main():
+    """主函数"""
+    print("流式STFT测试")
+    print("=" * 30)
+
+    tests = [test_matches_direct_fft, test_band_limit_and_peak, test_normalized_cache]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+UDP接收与抖动缓冲测试脚本
+"""
+
+import os
+import sys
+import time
+import random
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from frame_protocol import encode_frame
+from ring_buffer import SPSCSampleRing
+from engine import StreamReceiver
+from udp_ingest import JitterBuffer, decode_datagram, parse_udp_address
+from headless import HeadlessRunner
+from test_audio_simulator import AudioSimulator
+
+def frame(value, count=4):
+    return np.full(count, value, dtype=np.int16)
+
+def play(jitter, sequences):
+    """按给定顺序放入帧（样本值为帧序号的低位），返回输出帧的样本值"""
+    output = []
+    for sequence in sequences:
+        output += [int(f[0]) for f in jitter.push(sequence, frame(sequence % 1000))]
+    return output
+
+def test_jitter_buffer():
+    """测试重排序、丢帧补偿、迟到丢弃、重复帧（含已输出帧的重发）与序号回绕"""
+    print("测试抖动缓冲...")
+    jitter = JitterBuffer(depth=3)
+    # 2在1之前到达；5丢失，直到其后第3帧（8）到达才补偿；5随后迟到；7重复
+    output = play(jitter, [0, 2, 1, 3, 4, 6, 7, 7, 8, 5, 9])
+    assert output == [0, 1, 2, 3, 4, 0, 6, 7, 8, 9]
+    assert jitter.counters() == {'frames_received': 11, 'frames_lost': 1, 'frames_reordered': 1,
+                                 'frames_late': 1, 'frames_duplicate': 1}
+
+    # 已输出的帧被重发算作重复，不是迟到；补偿过的帧迟到后再重发也算重复
+    resent = JitterBuffer(depth=1)
+    assert play(resent, [0, 1, 1, 2]) == [0, 1, 2]
+    assert resent.frames_late == 0 and resent.frames_duplicate == 1
+    assert play(resent, [4, 5, 3, 3]) == [0, 4, 5]
+    assert resent.frames_lost == 1 and resent.frames_late == 1 and resent.frames_duplicate == 2
+
+    repeat = JitterBuffer(depth=1, fill='repeat')
+    assert play(repeat, [10, 12, 11]) == [10, 10, 12]
+    assert repeat.frames_lost == 1 and repeat.frames_late == 1
+
+    # 等待中的缺口在 flush() 时补偿
+    waiting = JitterBuffer(depth=4)
+    assert play(waiting, [0, 2, 3]) == [0]
+    assert [int(f[0]) for f in waiting.flush()] == [0, 2, 3] and waiting.frames_lost == 1
+
+    # 32位序号回绕后仍按序输出；序号大幅跳变视为设备重启
+    wrap = JitterBuffer()
+    assert play(wrap, [0xFFFFFFFE, 0, 0xFFFFFFFF, 1]) == [294, 295, 0, 1]
+    assert wrap.frames_reordered == 1 and wrap.frames_lost == 0
+    assert play(wrap, [5000, 5001]) == [0, 1] and wrap.resync_count == 1
+
+    try:
+        JitterBuffer(fill='noise')
+        assert False, "应拒绝不支持的补偿方式"
+    except ValueError:
+        pass
+    print("✓ 重排序、补偿、迟到、重复与回绕统计正确")
+
+def test_datagrams():
+    """测试数据报解析、UDP地址识别与抖动缓冲参数"""
+    print("\n测试数据报...")
+    samples = np.arange(-100, 100, dtype=np.int16)
+    sequence, sample_rate, decoded = decode_datagram(encode_frame(samples, 7, 48000))
+    assert (sequence, sample_rate) == (7, 48000) and np.array_equal(decoded, samples)
+    assert decode_datagram(encode_frame(samples)[:-2]) is None
+    assert decode_datagram(b'{"audio_data":[1,2]}') is None
+    assert parse_udp_address("udp://") == '0.0.0.0'
+    assert parse_udp_address("udp://127.0.0.1") == '127.0.0.1'
+    assert parse_udp_address("192.168.0.194") is None
+
+    # 抖动缓冲参数经构造函数传给接收器，连接时生成对应的抖动缓冲
+    runner = HeadlessRunner('udp://127.0.0.1', 0, jitter_frames=2, jitter_fill='repeat')
+    try:
+        assert runner.receiver.connect_to_device()
+        assert (runner.receiver.jitter_buffer.depth, runner.receiver.jitter_buffer.fill) == (2, 'repeat')
+    finally:
+        runner.receiver.disconnect_from_device()
+    print("✓ 截断或非二进制帧的数据报被忽略")
+
+def test_udp_receiver():
+    """测试模拟器经UDP发送（模拟丢包与乱序），接收器输出连续的时间轴并统计"""
+    print("\n测试UDP接收...")
+    ring = SPSCSampleRing()
+    statuses = []
+    receiver = StreamReceiver(ring, 'udp://127.0.0.1', 0,
+                              on_status=lambda connected, message: statuses.append(message))
+    assert receiver.connect_to_device()
+    receiver.start_receiving()
+    simulator = AudioSimulator('127.0.0.1', receiver.socket.getsockname()[1])
+    random.seed(3)
+    sender = threading.Thread(target=simulator.send_udp, args=(80, 0.1, 0.1))
+    try:
+        sender.start()
+        sender.join()
+        time.sleep(0.3)  # 空闲超时后放出抖动缓冲中的帧
+    finally:
+        receiver.disconnect_from_device()
+        receiver.receive_thread.join(1.0)
+
+    jitter = receiver.jitter_buffer
+    assert simulator.datagrams_dropped > 0 and simulator.datagrams_reordered > 0
+    assert jitter.frames_received == simulator.datagrams_sent
+    assert jitter.frames_reordered == simulator.datagrams_reordered
+    assert jitter.frames_late == 0 and jitter.frames_duplicate == 0
+    # 丢失的帧被补偿（末尾丢失的帧之后没有帧到达，无法发现）
+    assert 0 < jitter.frames_lost <= simulator.datagrams_dropped
+    output_frames = jitter.frames_received + jitter.frames_lost
+    assert receiver.samples_received == output_frames * 1024
+    samples = ring.read_available()
+    assert len(samples) == receiver.samples_received
+    assert np.count_nonzero(samples.reshape(-1, 1024).any(axis=1)) == jitter.frames_received
+    assert statuses[0].startswith("正在接收UDP") and statuses[-1] == "已断开连接"
+    print(f"✓ 发送 {simulator.datagrams_sent} 个数据报（丢弃 {simulator.datagrams_dropped}，"
+          f"乱序 {simulator.datagrams_reordered}），补偿 {jitter.frames_lost} 帧")
+
+def main():
+    """主函数"""
+    print("UDP接收测试")
+    print("=" * 30)
+
+    tests = [test_jitter_buffer, test_datagrams, test_udp_receiver]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+波形抽取测试脚本
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from ring_buffer import AudioRingBuffer
+from waveform import MinMaxDecimator
+
+def reference_pairs(buffer, bucket):
+    """直接对窗口内每个对齐的完整桶及最后未满的桶求最小/最大值"""
+    window = buffer.latest().astype(np.int64)
+    total = buffer.total_written
+    start = total - len(window)
+    first = -(-start // bucket) * bucket
+    pairs = []
+    for begin in range(first, total, bucket):
+        segment = window[begin - start:min(begin + bucket, total) - start]
+        pairs += [segment.min(), segment.max()]
+    return np.array(pairs)
+
+def test_incremental_matches_reference():
+    """测试增量归约与逐桶计算一致"""
+    print("测试增量归约...")
+    rng = np.random.default_rng(1)
+    buffer = AudioRingBuffer(10000)
+    decimator = MinMaxDecimator(buffer, pixels=300)
+    for _ in range(80):
+        buffer.append(rng.integers(-32768, 32768, rng.integers(1, 900)).astype(np.int16))
+        x_data, y_data = decimator.update()
+        assert len(x_data) == len(y_data)
+        assert np.array_equal(y_data, reference_pairs(buffer, decimator.bucket_size))
+    assert len(y_data) <= 2 * (300 + 2)
+    print(f"✓ 桶大小 {decimator.bucket_size}，输出 {len(y_data)} 点")
+
+def test_transient_preserved():
+    """测试单个采样的尖峰不会被抽取掉"""
+    print("\n测试瞬态保留...")
+    buffer = AudioRingBuffer(100000)
+    decimator = MinMaxDecimator(buffer, pixels=500)
+    signal = np.zeros(100000, dtype=np.int16)
+    signal[12345] = 30000
+    signal[67891] = -30000
+    buffer.append(signal)
+    _, y_data = decimator.update()
+    assert y_data.max() == 30000 and y_data.min() == -30000
+    # 旧的等间隔抽样会丢失这两个尖峰
+    step = len(signal) // 1000
+    assert signal[::step].max() == 0
+    print("✓ 尖峰保留")
+
+def test_rebuild_on_change():
+    """测试清空、改变容量与宽度后重新归约"""
+    print("\n测试重新归约...")
+    buffer = AudioRingBuffer(5000)
+    decimator = MinMaxDecimator(buffer, pixels=100)
+    buffer.append(np.arange(5000, dtype=np.int16))
+    decimator.update()
+
+    buffer.resize(2000)
+    decimator.set_pixels(40)
+    _, y_data = decimator.update()
+    assert decimator.bucket_size == 50
+    assert np.array_equal(y_data, reference_pairs(buffer, 50))
+
+    buffer.clear()
+    buffer.append(np.arange(30, dtype=np.int16))
+    x_data, y_data = decimator.update()
+    assert decimator.bucket_size == 50 and y_data.tolist() == [0, 29]
+
+    decimator.set_pixels(0)  # 窗口未显示时的宽度被忽略
+    assert decimator.pixels == 40
+    print("✓ 重新归约正确")
+
+def main():
+    """主函数"""
+    print("波形抽取测试")
+    print("=" * 30)
+
+    tests = [test_incremental_matches_reference, test_transient_preserved, test_rebuild_on_change]
+    results = []
+    for test in tests:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"✗ {test.__name__} 失败: {e}")
+            results.append(False)
+
+    print("\n测试结果:")
+    if all(results):
+        print("✓ 所有测试通过")
+    else:
+        print("✗ 部分测试失败")
+
+if __name__ == "__main__":
+    main()